@@ -2,7 +2,7 @@ import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, AsyncIterator, Generic, Optional, TypeVar
+from typing import Any, AsyncIterator, Generic, Optional, TypeVar, Union
 
 import yaml
 from langchain_community.vectorstores.faiss import FAISS
@@ -401,8 +401,7 @@ class BaseRunnable(BaseModel, Generic[T], ABC):
 
             return TracedResponse[T](run_id=run_id, value=chain_output)
 
-    @abstractmethod
-    def run_batch(self, **kwargs: Any) -> list[T]:
+    def _prepare_batch_args(self, kwargs: dict) -> tuple[RunnableConfig, list[dict]]:
         config, kwargs_dict = self._prepare_run_args(kwargs)
 
         inputs = kwargs_dict.get("inputs")
@@ -420,8 +419,30 @@ class BaseRunnable(BaseModel, Generic[T], ABC):
                         : self.input_params_max_length_cutoff
                     ]
 
+        return config, inputs
+
+    @abstractmethod
+    def run_batch(self, **kwargs: Any) -> list[T]:
+        config, inputs = self._prepare_batch_args(kwargs)
         return self.runnable().batch(inputs=inputs, config=config)  # type: ignore
 
+    async def arun_batch(self, **kwargs: Any) -> list[T]:
+        """
+        Async version of run_batch.
+        """
+        config, inputs = self._prepare_batch_args(kwargs)
+        return await self.runnable().abatch(inputs=inputs, config=config)  # type: ignore
+
+    def run_batch_with_exceptions(self, **kwargs: Any) -> list[Union[T, Exception]]:
+        """
+        Like run_batch, but inputs that fail return the exception raised in place of
+        their output, instead of failing the whole batch.
+        """
+        config, inputs = self._prepare_batch_args(kwargs)
+        return self.runnable().batch(
+            inputs=inputs, config=config, return_exceptions=True
+        )  # type: ignore
+
     def prompt(
         self,
         params: RunnableParameters,
@@ -1,4 +1,4 @@
-from typing import AsyncIterator, Literal, Optional
+from typing import AsyncIterator, Literal, Optional, Union
 
 from langchain_core.runnables import (
     Runnable,
@@ -108,3 +108,35 @@ class SummarizeChunkChain(BaseDocugamiChain[str]):
             ],
             config=config,
         )
+
+    async def arun_batch(  # type: ignore[override]
+        self,
+        inputs: list[tuple[str, str]],
+        config: Optional[RunnableConfig] = None,
+    ) -> list[str]:
+        return await super().arun_batch(
+            inputs=[
+                {
+                    "contents": i[0],
+                    "format": i[1],
+                }
+                for i in inputs
+            ],
+            config=config,
+        )
+
+    def run_batch_with_exceptions(  # type: ignore[override]
+        self,
+        inputs: list[tuple[str, str]],
+        config: Optional[RunnableConfig] = None,
+    ) -> list[Union[str, Exception]]:
+        return super().run_batch_with_exceptions(
+            inputs=[
+                {
+                    "contents": i[0],
+                    "format": i[1],
+                }
+                for i in inputs
+            ],
+            config=config,
+        )
@@ -14,6 +14,10 @@ MAX_CHUNK_TEXT_LENGTH: int = int(1024 * 4 * 4.5)  # ~4.5k tokens
 MAX_PARAMS_CUTOFF_LENGTH_CHARS: int = int(1024 * 4 * 2)  # ~2k tokens
 DEFAULT_EXAMPLES_PER_PROMPT = 3
 
+# When building full docs from chunks, longer docs can be spilled to disk
+MAX_IN_MEMORY_FULL_DOCUMENT_LENGTH: int = 1024 * 1024 * 4  # ~1M tokens
+SPILL_WRITE_BUFFER_LENGTH: int = 64 * 1024  # spilled text is written in blocks
+
 DEFAULT_SAMPLE_ROWS_IN_TABLE_INFO = 3
 
 # Control tabular presentation of rows in SQL query prompts
@@ -21,6 +25,12 @@ DEFAULT_SAMPLE_ROWS_GRID_FORMAT = "grid"  # format from the tabulate library
 DEFAULT_TABLE_AS_TEXT_CELL_MAX_WIDTH = 64  # cell width
 DEFAULT_TABLE_AS_TEXT_CELL_MAX_LENGTH = 64 * 3  # cell content length
 
+# Max concurrent LLM calls when streaming summaries as they complete
+DEFAULT_SUMMARY_MAX_CONCURRENCY: int = 8
+
+# Summaries not streamed or scheduled are sent to the LLM in batches of this size
+DEFAULT_SUMMARY_BATCH_SIZE: int = 64
+
 DEFAULT_RETRIEVER_K: int = 24
 INCLUDE_XML_TAGS = True
 
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CACHE_SIZE_BYTES = 1024 * 1024 * 1024  # 1GB
+
+
+def chunks_cache_key(content: Union[bytes, Path], params: Any) -> str:
+    """
+    Content-addressed key for the chunks parsed from the given DGML content (or local
+    DGML file) with the given (JSON serializable) chunking settings.
+    """
+    if isinstance(content, Path):
+        hasher = hashlib.md5()
+        with open(content, "rb") as in_f:
+            for block in iter(lambda: in_f.read(1024 * 1024), b""):
+                hasher.update(block)
+    else:
+        hasher = hashlib.md5(content)
+    hasher.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return hasher.hexdigest()
+
+
+def chunks_to_json(chunks: list[Document]) -> str:
+    return json.dumps(
+        [{"page_content": c.page_content, "metadata": c.metadata} for c in chunks]
+    )
+
+
+def chunks_from_json(serialized: Union[str, bytes]) -> list[Document]:
+    return [
+        Document(page_content=c["page_content"], metadata=c["metadata"])
+        for c in json.loads(serialized)
+    ]
+
+
+class DocugamiCache(ABC):
+    """
+    Cache used by DocugamiLoader to skip downloading and parsing documents that have
+    not changed. Implementations must be safe to call from multiple threads.
+    """
+
+    @abstractmethod
+    def lookup_dgml(self, document_id: str, version: str) -> Optional[bytes]:
+        """Look up raw DGML by document ID and version."""
+
+    @abstractmethod
+    def update_dgml(self, document_id: str, version: str, content: bytes) -> None:
+        """Update the cache with raw DGML for the given document ID and version."""
+
+    @abstractmethod
+    def lookup_chunks(self, key: str) -> Optional[list[Document]]:
+        """Look up parsed chunks by key (see chunks_cache_key)."""
+
+    @abstractmethod
+    def update_chunks(self, key: str, chunks: list[Document]) -> None:
+        """Update the cache with parsed chunks for the given key."""
+
+
+class FileSystemDocugamiCache(DocugamiCache):
+    """
+    Content-addressed cache of raw DGML and parsed chunks in a local directory.
+
+    When the total size of cached files exceeds max_size_bytes, the least recently
+    used files are evicted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[Path, str],
+        max_size_bytes: int = DEFAULT_MAX_CACHE_SIZE_BYTES,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self._dgml_dir = self.cache_dir / "dgml"
+        self._chunks_dir = self.cache_dir / "chunks"
+        self._dgml_dir.mkdir(parents=True, exist_ok=True)
+        self._chunks_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._size_bytes = sum(p.stat().st_size for p in self._cached_files())
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of all cached files."""
+        return self._size_bytes
+
+    def _cached_files(self) -> list[Path]:
+        return [
+            p
+            for d in (self._dgml_dir, self._chunks_dir)
+            for p in d.iterdir()
+            if p.is_file() and not p.name.endswith(".tmp")
+        ]
+
+    def _dgml_path(self, document_id: str, version: str) -> Path:
+        name = hashlib.md5(f"{document_id}:{version}".encode()).hexdigest()
+        return self._dgml_dir / f"{name}.xml"
+
+    def _chunks_path(self, key: str) -> Path:
+        return self._chunks_dir / f"{key}.json"
+
+    def _read(self, path: Path) -> Optional[bytes]:
+        try:
+            content = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        try:
+            # Mark as recently used, for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted concurrently
+
+        return content
+
+    def _write(self, path: Path, content: bytes) -> None:
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(content)
+        with self._lock:
+            previous_size = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+            self._size_bytes += len(content) - previous_size
+            if self._size_bytes > self.max_size_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Evicts least recently used files until under 90% of the max size."""
+        target_size = int(self.max_size_bytes * 0.9)
+        stats = []
+        for path in self._cached_files():
+            try:
+                stats.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+
+        evicted = 0
+        for path, stat in sorted(stats, key=lambda s: s[1].st_mtime):
+            if self._size_bytes <= target_size:
+                break
+            path.unlink(missing_ok=True)
+            self._size_bytes -= stat.st_size
+            evicted += 1
+
+        logger.info(f"Evicted {evicted} files from DGML cache {self.cache_dir}")
+
+    def lookup_dgml(self, document_id: str, version: str) -> Optional[bytes]:
+        return self._read(self._dgml_path(document_id, version))
+
+    def update_dgml(self, document_id: str, version: str, content: bytes) -> None:
+        self._write(self._dgml_path(document_id, version), content)
+
+    def lookup_chunks(self, key: str) -> Optional[list[Document]]:
+        content = self._read(self._chunks_path(key))
+        if content is None:
+            return None
+        return chunks_from_json(content)
+
+    def update_chunks(self, key: str, chunks: list[Document]) -> None:
+        self._write(self._chunks_path(key), chunks_to_json(chunks).encode())
+
+    def clear(self) -> None:
+        """Deletes all cached files."""
+        with self._lock:
+            for path in self._cached_files():
+                path.unlink(missing_ok=True)
+            self._size_bytes = 0
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+from langchain_core.documents import Document
+
+from docugami_langchain.document_loaders.cache import chunks_from_json, chunks_to_json
+
+CHECKPOINT_INFO_FILE = "checkpoint.json"
+CHECKPOINT_RUN_DIR_PREFIX = "docugami-"
+
+
+class LoadCheckpoint:
+    """
+    Chunks of documents already loaded by an in-progress (or failed) docset load,
+    persisted in a local directory so a restarted load can resume where it left off.
+
+    Checkpoint files are kept in a subdirectory per run key, which this class creates
+    and deletes, so other files in the given directory are never touched.
+    """
+
+    def __init__(self, checkpoint_dir: Union[Path, str], run_key: str) -> None:
+        """
+        Opens the checkpoint for the given run key (e.g. docset and chunking
+        settings) in the given directory. Checkpoints for other run keys (e.g. other
+        docsets) are kept in their own subdirectories, and are not used.
+        """
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.run_key = run_key
+        self.run_dir = self.checkpoint_dir / f"{CHECKPOINT_RUN_DIR_PREFIX}{run_key}"
+
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.run_dir / CHECKPOINT_INFO_FILE, "w", encoding="utf-8") as out_f:
+            json.dump({"run_key": run_key}, out_f)
+
+    def _path(self, document_id: str, version: str) -> Path:
+        name = hashlib.md5(f"{document_id}:{version}".encode()).hexdigest()
+        return self.run_dir / f"{name}.json"
+
+    def contains(self, document_id: str, version: str) -> bool:
+        return self._path(document_id, version).exists()
+
+    def lookup(self, document_id: str, version: str) -> Optional[list[Document]]:
+        """
+        Gets the checkpointed chunks for the given version of a document, if any
+        (chunks checkpointed for other versions are ignored).
+        """
+        try:
+            with open(self._path(document_id, version), "r", encoding="utf-8") as in_f:
+                return chunks_from_json(in_f.read())
+        except FileNotFoundError:
+            return None
+
+    def save(self, document_id: str, version: str, chunks: list[Document]) -> None:
+        """Atomically checkpoints the chunks of a loaded document version."""
+        path = self._path(document_id, version)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as out_f:
+            out_f.write(chunks_to_json(chunks))
+        os.replace(tmp_path, path)
+
+    def clear(self) -> None:
+        """Deletes the checkpoint, e.g. once a load completes."""
+        if not self.run_dir.is_dir():
+            return
+        for path in list(self.run_dir.glob("*.json")) + list(
+            self.run_dir.glob("*.json.tmp")
+        ):
+            path.unlink(missing_ok=True)
+        try:
+            self.run_dir.rmdir()
+        except OSError:
+            pass  # not empty, so holds files this class didn't write
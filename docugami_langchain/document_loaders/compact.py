@@ -0,0 +1,94 @@
+import sys
+from typing import Any, Iterable
+
+from langchain_core.documents import Document
+
+_MISSING = object()
+
+
+class CompactDocumentMetadata:
+    """
+    Metadata shared by all the chunks of one document (e.g. name, source and project
+    metadata), held once and referenced by each chunk.
+    """
+
+    __slots__ = ("shared", "chunk_keys")
+
+    def __init__(self, shared: dict[str, Any], chunk_keys: tuple[str, ...]) -> None:
+        self.shared = shared
+        """Metadata with the same value for every chunk in the document."""
+
+        self.chunk_keys = chunk_keys
+        """Keys of metadata that varies per chunk (e.g. id and xpath)."""
+
+
+class CompactChunk:
+    """
+    Memory efficient representation of a chunk, for holding very many chunks in
+    memory. Per-chunk metadata is stored as a tuple of (interned) values, and
+    per-document metadata is shared by reference. Convert to a LangChain Document
+    with to_document when needed.
+    """
+
+    __slots__ = ("page_content", "values", "document")
+
+    def __init__(
+        self,
+        page_content: str,
+        values: tuple[Any, ...],
+        document: CompactDocumentMetadata,
+    ) -> None:
+        self.page_content = page_content
+        self.values = values
+        self.document = document
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        metadata = dict(self.document.shared)
+        for key, value in zip(self.document.chunk_keys, self.values):
+            if value is not _MISSING:
+                metadata[key] = value
+        return metadata
+
+    def to_document(self) -> Document:
+        return Document(page_content=self.page_content, metadata=self.metadata)
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def compact_chunks(chunks: list[Document]) -> list[CompactChunk]:
+    """
+    Compacts the chunks of a single document. Metadata with the same value across all
+    the chunks is shared by reference, and string metadata values are interned.
+    """
+    if not chunks:
+        return []
+
+    first_metadata = chunks[0].metadata
+    shared = {
+        key: _intern(value)
+        for key, value in first_metadata.items()
+        if all(c.metadata.get(key, _MISSING) == value for c in chunks)
+    }
+    chunk_keys = tuple(
+        dict.fromkeys(
+            _intern(key) for c in chunks for key in c.metadata if key not in shared
+        )
+    )
+    document = CompactDocumentMetadata(shared, chunk_keys)
+
+    return [
+        CompactChunk(
+            page_content=c.page_content,
+            values=tuple(_intern(c.metadata.get(key, _MISSING)) for key in chunk_keys),
+            document=document,
+        )
+        for c in chunks
+    ]
+
+
+def to_documents(chunks: Iterable[CompactChunk]) -> list[Document]:
+    """Converts compact chunks back to LangChain Documents."""
+    return [c.to_document() for c in chunks]
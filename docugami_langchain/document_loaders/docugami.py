@@ -1,14 +1,52 @@
+import asyncio
 import hashlib
 import io
 import logging
+import multiprocessing
 import os
+import threading
+import time
+from concurrent.futures import CancelledError, Executor, Future, ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Mapping, Optional, Sequence, Union
+from typing import (
+    Any,
+    AsyncIterator,
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+    cast,
+)
 
+import aiohttp
 import requests
 from langchain_community.document_loaders.base import BaseLoader
 from langchain_core.documents import Document
-from langchain_core.pydantic_v1 import BaseModel, root_validator
+from langchain_core.pydantic_v1 import BaseModel, PrivateAttr, root_validator
+from langchain_core.runnables.config import run_in_executor
+from requests.adapters import HTTPAdapter
+
+from docugami_langchain.document_loaders.cache import DocugamiCache, chunks_cache_key
+from docugami_langchain.document_loaders.checkpoint import LoadCheckpoint
+from docugami_langchain.document_loaders.compact import CompactChunk, compact_chunks
+from docugami_langchain.document_loaders.manifest import (
+    DocsetManifest,
+    DocsetSyncResult,
+    document_version,
+    params_version,
+)
+from docugami_langchain.utils.concurrency import (
+    aordered_map,
+    completed_future,
+    ordered_map,
+    ordered_results,
+)
 
 TABLE_NAME = "{http://www.w3.org/1999/xhtml}table"
 
@@ -22,9 +60,195 @@ PROJECTS_KEY = "projects"
 
 DEFAULT_API_ENDPOINT = "https://api.docugami.com/v1preview1"
 
+# Responses with these statuses are retried (with backoff) before giving up
+RETRIABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Streamed project metadata is parsed in blocks of this size
+REPORT_VALUES_BLOCK_SIZE = 64 * 1024
+
 logger = logging.getLogger(__name__)
 
 
+class _ChunkingParams(NamedTuple):
+    min_text_length: int
+    max_text_length: int
+    whitespace_normalize_text: bool
+    sub_chunk_tables: bool
+    include_xml_tags: bool
+    parent_hierarchy_levels: int
+    parent_id_key: str
+
+
+class _ParseJob(NamedTuple):
+    content: Union[bytes, Path]
+    """Raw DGML, or the path of a local DGML file (parsed directly from disk)."""
+    document_name: Optional[str]
+    additional_doc_metadata: Optional[Mapping]
+    params: _ChunkingParams
+
+
+def _run_parse_job(job: _ParseJob) -> list[Document]:
+    """
+    Parse a single DGML document into a list of Documents.
+
+    This is a module level function (with picklable inputs and outputs) so that it
+    can run in worker processes.
+    """
+    try:
+        from lxml import etree
+    except ImportError:
+        raise ImportError(
+            "Could not import lxml python package. "
+            "Please install it with `pip install lxml`."
+        )
+
+    try:
+        from dgml_utils.models import Chunk
+        from dgml_utils.segmentation import get_chunks
+    except ImportError:
+        raise ImportError(
+            "Could not import from dgml-utils python package. "
+            "Please install it with `pip install dgml-utils`."
+        )
+
+    params = job.params
+
+    def _build_framework_chunk(dg_chunk: Chunk) -> Document:
+        # Stable IDs for chunks with the same text.
+        _hashed_id = hashlib.md5(dg_chunk.text.encode()).hexdigest()
+        metadata = {
+            XPATH_KEY: dg_chunk.xpath,
+            ID_KEY: _hashed_id,
+            DOCUMENT_NAME_KEY: job.document_name,
+            DOCUMENT_SOURCE_KEY: job.document_name,
+            STRUCTURE_KEY: dg_chunk.structure,
+            TAG_KEY: dg_chunk.tag,
+        }
+
+        text = dg_chunk.text
+        if job.additional_doc_metadata:
+            metadata.update(job.additional_doc_metadata)
+
+        return Document(
+            page_content=text[: params.max_text_length],
+            metadata=metadata,
+        )
+
+    # Parse the tree and return chunks. Local files are parsed directly from disk,
+    # rather than reading them into memory first.
+    if isinstance(job.content, Path):
+        tree = etree.parse(str(job.content))
+    else:
+        tree = etree.parse(io.BytesIO(job.content))
+    root = tree.getroot()
+
+    dg_chunks = get_chunks(
+        root,
+        min_text_length=params.min_text_length,
+        max_text_length=params.max_text_length,
+        whitespace_normalize_text=params.whitespace_normalize_text,
+        sub_chunk_tables=params.sub_chunk_tables,
+        include_xml_tags=params.include_xml_tags,
+        parent_hierarchy_levels=params.parent_hierarchy_levels,
+    )
+
+    framework_chunks: dict[str, Document] = {}
+    for dg_chunk in dg_chunks:
+        framework_chunk = _build_framework_chunk(dg_chunk)
+        chunk_id = framework_chunk.metadata.get(ID_KEY)
+        if chunk_id:
+            framework_chunks[chunk_id] = framework_chunk
+            if dg_chunk.parent:
+                framework_parent_chunk = _build_framework_chunk(dg_chunk.parent)
+                parent_id = framework_parent_chunk.metadata.get(ID_KEY)
+                if parent_id and framework_parent_chunk.page_content:
+                    framework_chunk.metadata[params.parent_id_key] = parent_id
+                    framework_chunks[parent_id] = framework_parent_chunk
+
+    return list(framework_chunks.values())
+
+
+def _parse_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    A pool of worker processes for _run_parse_job. Workers are spawned rather than
+    forked, since forking while other threads (e.g. downloads) hold locks can
+    deadlock the workers.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+@dataclass
+class _RemoteLoad:
+    """State of an in-progress load from a remote docset."""
+
+    document_details: list[dict]
+    params_version: str
+    manifest: Optional[DocsetManifest] = None
+    checkpoint: Optional[LoadCheckpoint] = None
+    checkpointed_doc_ids: set[str] = field(default_factory=set)
+    project_metadata: dict[str, dict] = field(default_factory=dict)
+
+    @property
+    def doc_ids_to_download(self) -> set[str]:
+        return {
+            d[ID_KEY]
+            for d in self.document_details
+            if d[ID_KEY] not in self.checkpointed_doc_ids
+        }
+
+
+class _ReportValuesParser:
+    """
+    Incrementally parses project metadata from report-values.xml content fed in
+    blocks (e.g. as they are streamed from the API), discarding each entry once read
+    so memory stays flat.
+    """
+
+    def __init__(self, max_metadata_length: int) -> None:
+        try:
+            from lxml import etree
+        except ImportError:
+            raise ImportError(
+                "Could not import lxml python package. "
+                "Please install it with `pip install lxml`."
+            )
+
+        self._parser = etree.XMLPullParser(events=("start-ns", "end"))
+        self._max_metadata_length = max_metadata_length
+        self._entry_tag = self._heading_tag = self._value_tag = ""
+        self.metadata: dict = {}
+
+    def feed(self, block: bytes) -> None:
+        self._parser.feed(block)
+        self._read_events()
+
+    def close(self) -> dict:
+        self._parser.close()
+        self._read_events()
+        return self.metadata
+
+    def _read_events(self) -> None:
+        for event, item in self._parser.read_events():
+            if event == "start-ns":
+                prefix, uri = cast(tuple[str, str], item)
+                if prefix == "pr":
+                    self._entry_tag = f"{{{uri}}}Entry"
+                    self._heading_tag = f"{{{uri}}}Heading"
+                    self._value_tag = f"{{{uri}}}Value"
+            elif self._entry_tag and item.tag == self._entry_tag:  # type: ignore
+                entry: Any = item
+                heading = entry.find(self._heading_tag).text
+                value = " ".join(entry.find(self._value_tag).itertext()).strip()
+                self.metadata[heading] = value[: self._max_metadata_length]
+
+                # Free the parsed entry (and any earlier siblings)
+                entry.clear()
+                while entry.getprevious() is not None:
+                    del entry.getparent()[0]
+
+
 class DocugamiLoader(BaseLoader, BaseModel):
     """Load from `Docugami`.
 
@@ -74,6 +298,48 @@ class DocugamiLoader(BaseLoader, BaseModel):
     include_project_metadata_in_doc_metadata: bool = True
     """Set to True if you want to include the project metadata in the doc metadata."""
 
+    max_concurrency: int = 1
+    """Max number of documents downloaded in parallel in remote mode (1 means serial)."""
+
+    max_retries: int = 3
+    """Max number of times a request is retried after a 429, 5xx or connection error."""
+
+    retry_backoff_seconds: float = 1.0
+    """Initial delay between retries, doubled after each attempt (unless the API
+    specifies a Retry-After delay)."""
+
+    request_timeout_seconds: tuple[float, float] = (10.0, 60.0)
+    """(connect, read) timeouts for each API request. Requests that time out are
+    retried like connection errors."""
+
+    parse_in_processes: bool = False
+    """Set to True to parse DGML in a pool of worker processes, overlapped with
+    downloads, instead of on the downloading threads."""
+
+    max_parse_workers: Optional[int] = None
+    """Max number of worker processes used to parse DGML (defaults to CPU count)."""
+
+    manifest_path: Optional[Union[Path, str]] = None
+    """Set to a local JSON file path to incrementally sync a docset in remote mode:
+    only documents that are new or changed since the last load are loaded, and
+    changes (including deleted documents) are reported via last_sync."""
+
+    checkpoint_dir: Optional[Union[Path, str]] = None
+    """Set to a local directory to checkpoint the chunks of each document as a
+    remote load progresses, so that a failed load can be resumed by re-running it
+    (the checkpoint is deleted once a load completes)."""
+
+    cache: Optional[DocugamiCache] = None
+    """Cache of raw DGML (by document version) and parsed chunks (by content and
+    chunking settings), used to skip downloading and parsing documents."""
+
+    _last_sync: Optional[DocsetSyncResult] = PrivateAttr(default=None)
+    _session: Optional[requests.Session] = PrivateAttr(default=None)
+    _session_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    class Config:
+        arbitrary_types_allowed = True
+
     @root_validator
     def validate_local_or_remote(cls, values: dict[str, Any]) -> dict[str, Any]:
         """Validate that either local file paths are given, or remote API docset ID.
@@ -93,82 +359,111 @@ class DocugamiLoader(BaseLoader, BaseModel):
         if values.get("docset_id") and not values.get("access_token"):
             raise ValueError("Must specify access token if using remote API docset_id")
 
+        if values.get("max_concurrency", 1) < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
         return values
 
-    def _parse_dgml(
-        self,
-        content: bytes,
-        document_name: Optional[str] = None,
-        additional_doc_metadata: Optional[Mapping] = None,
-    ) -> list[Document]:
-        """Parse a single DGML document into a list of Documents."""
-        try:
-            from lxml import etree
-        except ImportError:
-            raise ImportError(
-                "Could not import lxml python package. "
-                "Please install it with `pip install lxml`."
-            )
+    @property
+    def last_sync(self) -> Optional[DocsetSyncResult]:
+        """Changes found by the last incremental sync (if manifest_path is set)."""
+        return self._last_sync
 
-        try:
-            from dgml_utils.models import Chunk
-            from dgml_utils.segmentation import get_chunks
-        except ImportError:
-            raise ImportError(
-                "Could not import from dgml-utils python package. "
-                "Please install it with `pip install dgml-utils`."
-            )
+    def _get_session(self) -> requests.Session:
+        """Gets the HTTP session shared by all requests, sized for max_concurrency."""
+        with self._session_lock:
+            if not self._session:
+                session = requests.Session()
+                session.headers["Authorization"] = f"Bearer {self.access_token}"
+                adapter = HTTPAdapter(
+                    pool_connections=self.max_concurrency,
+                    pool_maxsize=self.max_concurrency,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
 
-        def _build_framework_chunk(dg_chunk: Chunk) -> Document:
-            # Stable IDs for chunks with the same text.
-            _hashed_id = hashlib.md5(dg_chunk.text.encode()).hexdigest()
-            metadata = {
-                XPATH_KEY: dg_chunk.xpath,
-                ID_KEY: _hashed_id,
-                DOCUMENT_NAME_KEY: document_name,
-                DOCUMENT_SOURCE_KEY: document_name,
-                STRUCTURE_KEY: dg_chunk.structure,
-                TAG_KEY: dg_chunk.tag,
-            }
+            return self._session
 
-            text = dg_chunk.text
-            if additional_doc_metadata:
-                if self.include_project_metadata_in_doc_metadata:
-                    metadata.update(additional_doc_metadata)
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before the given retry attempt (0 based), honoring the
+        Retry-After header of the failed response (if any)."""
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass  # HTTP date format, fall back to backoff
 
-            return Document(
-                page_content=text[: self.max_text_length],
-                metadata=metadata,
-            )
+        return self.retry_backoff_seconds * (2**attempt)
 
-        # Parse the tree and return chunks
-        tree = etree.parse(io.BytesIO(content))
-        root = tree.getroot()
+    def _get(self, url: str, stream: bool = False) -> requests.Response:
+        """GET the given API URL, retrying with backoff on 429, 5xx and connection errors."""
+        session = self._get_session()
+        attempt = 0
+        while True:
+            response: Optional[requests.Response] = None
+            try:
+                response = session.get(
+                    url, stream=stream, timeout=self.request_timeout_seconds
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning(f"Retrying {url} after error: {exc}")
+            else:
+                if (
+                    response.status_code not in RETRIABLE_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    return response
+                logger.warning(f"Retrying {url} after status: {response.status_code}")
+                response.close()
 
-        dg_chunks = get_chunks(
-            root,
+            retry_after = None
+            if response is not None:
+                retry_after = response.headers.get("Retry-After")
+            time.sleep(self._retry_delay(attempt, retry_after))
+            attempt += 1
+
+    def _chunking_params(self) -> _ChunkingParams:
+        """The settings that determine how DGML is split into chunks."""
+        return _ChunkingParams(
             min_text_length=self.min_text_length,
             max_text_length=self.max_text_length,
             whitespace_normalize_text=self.whitespace_normalize_text,
             sub_chunk_tables=self.sub_chunk_tables,
             include_xml_tags=self.include_xml_tags,
             parent_hierarchy_levels=self.parent_hierarchy_levels,
+            parent_id_key=self.parent_id_key,
         )
 
-        framework_chunks: dict[str, Document] = {}
-        for dg_chunk in dg_chunks:
-            framework_chunk = _build_framework_chunk(dg_chunk)
-            chunk_id = framework_chunk.metadata.get(ID_KEY)
-            if chunk_id:
-                framework_chunks[chunk_id] = framework_chunk
-                if dg_chunk.parent:
-                    framework_parent_chunk = _build_framework_chunk(dg_chunk.parent)
-                    parent_id = framework_parent_chunk.metadata.get(ID_KEY)
-                    if parent_id and framework_parent_chunk.page_content:
-                        framework_chunk.metadata[self.parent_id_key] = parent_id
-                        framework_chunks[parent_id] = framework_parent_chunk
-
-        return list(framework_chunks.values())
+    def _parse_job(
+        self,
+        content: Union[bytes, Path],
+        document_name: Optional[str] = None,
+        additional_doc_metadata: Optional[Mapping] = None,
+    ) -> _ParseJob:
+        """Packages up everything needed to parse a DGML document (in any process)."""
+        if not self.include_project_metadata_in_doc_metadata:
+            additional_doc_metadata = None
+
+        return _ParseJob(
+            content=content,
+            document_name=document_name,
+            additional_doc_metadata=additional_doc_metadata,
+            params=self._chunking_params(),
+        )
+
+    def _parse_dgml(
+        self,
+        content: bytes,
+        document_name: Optional[str] = None,
+        additional_doc_metadata: Optional[Mapping] = None,
+    ) -> list[Document]:
+        """Parse a single DGML document into a list of Documents."""
+        return _run_parse_job(
+            self._parse_job(content, document_name, additional_doc_metadata)
+        )
 
     def _document_details_for_docset_id(self, docset_id: str) -> list[dict]:
         """Gets all document details for the given docset ID"""
@@ -176,10 +471,7 @@ class DocugamiLoader(BaseLoader, BaseModel):
         all_documents = []
 
         while url:
-            response = requests.get(
-                url,
-                headers={"Authorization": f"Bearer {self.access_token}"},
-            )
+            response = self._get(url)
             if response.ok:
                 data = response.json()
                 all_documents.extend(data["documents"])
@@ -197,12 +489,7 @@ class DocugamiLoader(BaseLoader, BaseModel):
         all_projects = []
 
         while url:
-            response = requests.request(
-                "GET",
-                url,
-                headers={"Authorization": f"Bearer {self.access_token}"},
-                data={},
-            )
+            response = self._get(url)
             if response.ok:
                 data = response.json()
                 all_projects.extend(data["projects"])
@@ -214,78 +501,301 @@ class DocugamiLoader(BaseLoader, BaseModel):
 
         return all_projects
 
-    def _metadata_for_project(self, project: dict) -> dict:
-        """Gets project metadata for all files"""
+    def _report_artifacts_for_project(
+        self, project: dict, document_ids: Optional[set[str]] = None
+    ) -> list[dict]:
+        """Gets the report-values.xml artifacts for all files (or only the given
+        document IDs) in the given project"""
         project_id = project.get(ID_KEY)
 
         url = f"{self.api}/projects/{project_id}/artifacts/latest"
         all_artifacts = []
 
-        per_file_metadata: dict = {}
         while url:
-            response = requests.request(
-                "GET",
-                url,
-                headers={"Authorization": f"Bearer {self.access_token}"},
-                data={},
-            )
+            response = self._get(url)
             if response.ok:
                 data = response.json()
                 all_artifacts.extend(data["artifacts"])
                 url = data.get("next", None)
             elif response.status_code == 404:
                 # Not found is ok, just means no published projects
-                return per_file_metadata
+                return []
             else:
                 raise Exception(
                     f"Failed to download {url} (status: {response.status_code})"
                 )
 
+        report_artifacts = []
         for artifact in all_artifacts:
             artifact_name = artifact.get("name")
             artifact_url = artifact.get("url")
             artifact_doc = artifact.get("document")
 
+            # The evaluated XML for each document is named after the project
             if artifact_name == "report-values.xml" and artifact_url and artifact_doc:
-                doc_id = artifact_doc[ID_KEY]
-                metadata: dict = {}
-
-                # The evaluated XML for each document is named after the project
-                response = requests.request(
-                    "GET",
-                    f"{artifact_url}/content",
-                    headers={"Authorization": f"Bearer {self.access_token}"},
-                    data={},
+                if document_ids is None or artifact_doc[ID_KEY] in document_ids:
+                    report_artifacts.append(artifact)
+
+        return report_artifacts
+
+    def _metadata_for_artifact(self, artifact: dict) -> dict:
+        """Gets project metadata for a file from its report-values.xml artifact"""
+        url = f"{artifact['url']}/content"
+        response = self._get(url, stream=True)
+        try:
+            if response.ok:
+                parser = _ReportValuesParser(self.max_metadata_length)
+                for block in response.iter_content(chunk_size=REPORT_VALUES_BLOCK_SIZE):
+                    parser.feed(block)
+                return parser.close()
+            else:
+                raise Exception(
+                    f"Failed to download {url} (status: {response.status_code})"
                 )
+        finally:
+            response.close()
+
+    def _metadata_for_project(
+        self, project: dict, document_ids: Optional[set[str]] = None
+    ) -> dict:
+        """Gets project metadata for all files (or only the given document IDs)"""
+        return self._metadata_for_projects([project], document_ids)
+
+    def _metadata_for_projects(
+        self, projects: list[dict], document_ids: Optional[set[str]] = None
+    ) -> dict[str, dict]:
+        """Gets combined project metadata for all files (or only the given document
+        IDs), with all projects' artifacts fetched in parallel on one bounded pool"""
+        artifacts = [
+            artifact
+            for project_artifacts in ordered_map(
+                lambda p: self._report_artifacts_for_project(p, document_ids),
+                projects,
+                self.max_concurrency,
+            )
+            for artifact in project_artifacts
+        ]
+
+        combined_metadata: dict[str, dict] = {}
+        for artifact, metadata in zip(
+            artifacts,
+            ordered_map(self._metadata_for_artifact, artifacts, self.max_concurrency),
+        ):
+            doc_id = artifact["document"][ID_KEY]
+            if doc_id not in combined_metadata:
+                combined_metadata[doc_id] = metadata
+            else:
+                combined_metadata[doc_id].update(metadata)
+
+        return combined_metadata
+
+    def _async_session(self) -> aiohttp.ClientSession:
+        """Creates an async HTTP session, sized for max_concurrency. The caller must
+        close it (e.g. with async with)."""
+        connect_timeout, read_timeout = self.request_timeout_seconds
+        return aiohttp.ClientSession(
+            headers={"Authorization": f"Bearer {self.access_token}"},
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+            timeout=aiohttp.ClientTimeout(
+                total=None, sock_connect=connect_timeout, sock_read=read_timeout
+            ),
+        )
+
+    @asynccontextmanager
+    async def _aget(
+        self, url: str, session: Optional[aiohttp.ClientSession] = None
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Async GET the given API URL, retrying with backoff on 429, 5xx and
+        connection errors. Uses a new session if none is given."""
+        if session is None:
+            async with self._async_session() as new_session:
+                async with self._aget(url, new_session) as response:
+                    yield response
+            return
+
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                response = await session.get(url)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as exc:
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning(f"Retrying {url} after error: {exc!r}")
+            else:
+                if (
+                    response.status not in RETRIABLE_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    break
+                logger.warning(f"Retrying {url} after status: {response.status}")
+                retry_after = response.headers.get("Retry-After")
+                response.release()
+
+            await asyncio.sleep(self._retry_delay(attempt, retry_after))
+            attempt += 1
+
+        try:
+            yield response
+        finally:
+            response.release()
 
+    async def _aget_all_pages(
+        self,
+        url: str,
+        items_key: str,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> Optional[list[dict]]:
+        """Async gets all items from a paged API listing, or None if not found."""
+        all_items: list[dict] = []
+        next_url: Optional[str] = url
+        while next_url:
+            async with self._aget(next_url, session) as response:
                 if response.ok:
-                    try:
-                        from lxml import etree
-                    except ImportError:
-                        raise ImportError(
-                            "Could not import lxml python package. "
-                            "Please install it with `pip install lxml`."
-                        )
-                    artifact_tree = etree.parse(io.BytesIO(response.content))
-                    artifact_root = artifact_tree.getroot()
-                    ns = artifact_root.nsmap
-                    entries = artifact_root.xpath(
-                        "//pr:Entry",
-                        namespaces=ns,  # type: ignore
-                    )
-                    for entry in entries:
-                        heading = entry.xpath("./pr:Heading", namespaces=ns)[0].text
-                        value = " ".join(
-                            entry.xpath("./pr:Value", namespaces=ns)[0].itertext()
-                        ).strip()
-                        metadata[heading] = value[: self.max_metadata_length]
-                    per_file_metadata[doc_id] = metadata
+                    data = await response.json(content_type=None)
+                    all_items.extend(data[items_key])
+                    next_url = data.get("next", None)
+                elif response.status == 404:
+                    return None
                 else:
                     raise Exception(
-                        f"Failed to download {artifact_url}/content (status: {response.status_code})"
+                        f"Failed to download {next_url} (status: {response.status})"
                     )
 
-        return per_file_metadata
+        return all_items
+
+    async def _adocument_details_for_docset_id(
+        self, docset_id: str, session: Optional[aiohttp.ClientSession] = None
+    ) -> list[dict]:
+        """Async gets all document details for the given docset ID"""
+        url = f"{self.api}/docsets/{docset_id}/documents"
+        documents = await self._aget_all_pages(url, "documents", session)
+        if documents is None:
+            raise Exception(f"Failed to download {url} (status: 404)")
+        return documents
+
+    async def _aproject_details_for_docset_id(
+        self, docset_id: str, session: Optional[aiohttp.ClientSession] = None
+    ) -> list[dict]:
+        """Async gets all project details for the given docset ID"""
+        url = f"{self.api}/projects?docset.id={docset_id}"
+        projects = await self._aget_all_pages(url, "projects", session)
+        if projects is None:
+            raise Exception(f"Failed to download {url} (status: 404)")
+        return projects
+
+    async def _areport_artifacts_for_project(
+        self,
+        project: dict,
+        document_ids: Optional[set[str]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> list[dict]:
+        """Async gets the report-values.xml artifacts for all files (or only the
+        given document IDs) in the given project"""
+        project_id = project.get(ID_KEY)
+        url = f"{self.api}/projects/{project_id}/artifacts/latest"
+
+        # Not found is ok, just means no published projects
+        all_artifacts = await self._aget_all_pages(url, "artifacts", session) or []
+
+        return [
+            artifact
+            for artifact in all_artifacts
+            if artifact.get("name") == "report-values.xml"
+            and artifact.get("url")
+            and artifact.get("document")
+            and (document_ids is None or artifact["document"][ID_KEY] in document_ids)
+        ]
+
+    async def _ametadata_for_artifact(
+        self, artifact: dict, session: Optional[aiohttp.ClientSession] = None
+    ) -> dict:
+        """Async gets project metadata for a file from its report-values.xml
+        artifact, parsing it as it streams in"""
+        url = f"{artifact['url']}/content"
+        async with self._aget(url, session) as response:
+            if response.ok:
+                parser = _ReportValuesParser(self.max_metadata_length)
+                async for block in response.content.iter_chunked(
+                    REPORT_VALUES_BLOCK_SIZE
+                ):
+                    parser.feed(block)
+                return parser.close()
+            else:
+                raise Exception(f"Failed to download {url} (status: {response.status})")
+
+    async def _ametadata_for_project(
+        self,
+        project: dict,
+        document_ids: Optional[set[str]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> dict:
+        """Async gets project metadata for all files (or only the given document
+        IDs)"""
+        return await self._ametadata_for_projects([project], document_ids, session)
+
+    async def _ametadata_for_projects(
+        self,
+        projects: list[dict],
+        document_ids: Optional[set[str]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> dict[str, dict]:
+        """Async gets combined project metadata for all files (or only the given
+        document IDs), with at most max_concurrency requests in flight"""
+        if session is None:
+            async with self._async_session() as new_session:
+                return await self._ametadata_for_projects(
+                    projects, document_ids, new_session
+                )
+
+        artifacts = [
+            artifact
+            async for project_artifacts in aordered_map(
+                lambda p: self._areport_artifacts_for_project(
+                    p, document_ids, session
+                ),
+                projects,
+                self.max_concurrency,
+            )
+            for artifact in project_artifacts
+        ]
+
+        combined_metadata: dict[str, dict] = {}
+        artifacts_iter = iter(artifacts)
+        async for metadata in aordered_map(
+            lambda a: self._ametadata_for_artifact(a, session),
+            artifacts,
+            self.max_concurrency,
+        ):
+            doc_id = next(artifacts_iter)["document"][ID_KEY]
+            if doc_id not in combined_metadata:
+                combined_metadata[doc_id] = metadata
+            else:
+                combined_metadata[doc_id].update(metadata)
+
+        return combined_metadata
+
+    def _download_dgml(
+        self, document_id: str, docset_id: str, version: Optional[str] = None
+    ) -> bytes:
+        """Download the DGML for a document (or get it from the cache, if the version
+        of the document is given)."""
+        if self.cache and version:
+            content = self.cache.lookup_dgml(document_id, version)
+            if content is not None:
+                return content
+
+        url = f"{self.api}/docsets/{docset_id}/documents/{document_id}/dgml"
+
+        response = self._get(url)
+        if response.ok:
+            if self.cache and version:
+                self.cache.update_dgml(document_id, version, response.content)
+            return response.content
+        else:
+            raise Exception(
+                f"Failed to download {url} (status: {response.status_code})"
+            )
 
     def _load_chunks_for_document(
         self,
@@ -295,69 +805,403 @@ class DocugamiLoader(BaseLoader, BaseModel):
         additional_metadata: Optional[Mapping] = None,
     ) -> list[Document]:
         """Load chunks for a document."""
+        return self._parse_dgml(
+            content=self._download_dgml(document_id, docset_id),
+            document_name=document_name,
+            additional_doc_metadata=additional_metadata,
+        )
+
+    async def _adownload_dgml(
+        self,
+        document_id: str,
+        docset_id: str,
+        version: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> bytes:
+        """Async download the DGML for a document (or get it from the cache, if the
+        version of the document is given)."""
+        if self.cache and version:
+            content = await run_in_executor(
+                None, self.cache.lookup_dgml, document_id, version
+            )
+            if content is not None:
+                return content
+
         url = f"{self.api}/docsets/{docset_id}/documents/{document_id}/dgml"
 
-        response = requests.request(
-            "GET",
-            url,
-            headers={"Authorization": f"Bearer {self.access_token}"},
-            data={},
+        async with self._aget(url, session) as response:
+            if response.ok:
+                content = await response.read()
+            else:
+                raise Exception(f"Failed to download {url} (status: {response.status})")
+
+        if self.cache and version:
+            await run_in_executor(
+                None, self.cache.update_dgml, document_id, version, content
+            )
+        return content
+
+    async def _aload_chunks_for_document(
+        self,
+        document_id: str,
+        docset_id: str,
+        document_name: Optional[str] = None,
+        additional_metadata: Optional[Mapping] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> list[Document]:
+        """Async load chunks for a document, parsing in a thread."""
+        content = await self._adownload_dgml(document_id, docset_id, session=session)
+        return await run_in_executor(
+            None, self._parse_dgml, content, document_name, additional_metadata
         )
 
-        if response.ok:
-            return self._parse_dgml(
-                content=response.content,
-                document_name=document_name,
-                additional_doc_metadata=additional_metadata,
+    def _submit_parse(
+        self, job: _ParseJob, executor: Optional[Executor] = None
+    ) -> Future[list[Document]]:
+        """
+        Parse the given job on the given executor (or inline, if none), unless its
+        chunks are already cached. Chunks are cached as parsed, so jobs should not
+        include additional doc metadata (see _with_additional_metadata).
+        """
+        if not self.cache:
+            if executor:
+                return executor.submit(_run_parse_job, job)
+            return completed_future(_run_parse_job(job))
+
+        cache = self.cache
+        # Chunk metadata includes the document name, so it is part of the key
+        key = chunks_cache_key(
+            job.content, {**job.params._asdict(), "document_name": job.document_name}
+        )
+        cached_chunks = cache.lookup_chunks(key)
+        if cached_chunks is not None:
+            return completed_future(cached_chunks)
+
+        if not executor:
+            chunks = _run_parse_job(job)
+            cache.update_chunks(key, chunks)
+            return completed_future(chunks)
+
+        # Callers may modify the chunks they get (see _with_additional_metadata), so
+        # only hand them out once they have been written to the cache.
+        parse_future = executor.submit(_run_parse_job, job)
+        cached_future: Future[list[Document]] = Future()
+
+        def _update_cache(future: Future[list[Document]]) -> None:
+            if not cached_future.set_running_or_notify_cancel():
+                return
+            if future.cancelled():
+                cached_future.set_exception(CancelledError())
+                return
+            try:
+                chunks = future.result()
+                cache.update_chunks(key, chunks)
+            except BaseException as e:
+                cached_future.set_exception(e)
+            else:
+                cached_future.set_result(chunks)
+
+        def _cancel_parse(future: Future[list[Document]]) -> None:
+            if future.cancelled():
+                parse_future.cancel()
+
+        cached_future.add_done_callback(_cancel_parse)
+        parse_future.add_done_callback(_update_cache)
+        return cached_future
+
+    def _parse_jobs(
+        self, jobs: Iterable[Optional[_ParseJob]]
+    ) -> Iterator[list[Document]]:
+        """
+        Parse the given jobs in order. If parse_in_processes is set, jobs are parsed
+        in a pool of worker processes and pulled from the given iterable as parse
+        capacity frees up, so any downloads producing them overlap with parsing.
+
+        None jobs (for documents that don't need parsing) yield no chunks, to keep
+        results aligned with jobs.
+        """
+        if not self.parse_in_processes:
+            for job in jobs:
+                yield self._submit_parse(job).result() if job else []
+            return
+
+        max_workers = self.max_parse_workers or os.cpu_count() or 1
+        with _parse_process_pool(max_workers) as executor:
+            no_chunks: list[Document] = []
+            yield from ordered_results(
+                (
+                    self._submit_parse(job, executor)
+                    if job
+                    else completed_future(no_chunks)
+                    for job in jobs
+                ),
+                2 * max_workers,
             )
-        else:
-            raise Exception(
-                f"Failed to download {url} (status: {response.status_code})"
+
+    def _with_additional_metadata(
+        self, chunks: list[Document], additional_doc_metadata: Optional[Mapping]
+    ) -> list[Document]:
+        """Adds the given additional (e.g. project) metadata to parsed chunks."""
+        if additional_doc_metadata and self.include_project_metadata_in_doc_metadata:
+            for chunk in chunks:
+                parent_id = chunk.metadata.get(self.parent_id_key)
+                chunk.metadata.update(additional_doc_metadata)
+                if parent_id:
+                    chunk.metadata[self.parent_id_key] = parent_id
+
+        return chunks
+
+    def _start_remote_load(self, document_details: list[dict]) -> _RemoteLoad:
+        """
+        Plans a load of the given documents from the remote docset, applying the
+        incremental sync manifest, document ID filter and checkpoint (if set).
+        """
+        current_params_version = params_version(self._chunking_params()._asdict())
+        load = _RemoteLoad(
+            document_details=document_details,
+            params_version=current_params_version,
+        )
+
+        if self.manifest_path:
+            # Incremental sync: only load new or changed documents
+            load.manifest = DocsetManifest.load(self.manifest_path)
+            self._last_sync = load.manifest.diff(
+                document_details, current_params_version, ID_KEY
+            )
+            logger.info(
+                f"Syncing docset {self.docset_id}: "
+                f"{len(self._last_sync.new_document_ids)} new, "
+                f"{len(self._last_sync.changed_document_ids)} changed, "
+                f"{len(self._last_sync.unchanged_document_ids)} unchanged, "
+                f"{len(self._last_sync.deleted_document_ids)} deleted documents"
             )
+            ids_to_load = self._last_sync.document_ids_to_load
+            load.document_details = [
+                d for d in load.document_details if d[ID_KEY] in ids_to_load
+            ]
+
+        if self.document_ids:
+            load.document_details = [
+                d for d in load.document_details if d[ID_KEY] in self.document_ids
+            ]
+
+        if self.checkpoint_dir:
+            # Resume from chunks saved by an earlier load that didn't complete
+            load.checkpoint = LoadCheckpoint(
+                self.checkpoint_dir,
+                run_key=params_version(
+                    [
+                        self.docset_id,
+                        current_params_version,
+                        self.include_project_metadata_in_doc_metadata,
+                    ]
+                ),
+            )
+            load.checkpointed_doc_ids = {
+                d[ID_KEY]
+                for d in load.document_details
+                if load.checkpoint.contains(d[ID_KEY], document_version(d))
+            }
+            if load.checkpointed_doc_ids:
+                logger.info(
+                    f"Resuming docset {self.docset_id} load from checkpoint: "
+                    f"{len(load.checkpointed_doc_ids)} documents already loaded"
+                )
+
+        return load
+
+    def _finish_document(
+        self, load: _RemoteLoad, doc: dict, doc_chunks: list[Document]
+    ) -> list[Document]:
+        """Gets the final chunks for a document in a remote load, given its parsed
+        chunks (or from the checkpoint, for documents loaded by an earlier run)."""
+        doc_id = doc[ID_KEY]
+        if load.checkpoint and doc_id in load.checkpointed_doc_ids:
+            return load.checkpoint.lookup(doc_id, document_version(doc)) or []
+
+        doc_chunks = self._with_additional_metadata(
+            doc_chunks, load.project_metadata.get(doc_id)
+        )
+        if load.checkpoint:
+            load.checkpoint.save(doc_id, document_version(doc), doc_chunks)
+
+        return doc_chunks
 
-    def load(self) -> list[Document]:
-        """Load documents."""
-        chunks: list[Document] = []
+    def _document_consumed(self, load: _RemoteLoad, doc: dict) -> None:
+        """Records that the caller has consumed a document's chunks."""
+        if load.manifest:
+            load.manifest.record(doc, ID_KEY)
 
+    def _finish_remote_load(self, load: _RemoteLoad) -> None:
+        """Saves the manifest and deletes the checkpoint once a load completes."""
+        if load.manifest and self._last_sync:
+            loaded_doc_ids = {d[ID_KEY] for d in load.document_details}
+            if load.manifest.params_version != load.params_version:
+                # Documents not re-loaded with the current settings are stale
+                load.manifest.remove(
+                    [d for d in load.manifest.documents if d not in loaded_doc_ids]
+                )
+            load.manifest.remove(self._last_sync.deleted_document_ids)
+            load.manifest.params_version = load.params_version
+            load.manifest.save()
+
+        if load.checkpoint:
+            # The load completed, so the next one should start from scratch
+            load.checkpoint.clear()
+
+    def _lazy_load_document_chunks(self) -> Generator[list[Document], None, None]:
+        """Lazily load chunks, yielding the chunks for each document (in order) as
+        soon as that document is parsed."""
         if self.access_token and self.docset_id:
             # Remote mode
-            _document_details = self._document_details_for_docset_id(self.docset_id)
-            if self.document_ids:
-                _document_details = [
-                    d for d in _document_details if d[ID_KEY] in self.document_ids
-                ]
-
-            _project_details = self._project_details_for_docset_id(self.docset_id)
-            combined_project_metadata: dict[str, dict] = {}
-            if _project_details and self.include_project_metadata_in_doc_metadata:
+            docset_id = self.docset_id
+            load = self._start_remote_load(
+                self._document_details_for_docset_id(docset_id)
+            )
+
+            # Only project metadata for documents being downloaded is needed
+            doc_ids_to_download = load.doc_ids_to_download
+            if doc_ids_to_download and self.include_project_metadata_in_doc_metadata:
                 # If there are any projects for this docset and the caller requested
-                # project metadata, load it.
-                for project in _project_details:
-                    metadata = self._metadata_for_project(project)
-                    for file_id in metadata:
-                        if file_id not in combined_project_metadata:
-                            combined_project_metadata[file_id] = metadata[file_id]
-                        else:
-                            combined_project_metadata[file_id].update(metadata[file_id])
-
-            for doc in _document_details:
-                doc_id = doc[ID_KEY]
-                doc_name = doc.get(DOCUMENT_NAME_KEY)
-                doc_metadata = combined_project_metadata.get(doc_id)
-                chunks += self._load_chunks_for_document(
-                    document_id=doc_id,
-                    docset_id=self.docset_id,
-                    document_name=doc_name,
-                    additional_metadata=doc_metadata,
+                # project metadata, load it (for all projects in parallel).
+                _project_details = self._project_details_for_docset_id(docset_id)
+                if _project_details:
+                    load.project_metadata = self._metadata_for_projects(
+                        _project_details, doc_ids_to_download
+                    )
+
+            def _download_doc(doc: dict) -> Optional[_ParseJob]:
+                if doc[ID_KEY] not in doc_ids_to_download:
+                    return None
+                return self._parse_job(
+                    content=self._download_dgml(
+                        doc[ID_KEY], docset_id, document_version(doc)
+                    ),
+                    document_name=doc.get(DOCUMENT_NAME_KEY),
                 )
+
+            # Download documents on a bounded pool of workers sharing one HTTP
+            # session. Results are in docset order regardless of timing, and only a
+            # bounded number of documents are in flight at any time.
+            jobs = ordered_map(
+                _download_doc, load.document_details, self.max_concurrency
+            )
+            doc_chunks_iter = self._parse_jobs(jobs)
+            for doc, doc_chunks in zip(load.document_details, doc_chunks_iter):
+                yield self._finish_document(load, doc, doc_chunks)
+                self._document_consumed(load, doc)
+
+            self._finish_remote_load(load)
         elif self.file_paths:
             # Local mode (for integration testing, or pre-downloaded XML)
-            for path in self.file_paths:
-                path = Path(path)
-                with open(path, "rb") as file:
-                    chunks += self._parse_dgml(
-                        content=file.read(),
-                        document_name=path.name,
+            jobs = (
+                self._parse_job(content=Path(path), document_name=Path(path).name)
+                for path in self.file_paths
+            )
+            yield from self._parse_jobs(jobs)
+
+    def lazy_load(self) -> Iterator[Document]:
+        """Lazy load documents, yielding each document's chunks as soon as that
+        document is parsed."""
+        for doc_chunks in self._lazy_load_document_chunks():
+            yield from doc_chunks
+
+    def lazy_load_compact(self) -> Iterator[CompactChunk]:
+        """Lazy load chunks in a compact representation (see CompactChunk), for
+        holding very many chunks in memory."""
+        for doc_chunks in self._lazy_load_document_chunks():
+            yield from compact_chunks(doc_chunks)
+
+    def load_compact(self) -> list[CompactChunk]:
+        """Load chunks in a compact representation (see CompactChunk)."""
+        return list(self.lazy_load_compact())
+
+    async def _alazy_load_document_chunks(self) -> AsyncIterator[list[Document]]:
+        """Async lazily load chunks, yielding the chunks for each document (in order)
+        as soon as that document is parsed."""
+        if not (self.access_token and self.docset_id):
+            # Local mode is all disk and CPU bound, so step the blocking generator one
+            # document at a time in a thread, so the event loop is never blocked.
+            doc_chunks_iter = self._lazy_load_document_chunks()
+            try:
+                while True:
+                    doc_chunks = await run_in_executor(
+                        None, next, doc_chunks_iter, None
                     )
+                    if doc_chunks is None:
+                        break
+                    yield doc_chunks
+            finally:
+                await run_in_executor(None, doc_chunks_iter.close)
+            return
 
-        return chunks
+        # Remote mode
+        docset_id = self.docset_id
+        async with self._async_session() as session:
+            load = await run_in_executor(
+                None,
+                self._start_remote_load,
+                await self._adocument_details_for_docset_id(docset_id, session),
+            )
+
+            # Only project metadata for documents being downloaded is needed
+            doc_ids_to_download = load.doc_ids_to_download
+            if doc_ids_to_download and self.include_project_metadata_in_doc_metadata:
+                _project_details = await self._aproject_details_for_docset_id(
+                    docset_id, session
+                )
+                if _project_details:
+                    load.project_metadata = await self._ametadata_for_projects(
+                        _project_details, doc_ids_to_download, session
+                    )
+
+            executor: Optional[Executor] = None
+            if self.parse_in_processes:
+                executor = _parse_process_pool(
+                    self.max_parse_workers or os.cpu_count() or 1
+                )
+
+            async def _aload_doc(doc: dict) -> tuple[dict, list[Document]]:
+                doc_chunks: list[Document] = []
+                if doc[ID_KEY] in doc_ids_to_download:
+                    job = self._parse_job(
+                        content=await self._adownload_dgml(
+                            doc[ID_KEY], docset_id, document_version(doc), session
+                        ),
+                        document_name=doc.get(DOCUMENT_NAME_KEY),
+                    )
+                    # Parse in a thread (or worker process), overlapping downloads
+                    parse_future = await run_in_executor(
+                        None, self._submit_parse, job, executor
+                    )
+                    doc_chunks = await asyncio.wrap_future(parse_future)
+
+                return doc, await run_in_executor(
+                    None, self._finish_document, load, doc, doc_chunks
+                )
+
+            try:
+                # Results are in docset order regardless of timing, and at most
+                # max_concurrency documents are downloaded at a time.
+                async for doc, doc_chunks in aordered_map(
+                    _aload_doc, load.document_details, self.max_concurrency
+                ):
+                    yield doc_chunks
+                    self._document_consumed(load, doc)
+            finally:
+                if executor:
+                    executor.shutdown(wait=False, cancel_futures=True)
+
+        await run_in_executor(None, self._finish_remote_load, load)
+
+    async def alazy_load(self) -> AsyncIterator[Document]:
+        """Async lazy load documents, yielding each document's chunks as soon as that
+        document is parsed. In remote mode, documents are downloaded with an async
+        HTTP client, with at most max_concurrency requests in flight."""
+        async for doc_chunks in self._alazy_load_document_chunks():
+            for chunk in doc_chunks:
+                yield chunk
+
+    async def aload(self) -> list[Document]:
+        """Async load documents."""
+        return [chunk async for chunk in self.alazy_load()]
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional, Union
+
+MANIFEST_FORMAT_VERSION = 1
+
+
+def document_version(document_details: dict) -> str:
+    """
+    Fingerprint of a document's details (as returned by the Docugami API), which
+    changes whenever the document is modified or re-processed.
+    """
+    serialized = json.dumps(document_details, sort_keys=True, default=str)
+    return hashlib.md5(serialized.encode()).hexdigest()
+
+
+def params_version(params: Any) -> str:
+    """Fingerprint of the (JSON serializable) settings used to chunk documents."""
+    serialized = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.md5(serialized.encode()).hexdigest()
+
+
+@dataclass
+class DocsetSyncResult:
+    """Changes in a docset since it was last synced."""
+
+    new_document_ids: list[str] = field(default_factory=list)
+    changed_document_ids: list[str] = field(default_factory=list)
+    unchanged_document_ids: list[str] = field(default_factory=list)
+    deleted_document_ids: list[str] = field(default_factory=list)
+
+    @property
+    def document_ids_to_load(self) -> set[str]:
+        return set(self.new_document_ids + self.changed_document_ids)
+
+
+@dataclass
+class DocsetManifest:
+    """
+    Local record of the version of each document in a docset that was last loaded,
+    persisted as JSON, used to incrementally sync docsets.
+    """
+
+    path: Path
+    params_version: str = ""
+    documents: dict[str, dict] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Union[Path, str]) -> "DocsetManifest":
+        """Loads the manifest at the given path, or an empty one if none exists yet."""
+        path = Path(path)
+        if not path.exists():
+            return cls(path=path)
+
+        with open(path, "r", encoding="utf-8") as in_f:
+            data = json.load(in_f)
+
+        return cls(
+            path=path,
+            params_version=data.get("params_version", ""),
+            documents=data.get("documents", {}),
+        )
+
+    def save(self) -> None:
+        """Atomically writes the manifest to its path."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as out_f:
+            json.dump(
+                {
+                    "format_version": MANIFEST_FORMAT_VERSION,
+                    "params_version": self.params_version,
+                    "documents": self.documents,
+                },
+                out_f,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
+
+    def diff(
+        self,
+        document_details: list[dict],
+        params_version: str,
+        id_key: str = "id",
+    ) -> DocsetSyncResult:
+        """
+        Compares the given (current) document details with the manifest. If documents
+        were last loaded with different settings, they are all considered changed.
+        """
+        result = DocsetSyncResult()
+        params_changed = params_version != self.params_version
+        current_ids: set[str] = set()
+        for details in document_details:
+            doc_id = details[id_key]
+            current_ids.add(doc_id)
+            entry: Optional[dict] = self.documents.get(doc_id)
+            if not entry:
+                result.new_document_ids.append(doc_id)
+            elif params_changed or entry.get("version") != document_version(details):
+                result.changed_document_ids.append(doc_id)
+            else:
+                result.unchanged_document_ids.append(doc_id)
+
+        result.deleted_document_ids = [
+            doc_id for doc_id in self.documents if doc_id not in current_ids
+        ]
+        return result
+
+    def record(self, document_details: dict, id_key: str = "id") -> None:
+        """Records the given version of a document as loaded."""
+        self.documents[document_details[id_key]] = {
+            "version": document_version(document_details),
+            "name": document_details.get("name"),
+        }
+
+    def remove(self, document_ids: list[str]) -> None:
+        for doc_id in document_ids:
+            self.documents.pop(doc_id, None)
@@ -1,25 +1,39 @@
+import asyncio
+import hashlib
+import json
 from dataclasses import dataclass
 from enum import Enum
-from typing import Callable, Optional
+from typing import Any, Awaitable, Callable, Optional, Sequence
 
 import numpy as np
-from langchain_core.callbacks.manager import CallbackManagerForRetrieverRun
+from langchain_core.callbacks.manager import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
 from langchain_core.documents import Document
 from langchain_core.pydantic_v1 import Field
 from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables.config import run_in_executor
 from langchain_core.vectorstores import VectorStore
 from rerankers.models.ranker import BaseRanker
+from rerankers.results import RankedResults
 
 from docugami_langchain.config import (
     ________SINGLE_TOKEN_LINE________,
     DEFAULT_RETRIEVER_K,
 )
+from docugami_langchain.utils.lru_cache import MISSING, LRUCache
 
 PARENT_DOC_ID_KEY = "doc_id"
 FULL_DOC_SUMMARY_ID_KEY = "full_doc_id"
 SOURCE_KEY = "source"
 
 FusedRetrieverKeyValueFetchCallback = Callable[[str], Optional[str]]
+FusedRetrieverKeyValueMultiFetchCallback = Callable[[list[str]], list[Optional[str]]]
+FusedRetrieverAsyncKeyValueFetchCallback = Callable[[str], Awaitable[Optional[str]]]
+FusedRetrieverAsyncKeyValueMultiFetchCallback = Callable[
+    [list[str]], Awaitable[list[Optional[str]]]
+]
 
 
 class SearchType(str, Enum):
@@ -39,6 +53,17 @@ class FusedDocumentElements:
     source: str
 
 
+@dataclass(frozen=True)
+class FusedRetrievalOptions:
+    """Settings for a single retrieval (see FusedSummaryRetriever.retrieval_options)."""
+
+    search_type: SearchType
+    search_kwargs: dict
+    re_rank_filter_percentile: float
+    re_rank_max_candidates: Optional[int] = None
+    re_rank_min_relevance_score: Optional[float] = None
+
+
 DOCUMENT_SUMMARY_TEMPLATE: str = (
     "\n"
     + ________SINGLE_TOKEN_LINE________
@@ -80,12 +105,42 @@ class FusedSummaryRetriever(BaseRetriever):
     re_ranker: Optional[BaseRanker] = None
     """Re-ranker used to filter relevant results from the Vector DB."""
 
+    re_rank_max_candidates: Optional[int] = None
+    """If set, only this many top results from the Vector DB (in search order) are
+    re-ranked, and the rest dropped, to bound re-ranker latency per query."""
+
+    re_rank_min_relevance_score: Optional[float] = None
+    """If set, results from the Vector DB with a relevance score (0 to 1) below this
+    are dropped before re-ranking. Only applies to similarity search, since MMR
+    search does not return scores."""
+
+    re_rank_score_cache: Optional[LRUCache[tuple[str, str], float]] = None
+    """Optional cache of re-rank scores by query and chunk hash, so repeated queries
+    (including concurrent ones) only re-rank chunks not already scored for them."""
+
     parent_id_key: str = PARENT_DOC_ID_KEY
     """Metadata key for parent doc ID (maps chunk summaries in the vector store to parent / unsummarized chunks)."""
 
     fetch_parent_doc_callback: Optional[FusedRetrieverKeyValueFetchCallback] = None
     """Callback to fetch parent docs by ID key."""
 
+    fetch_parent_docs_callback: Optional[FusedRetrieverKeyValueMultiFetchCallback] = (
+        None
+    )
+    """Callback to fetch parent docs for a list of ID keys in one call (values in the
+    same order as the keys, like BaseStore.mget). Preferred over the per-ID
+    fetch_parent_doc_callback if both are set."""
+
+    afetch_parent_doc_callback: Optional[FusedRetrieverAsyncKeyValueFetchCallback] = (
+        None
+    )
+    """Async callback to fetch parent docs by ID key, for async retrieval."""
+
+    afetch_parent_docs_callback: Optional[
+        FusedRetrieverAsyncKeyValueMultiFetchCallback
+    ] = None
+    """Async version of fetch_parent_docs_callback, for async retrieval."""
+
     full_doc_summary_id_key: str = FULL_DOC_SUMMARY_ID_KEY
     """Metadata key for full doc summary ID (maps chunk summaries in the vector store to full doc summaries)."""
 
@@ -94,6 +149,23 @@ class FusedSummaryRetriever(BaseRetriever):
     )
     """Callback to fetch full doc summaries by ID key."""
 
+    fetch_full_doc_summaries_callback: Optional[
+        FusedRetrieverKeyValueMultiFetchCallback
+    ] = None
+    """Callback to fetch full doc summaries for a list of ID keys in one call (values
+    in the same order as the keys, like BaseStore.mget). Preferred over the per-ID
+    fetch_full_doc_summary_callback if both are set."""
+
+    afetch_full_doc_summary_callback: Optional[
+        FusedRetrieverAsyncKeyValueFetchCallback
+    ] = None
+    """Async callback to fetch full doc summaries by ID key, for async retrieval."""
+
+    afetch_full_doc_summaries_callback: Optional[
+        FusedRetrieverAsyncKeyValueMultiFetchCallback
+    ] = None
+    """Async version of fetch_full_doc_summaries_callback, for async retrieval."""
+
     source_key: str = SOURCE_KEY
     """Metadata key for source document of chunks."""
 
@@ -103,87 +175,260 @@ class FusedSummaryRetriever(BaseRetriever):
     search_type: SearchType = SearchType.mmr
     """Type of search to perform (similarity / mmr)"""
 
-    def _get_relevant_documents(
-        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
-    ) -> list[Document]:
-        """Get documents relevant to a query.
-        Args:
-            query: String to find relevant documents for
-            run_manager: The callbacks handler to use
-        Returns:
-            List of relevant documents
-        """
+    query_cache: Optional[LRUCache[str, list[Document]]] = None
+    """Optional cache of fused results, by normalized query and search settings."""
 
-        if not self.search_kwargs:
-            self.search_kwargs = {}
+    fetch_cache: Optional[LRUCache[tuple[str, str], Optional[str]]] = None
+    """Optional cache of fetched parent docs and full doc summaries, by ID key
+    (including IDs not found, as None)."""
 
-        if "k" not in self.search_kwargs:
-            self.search_kwargs["k"] = self.retriever_k
+    def invalidate_caches(self) -> None:
+        """Clears the query and fetch caches, e.g. after the docset is re-indexed."""
+        if self.query_cache is not None:
+            self.query_cache.clear()
+        if self.fetch_cache is not None:
+            self.fetch_cache.clear()
 
-        if self.search_type == SearchType.mmr:
-            sub_docs = self.vectorstore.max_marginal_relevance_search(
-                query, **self.search_kwargs
+    def retrieval_options(self, **kwargs: Any) -> FusedRetrievalOptions:
+        """
+        Options for a single retrieval: the settings of this retriever, with any of
+        search_type, the re_rank_* settings or search kwargs (e.g. k, fetch_k,
+        filter) overridden by the given keyword arguments. These can be passed per
+        call, e.g. retriever.invoke(query, k=8, filter={...}), without changing the
+        retriever, so one instance can serve concurrent queries with different
+        settings.
+        """
+        search_type = SearchType(kwargs.pop("search_type", self.search_type))
+        re_rank_filter_percentile = kwargs.pop(
+            "re_rank_filter_percentile", self.re_rank_filter_percentile
+        )
+        re_rank_max_candidates = kwargs.pop(
+            "re_rank_max_candidates", self.re_rank_max_candidates
+        )
+        re_rank_min_relevance_score = kwargs.pop(
+            "re_rank_min_relevance_score", self.re_rank_min_relevance_score
+        )
+        search_kwargs = {"k": self.retriever_k, **(self.search_kwargs or {}), **kwargs}
+        return FusedRetrievalOptions(
+            search_type=search_type,
+            search_kwargs=search_kwargs,
+            re_rank_filter_percentile=re_rank_filter_percentile,
+            re_rank_max_candidates=re_rank_max_candidates,
+            re_rank_min_relevance_score=re_rank_min_relevance_score,
+        )
+
+    def _query_cache_key(self, query: str, options: FusedRetrievalOptions) -> str:
+        return json.dumps(
+            [
+                " ".join(query.split()).lower(),
+                options.search_type,
+                options.search_kwargs,
+                options.re_rank_filter_percentile,
+                options.re_rank_max_candidates,
+                options.re_rank_min_relevance_score,
+                self.re_ranker.__class__.__name__ if self.re_ranker else None,
+            ],
+            sort_keys=True,
+            default=str,
+        )
+
+    def _cached_query_results(
+        self, query: str, options: FusedRetrievalOptions
+    ) -> Optional[list[Document]]:
+        if self.query_cache is None:
+            return None
+        cached = self.query_cache.get(self._query_cache_key(query, options), MISSING)
+        if cached is MISSING:
+            return None
+        return [doc.copy(deep=True) for doc in cached]
+
+    def _cache_query_results(
+        self, query: str, options: FusedRetrievalOptions, docs: list[Document]
+    ) -> list[Document]:
+        if self.query_cache is not None:
+            self.query_cache.put(
+                self._query_cache_key(query, options),
+                [doc.copy(deep=True) for doc in docs],
             )
-        else:
-            sub_docs = self.vectorstore.similarity_search(query, **self.search_kwargs)
-
-        if self.re_ranker:
-            # Re-rank
-            doc_contents = [doc.page_content for doc in sub_docs]
-            ranked_results = self.re_ranker.rank(
-                query=query, docs=doc_contents, doc_ids=list(range(len(sub_docs)))
-            )
-
-            if ranked_results.has_scores:
-                # We have scores from the re-ranker, great!
-                # We should get the best scoring sub-docs by percentile
-                scores_by_ranker_id = {
-                    result.doc_id: result.score for result in ranked_results.results
-                }
-                score_threshold = np.percentile(
-                    [float(s) for s in scores_by_ranker_id.values()],
-                    self.re_rank_filter_percentile,
-                )
-                filtered_sub_docs = [
-                    doc
-                    for idx, doc in enumerate(sub_docs)
-                    if scores_by_ranker_id[idx] >= score_threshold
-                ]
-            else:
-                # This re-ranker didn't return scores.
-                # Just use the direct rank on each result.
-                ranks_by_ranker_id = {
-                    result.doc_id: result.rank for result in ranked_results.results
-                }
-                rank_cutoff = len(ranks_by_ranker_id) * (
-                    1 - self.re_rank_filter_percentile / 100
+        return docs
+
+    def _cached_values(
+        self, kind: str, ids: Sequence[Optional[str]]
+    ) -> tuple[dict[str, Optional[str]], list[str]]:
+        """Values for the given IDs found in the fetch cache, and distinct IDs not."""
+        unique_ids: list[str] = list(dict.fromkeys(id for id in ids if id))
+        if self.fetch_cache is None:
+            return {}, unique_ids
+
+        cached: dict[str, Optional[str]] = {}
+        for id in unique_ids:
+            value = self.fetch_cache.get((kind, id), MISSING)
+            if value is not MISSING:
+                cached[id] = value
+        return cached, [id for id in unique_ids if id not in cached]
+
+    def _cache_values(
+        self, kind: str, values: dict[str, Optional[str]]
+    ) -> dict[str, Optional[str]]:
+        if self.fetch_cache is not None:
+            for id, value in values.items():
+                self.fetch_cache.put((kind, id), value)
+        return values
+
+    @staticmethod
+    def _fetch_all(
+        ids: Sequence[Optional[str]],
+        multi_fetch_callback: Optional[FusedRetrieverKeyValueMultiFetchCallback],
+        fetch_callback: Optional[FusedRetrieverKeyValueFetchCallback],
+    ) -> dict[str, Optional[str]]:
+        """
+        Fetches values for the given IDs, fetching each distinct ID once: in one bulk
+        call if a multi fetch callback is given, else one call per ID.
+        """
+        unique_ids: list[str] = list(dict.fromkeys(id for id in ids if id))
+        if not unique_ids:
+            return {}
+        if multi_fetch_callback:
+            return dict(zip(unique_ids, multi_fetch_callback(unique_ids)))
+        if fetch_callback:
+            return {id: fetch_callback(id) for id in unique_ids}
+        return {}
+
+    @classmethod
+    async def _afetch_all(
+        cls,
+        ids: Sequence[Optional[str]],
+        async_multi_fetch_callback: Optional[
+            FusedRetrieverAsyncKeyValueMultiFetchCallback
+        ],
+        async_fetch_callback: Optional[FusedRetrieverAsyncKeyValueFetchCallback],
+        multi_fetch_callback: Optional[FusedRetrieverKeyValueMultiFetchCallback],
+        fetch_callback: Optional[FusedRetrieverKeyValueFetchCallback],
+    ) -> dict[str, Optional[str]]:
+        """
+        Async version of _fetch_all, preferring async callbacks (with per-ID fetches
+        run concurrently) and falling back to the sync callbacks in an executor.
+        """
+        unique_ids: list[str] = list(dict.fromkeys(id for id in ids if id))
+        if not unique_ids:
+            return {}
+        if async_multi_fetch_callback:
+            return dict(zip(unique_ids, await async_multi_fetch_callback(unique_ids)))
+        if async_fetch_callback:
+            values = await asyncio.gather(
+                *[async_fetch_callback(id) for id in unique_ids]
+            )
+            return dict(zip(unique_ids, values))
+        return await run_in_executor(
+            None, cls._fetch_all, unique_ids, multi_fetch_callback, fetch_callback
+        )
+
+    def _re_rank_score_key(self, query: str, doc: Document) -> tuple[str, str]:
+        return (
+            hashlib.md5(" ".join(query.split()).lower().encode()).hexdigest(),
+            hashlib.md5(doc.page_content.encode()).hexdigest(),
+        )
+
+    def _re_rank_candidates(
+        self,
+        query: str,
+        sub_docs: list[Document],
+        options: FusedRetrievalOptions,
+    ) -> tuple[list[Document], dict[int, float]]:
+        """
+        First, cheap re-ranking stage: bounds the sub-docs to re-rank (see
+        re_rank_max_candidates), and looks up any cached re-rank scores for them
+        by sub-doc index.
+        """
+        if options.re_rank_max_candidates is not None:
+            sub_docs = sub_docs[: max(options.re_rank_max_candidates, 1)]
+
+        cached_scores: dict[int, float] = {}
+        if self.re_rank_score_cache is not None:
+            for idx, doc in enumerate(sub_docs):
+                score = self.re_rank_score_cache.get(
+                    self._re_rank_score_key(query, doc)
                 )
-                rank_cutoff = int(rank_cutoff)
-                # Take at least the top result if too few results.
-                rank_cutoff = rank_cutoff or 1
-
-                filtered_sub_docs = [
-                    doc
-                    for idx, doc in enumerate(sub_docs)
-                    if ranks_by_ranker_id[idx] <= rank_cutoff
-                ]
-
-            sub_docs = filtered_sub_docs
+                if score is not None:
+                    cached_scores[idx] = score
+
+        return sub_docs, cached_scores
+
+    def _filter_re_ranked(
+        self,
+        query: str,
+        sub_docs: list[Document],
+        cached_scores: dict[int, float],
+        ranked_results: Optional[RankedResults],
+        re_rank_filter_percentile: float,
+    ) -> list[Document]:
+        """
+        Keeps the sub-docs above the re-rank filter percentile, given cached scores
+        and re-ranked results for the rest (if any).
+        """
+        if not sub_docs:
+            return []
+
+        if ranked_results is None or ranked_results.has_scores:
+            # We have scores from the re-ranker, great!
+            # We should get the best scoring sub-docs by percentile
+            scores_by_ranker_id = dict(cached_scores)
+            for result in ranked_results.results if ranked_results else []:
+                idx = int(result.doc_id)
+                scores_by_ranker_id[idx] = float(result.score or 0)
+                if self.re_rank_score_cache is not None:
+                    self.re_rank_score_cache.put(
+                        self._re_rank_score_key(query, sub_docs[idx]),
+                        scores_by_ranker_id[idx],
+                    )
 
+            score_threshold = np.percentile(
+                list(scores_by_ranker_id.values()),
+                re_rank_filter_percentile,
+            )
+            filtered_sub_docs = [
+                doc
+                for idx, doc in enumerate(sub_docs)
+                if scores_by_ranker_id[idx] >= score_threshold
+            ]
+        else:
+            # This re-ranker didn't return scores.
+            # Just use the direct rank on each result.
+            ranks_by_ranker_id = {
+                result.doc_id: result.rank for result in ranked_results.results
+            }
+            rank_cutoff = len(ranks_by_ranker_id) * (
+                1 - re_rank_filter_percentile / 100
+            )
+            rank_cutoff = int(rank_cutoff)
+            # Take at least the top result if too few results.
+            rank_cutoff = rank_cutoff or 1
+
+            filtered_sub_docs = [
+                doc
+                for idx, doc in enumerate(sub_docs)
+                if ranks_by_ranker_id[idx] <= rank_cutoff
+            ]
+
+        return filtered_sub_docs
+
+    def _fuse(
+        self,
+        sub_docs: list[Document],
+        parents_by_id: dict[str, Optional[str]],
+        full_doc_summaries_by_id: dict[str, Optional[str]],
+    ) -> list[Document]:
+        """Fuses sub-docs by full document, with their parents and doc summaries."""
         fused_doc_elements: dict[str, FusedDocumentElements] = {}
         for i, sub_doc in enumerate(sub_docs):
             parent_id = sub_doc.metadata.get(self.parent_id_key)
             full_doc_summary_id = sub_doc.metadata.get(self.full_doc_summary_id_key)
-            parent: Optional[str] = None
-            full_doc_summary: Optional[str] = None
-
-            if parent_id and self.fetch_parent_doc_callback:
-                parent = self.fetch_parent_doc_callback(parent_id)
-
-            if full_doc_summary_id and self.fetch_full_doc_summary_callback:
-                full_doc_summary = self.fetch_full_doc_summary_callback(
-                    full_doc_summary_id
-                )
+            parent = parents_by_id.get(parent_id) if parent_id else None
+            full_doc_summary = (
+                full_doc_summaries_by_id.get(full_doc_summary_id)
+                if full_doc_summary_id
+                else None
+            )
 
             source: str = sub_doc.metadata.get(self.source_key, "")
             key = full_doc_summary_id if full_doc_summary_id else "-1"
@@ -214,3 +459,199 @@ class FusedSummaryRetriever(BaseRetriever):
             )
 
         return fused_docs
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+        **kwargs: Any,
+    ) -> list[Document]:
+        """Get documents relevant to a query.
+        Args:
+            query: String to find relevant documents for
+            run_manager: The callbacks handler to use
+            kwargs: Per-call retrieval options (see retrieval_options)
+        Returns:
+            List of relevant documents
+        """
+        options = self.retrieval_options(**kwargs)
+        cached_docs = self._cached_query_results(query, options)
+        if cached_docs is not None:
+            return cached_docs
+
+        search_kwargs = options.search_kwargs
+        if options.search_type == SearchType.mmr:
+            sub_docs = self.vectorstore.max_marginal_relevance_search(
+                query, **search_kwargs
+            )
+        elif self.re_ranker and options.re_rank_min_relevance_score is not None:
+            # Drop low relevance results before re-ranking
+            docs_and_scores = self.vectorstore.similarity_search_with_relevance_scores(
+                query, **search_kwargs
+            )
+            sub_docs = [
+                doc
+                for doc, score in docs_and_scores
+                if score >= options.re_rank_min_relevance_score
+            ]
+        else:
+            sub_docs = self.vectorstore.similarity_search(query, **search_kwargs)
+
+        if self.re_ranker:
+            # Re-rank, skipping sub-docs with cached scores
+            sub_docs, cached_scores = self._re_rank_candidates(
+                query, sub_docs, options
+            )
+            ids_to_rank = [
+                idx for idx in range(len(sub_docs)) if idx not in cached_scores
+            ]
+            ranked_results = None
+            if ids_to_rank:
+                ranked_results = self.re_ranker.rank(
+                    query=query,
+                    docs=[sub_docs[idx].page_content for idx in ids_to_rank],
+                    doc_ids=ids_to_rank,
+                )
+            sub_docs = self._filter_re_ranked(
+                query,
+                sub_docs,
+                cached_scores,
+                ranked_results,
+                options.re_rank_filter_percentile,
+            )
+
+        parents_by_id, parent_ids_to_fetch = self._cached_values(
+            PARENT_DOC_ID_KEY,
+            [doc.metadata.get(self.parent_id_key) for doc in sub_docs],
+        )
+        parents_by_id.update(
+            self._cache_values(
+                PARENT_DOC_ID_KEY,
+                self._fetch_all(
+                    parent_ids_to_fetch,
+                    self.fetch_parent_docs_callback,
+                    self.fetch_parent_doc_callback,
+                ),
+            )
+        )
+        full_doc_summaries_by_id, summary_ids_to_fetch = self._cached_values(
+            FULL_DOC_SUMMARY_ID_KEY,
+            [doc.metadata.get(self.full_doc_summary_id_key) for doc in sub_docs],
+        )
+        full_doc_summaries_by_id.update(
+            self._cache_values(
+                FULL_DOC_SUMMARY_ID_KEY,
+                self._fetch_all(
+                    summary_ids_to_fetch,
+                    self.fetch_full_doc_summaries_callback,
+                    self.fetch_full_doc_summary_callback,
+                ),
+            )
+        )
+
+        return self._cache_query_results(
+            query,
+            options,
+            self._fuse(sub_docs, parents_by_id, full_doc_summaries_by_id),
+        )
+
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: AsyncCallbackManagerForRetrieverRun,
+        **kwargs: Any,
+    ) -> list[Document]:
+        """Asynchronously get documents relevant to a query.
+        Args:
+            query: String to find relevant documents for
+            run_manager: The callbacks handler to use
+            kwargs: Per-call retrieval options (see retrieval_options)
+        Returns:
+            List of relevant documents
+        """
+        options = self.retrieval_options(**kwargs)
+        cached_docs = self._cached_query_results(query, options)
+        if cached_docs is not None:
+            return cached_docs
+
+        search_kwargs = options.search_kwargs
+        if options.search_type == SearchType.mmr:
+            sub_docs = await self.vectorstore.amax_marginal_relevance_search(
+                query, **search_kwargs
+            )
+        elif self.re_ranker and options.re_rank_min_relevance_score is not None:
+            # Drop low relevance results before re-ranking
+            docs_and_scores = (
+                await self.vectorstore.asimilarity_search_with_relevance_scores(
+                    query, **search_kwargs
+                )
+            )
+            sub_docs = [
+                doc
+                for doc, score in docs_and_scores
+                if score >= options.re_rank_min_relevance_score
+            ]
+        else:
+            sub_docs = await self.vectorstore.asimilarity_search(
+                query, **search_kwargs
+            )
+
+        if self.re_ranker:
+            # Re-rank, skipping sub-docs with cached scores
+            sub_docs, cached_scores = self._re_rank_candidates(
+                query, sub_docs, options
+            )
+            ids_to_rank = [
+                idx for idx in range(len(sub_docs)) if idx not in cached_scores
+            ]
+            ranked_results = None
+            if ids_to_rank:
+                ranked_results = await self.re_ranker.rank_async(
+                    query=query,
+                    docs=[sub_docs[idx].page_content for idx in ids_to_rank],
+                    doc_ids=ids_to_rank,  # type: ignore[arg-type]
+                )
+            sub_docs = self._filter_re_ranked(
+                query,
+                sub_docs,
+                cached_scores,
+                ranked_results,
+                options.re_rank_filter_percentile,
+            )
+
+        parents_by_id, parent_ids_to_fetch = self._cached_values(
+            PARENT_DOC_ID_KEY,
+            [doc.metadata.get(self.parent_id_key) for doc in sub_docs],
+        )
+        full_doc_summaries_by_id, summary_ids_to_fetch = self._cached_values(
+            FULL_DOC_SUMMARY_ID_KEY,
+            [doc.metadata.get(self.full_doc_summary_id_key) for doc in sub_docs],
+        )
+        fetched_parents, fetched_full_doc_summaries = await asyncio.gather(
+            self._afetch_all(
+                parent_ids_to_fetch,
+                self.afetch_parent_docs_callback,
+                self.afetch_parent_doc_callback,
+                self.fetch_parent_docs_callback,
+                self.fetch_parent_doc_callback,
+            ),
+            self._afetch_all(
+                summary_ids_to_fetch,
+                self.afetch_full_doc_summaries_callback,
+                self.afetch_full_doc_summary_callback,
+                self.fetch_full_doc_summaries_callback,
+                self.fetch_full_doc_summary_callback,
+            ),
+        )
+        parents_by_id.update(self._cache_values(PARENT_DOC_ID_KEY, fetched_parents))
+        full_doc_summaries_by_id.update(
+            self._cache_values(FULL_DOC_SUMMARY_ID_KEY, fetched_full_doc_summaries)
+        )
+
+        return self._cache_query_results(
+            query,
+            options,
+            self._fuse(sub_docs, parents_by_id, full_doc_summaries_by_id),
+        )
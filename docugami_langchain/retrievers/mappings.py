@@ -1,154 +1,1236 @@
+import asyncio
 import hashlib
+import itertools
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Union
+from typing import AsyncIterator, Iterable, Iterator, Mapping, Optional, Union
 
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 from langchain_core.language_models import BaseLanguageModel
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import run_in_executor
 
 from docugami_langchain.chains import SummarizeChunkChain, SummarizeDocumentChain
 from docugami_langchain.config import (
+    DEFAULT_SUMMARY_BATCH_SIZE,
+    DEFAULT_SUMMARY_MAX_CONCURRENCY,
     INCLUDE_XML_TAGS,
     MAX_CHUNK_TEXT_LENGTH,
     MAX_FULL_DOCUMENT_TEXT_LENGTH,
+    MAX_IN_MEMORY_FULL_DOCUMENT_LENGTH,
     MIN_LENGTH_TO_SUMMARIZE,
+    SPILL_WRITE_BUFFER_LENGTH,
 )
 from docugami_langchain.retrievers.fused_summary import (
     FULL_DOC_SUMMARY_ID_KEY,
     PARENT_DOC_ID_KEY,
     SOURCE_KEY,
 )
+from docugami_langchain.retrievers.summary_cache import (
+    SummaryCache,
+    summary_cache_key,
+    summary_cache_version,
+)
+from docugami_langchain.retrievers.summary_stats import SummaryInstrumentation
+from docugami_langchain.utils.concurrency import unordered_map
+from docugami_langchain.utils.scheduler import BatchScheduler, estimate_tokens
+
+_SummarizeChain = Union[SummarizeChunkChain, SummarizeDocumentChain]
+
+logger = logging.getLogger(__name__)
+
+
+def _summary_format(include_xml_tags: bool) -> str:
+    return (
+        "text"
+        if not include_xml_tags
+        else "semantic XML without any namespaces or attributes"
+    )
+
+
+def _summary_document(id: str, doc: Document, summary: str) -> Document:
+    """Wraps a summary of the given document, pointing back to it by ID."""
+    summary_id = hashlib.md5(summary.encode()).hexdigest()
+    meta = doc.metadata
+    meta["id"] = summary_id
+    meta[PARENT_DOC_ID_KEY] = id
+
+    return Document(
+        page_content=summary,
+        metadata=meta,
+    )
+
+
+def _owner_summary_documents(
+    id: str, docs_by_id: Mapping[str, Document], summary: str
+) -> Iterator[tuple[str, Document]]:
+    """
+    Wraps a summary of the given document for each of its owners (see ParentChunks),
+    so chunks shared by several documents are indexed once per document. The first
+    owner's summary is keyed by the document ID, and the rest by
+    "{id}/owner/{index}" (all point back to the document ID via PARENT_DOC_ID_KEY).
+    """
+    owners = (
+        docs_by_id.owners(id)
+        if isinstance(docs_by_id, ParentChunks)
+        else [docs_by_id[id]]
+    )
+    for index, owner in enumerate(owners):
+        key = f"{id}/owner/{index}" if index else id
+        yield key, _summary_document(id, owner, summary)
+
+
+@dataclass
+class SummaryFailure:
+    id: str
+    """ID of the document that could not be summarized."""
+
+    error: str
+    """The last error raised by the LLM."""
+
+    attempts: int
+
+
+@dataclass
+class SummaryFailureReport:
+    """
+    Pass to the summary mapping builders to tolerate failed LLM calls, instead of
+    failing the whole build. Failed summaries are retried with exponential backoff
+    (all those failed in a batch retried together), and documents that still fail
+    fall back to their raw text (truncated to fallback_length) and are recorded in
+    failures. When a BatchScheduler is also given, it retries failed summaries
+    instead (up to its own max_retries), backing off its concurrency.
+    """
+
+    max_retries: int = 2
+    retry_backoff_seconds: float = 1.0
+    fallback_length: int = MIN_LENGTH_TO_SUMMARIZE
+
+    failures: list[SummaryFailure] = field(default_factory=list)
+
+    def backoff_seconds(self, attempt: int) -> float:
+        return self.retry_backoff_seconds * 2 ** (attempt - 1)
+
+    def failed(self, id: str, error: BaseException, attempts: int) -> None:
+        logger.warning(
+            f"Falling back to raw text for {id} after {attempts} failed attempts "
+            f"to summarize: {error}"
+        )
+        self.failures.append(
+            SummaryFailure(id=id, error=repr(error), attempts=attempts)
+        )
+
+    def retry(
+        self,
+        chain: _SummarizeChain,
+        ids: list[str],
+        inputs: list[tuple[str, str]],
+        config: RunnableConfig,
+        summaries: list[Union[str, Exception]],
+        instrumentation: Optional[SummaryInstrumentation] = None,
+    ) -> list[Optional[str]]:
+        """
+        Retries the given summaries that failed (i.e. are exceptions), returning None
+        for those that still fail after max_retries. All failed summaries are retried
+        together, in one batch per attempt after a single backoff.
+        """
+        results = list(summaries)
+        for attempt in range(1, self.max_retries + 1):
+            failed = [i for i, r in enumerate(results) if isinstance(r, Exception)]
+            if not failed:
+                break
+            time.sleep(self.backoff_seconds(attempt))
+            if instrumentation:
+                instrumentation.record_retries(len(failed))
+            retried = chain.run_batch_with_exceptions(
+                [inputs[i] for i in failed], config
+            )
+            for i, result in zip(failed, retried):
+                results[i] = result
+
+        retried_summaries: list[Optional[str]] = []
+        for id, result in zip(ids, results):
+            if isinstance(result, Exception):
+                self.failed(id, result, self.max_retries + 1)
+                retried_summaries.append(None)
+            else:
+                retried_summaries.append(result)
+        return retried_summaries
+
+
+def _batch_config(
+    instrumentation: Optional[SummaryInstrumentation],
+) -> RunnableConfig:
+    return RunnableConfig(callbacks=[instrumentation] if instrumentation else None)
+
+
+@dataclass
+class _SummaryPlan:
+    """Which documents need LLM summaries, after short, duplicate and cached ones."""
+
+    precomputed: list[tuple[str, str]] = field(default_factory=list)
+    """(id, summary text) for short (passed through) and cached summaries."""
+
+    ids_to_summarize: list[str] = field(default_factory=list)
+    """IDs of documents with distinct contents that need summarizing by the LLM.
+    Their contents are not held in the plan, but loaded as each batch is sent."""
+
+    duplicate_ids_by_id: dict[str, list[str]] = field(default_factory=dict)
+    """All IDs sharing the contents of each document to summarize (incl. itself)."""
+
+    token_estimates_by_id: dict[str, int] = field(default_factory=dict)
+
+    cache_keys_by_id: dict[str, str] = field(default_factory=dict)
+
+    num_short: int = 0
+    num_cached: int = 0
+
+    def report_planned(
+        self, total: int, instrumentation: Optional[SummaryInstrumentation]
+    ) -> None:
+        if instrumentation:
+            instrumentation.planned(
+                total=total,
+                skipped_short=self.num_short,
+                cached=self.num_cached,
+                deduplicated=sum(
+                    len(self.duplicate_ids_by_id[id]) - 1
+                    for id in self.ids_to_summarize
+                ),
+            )
+
+    def completed(
+        self,
+        summaries: list[tuple[str, Optional[str]]],
+        docs_by_id: Mapping[str, Document],
+        summary_cache: Optional[SummaryCache],
+        instrumentation: Optional[SummaryInstrumentation],
+        failure_report: Optional[SummaryFailureReport],
+    ) -> Iterator[tuple[str, str]]:
+        """
+        Caches the given completed summaries, and fans them out to duplicates. Failed
+        summaries (None) fall back to the truncated raw text, and are not cached.
+        """
+        succeeded = [(id, summary) for id, summary in summaries if summary is not None]
+        num_failed = len(summaries) - len(succeeded)
+        if summary_cache and succeeded:
+            summary_cache.update(
+                {self.cache_keys_by_id[id]: summary for id, summary in succeeded}
+            )
+        if instrumentation:
+            if succeeded:
+                instrumentation.summarized(len(succeeded))
+            if num_failed:
+                instrumentation.failed(num_failed)
+
+        for id, summary in summaries:
+            if summary is None:
+                fallback_length = failure_report.fallback_length  # type: ignore
+                summary = docs_by_id[id].page_content[:fallback_length]
+            for duplicate_id in self.duplicate_ids_by_id[id]:
+                yield duplicate_id, summary
+
+
+def _plan_summaries(
+    docs_by_id: Mapping[str, Document],
+    chain: _SummarizeChain,
+    format: str,
+    summary_cache: Optional[SummaryCache] = None,
+) -> _SummaryPlan:
+    """
+    Plans summaries for all the given documents. Only documents long enough to need
+    summarizing are sent to the LLM, and if a summary cache is given only those
+    without a cached summary (e.g. new or changed since the last run).
+
+    Each document is read once here, and only its ID, content hash, token estimate
+    and cache key are kept.
+    """
+    plan = _SummaryPlan()
+    cache_version = (
+        summary_cache_version(format, chain) if summary_cache is not None else None
+    )
+
+    # Short contents are passed through unsummarized by the chain anyway (see
+    # SummarizeChunkChain.runnable), so skip sending them through the LLM batch.
+    # Identical long contents under different IDs are only summarized once, and the
+    # summary is shared by all their IDs.
+    first_id_by_contents_hash: dict[str, str] = {}
+    for id, doc in docs_by_id.items():
+        page_content = doc.page_content
+        contents = page_content[: chain.input_params_max_length_cutoff]
+        if len(contents) <= chain.min_length_to_summarize:
+            plan.precomputed.append((id, contents))
+            plan.num_short += 1
+            continue
+
+        contents_hash = hashlib.md5(page_content.encode()).hexdigest()
+        if contents_hash in first_id_by_contents_hash:
+            first_id = first_id_by_contents_hash[contents_hash]
+            plan.duplicate_ids_by_id[first_id].append(id)
+            continue
+
+        first_id_by_contents_hash[contents_hash] = id
+        plan.duplicate_ids_by_id[id] = [id]
+        plan.ids_to_summarize.append(id)
+        plan.token_estimates_by_id[id] = estimate_tokens(contents)
+        if cache_version is not None:
+            plan.cache_keys_by_id[id] = summary_cache_key(page_content, cache_version)
+
+    if summary_cache and plan.cache_keys_by_id:
+        cached_summaries = summary_cache.lookup(list(plan.cache_keys_by_id.values()))
+        for id, key in plan.cache_keys_by_id.items():
+            if key in cached_summaries:
+                for duplicate_id in plan.duplicate_ids_by_id[id]:
+                    plan.precomputed.append((duplicate_id, cached_summaries[key]))
+                    plan.num_cached += 1
+        plan.ids_to_summarize = [
+            id
+            for id in plan.ids_to_summarize
+            if plan.cache_keys_by_id[id] not in cached_summaries
+        ]
+
+    return plan
+
+
+def _summary_input(
+    id: str, docs_by_id: Mapping[str, Document], chain: _SummarizeChain, format: str
+) -> tuple[str, str]:
+    """Loads the (truncated) contents of the given document to send to the LLM."""
+    return (docs_by_id[id].page_content[: chain.input_params_max_length_cutoff], format)
+
+
+def _iter_summary_texts(
+    docs_by_id: Mapping[str, Document],
+    chain: _SummarizeChain,
+    format: str,
+    summary_cache: Optional[SummaryCache] = None,
+    instrumentation: Optional[SummaryInstrumentation] = None,
+    failure_report: Optional[SummaryFailureReport] = None,
+    scheduler: Optional[BatchScheduler] = None,
+    stream: bool = False,
+    max_concurrency: int = DEFAULT_SUMMARY_MAX_CONCURRENCY,
+    batch_size: int = DEFAULT_SUMMARY_BATCH_SIZE,
+) -> Iterator[tuple[str, str]]:
+    """
+    Yields (id, summary text) for all the given documents (see _plan_summaries).
+
+    Short and cached summaries are yielded first. The rest are summarized by the LLM
+    in batches of batch_size, in sub-batches by the scheduler (if given), or each on
+    its own with max_concurrency in flight (if stream is set), and yielded as they
+    complete. Contents are loaded as each batch is sent, so at most a few batches
+    of (truncated) contents are in memory at once.
+    """
+    plan = _plan_summaries(docs_by_id, chain, format, summary_cache)
+    plan.report_planned(len(docs_by_id), instrumentation)
+    yield from plan.precomputed
+
+    ids_to_summarize = plan.ids_to_summarize
+    if not ids_to_summarize:
+        if instrumentation:
+            instrumentation.finished()
+        return
+
+    config = _batch_config(instrumentation)
+
+    def _summarize(
+        ids: list[str], config: RunnableConfig
+    ) -> list[tuple[str, Optional[str]]]:
+        inputs = [_summary_input(id, docs_by_id, chain, format) for id in ids]
+        if failure_report:
+            summaries = chain.run_batch_with_exceptions(inputs, config)
+            retried = failure_report.retry(
+                chain, ids, inputs, config, summaries, instrumentation
+            )
+            return list(zip(ids, retried))
+        return list(zip(ids, chain.run_batch(inputs, config)))  # type: ignore
+
+    completed: Iterator[list[tuple[str, Optional[str]]]]
+    if scheduler and failure_report:
+        # The scheduler retries failed calls itself, backing off its concurrency
+        report, attempts = failure_report, scheduler.max_retries + 1
+
+        def _scheduled_summary(
+            index: int, summary: Union[str, Exception]
+        ) -> Optional[str]:
+            if isinstance(summary, Exception):
+                report.failed(ids_to_summarize[index], summary, attempts)
+                return None
+            return summary
+
+        completed = (
+            [(ids_to_summarize[index], _scheduled_summary(index, summary))]
+            for index, summary in scheduler.run_as_completed(
+                lambda batch, concurrency: chain.run_batch_with_exceptions(
+                    [_summary_input(id, docs_by_id, chain, format) for id in batch],
+                    {**config, "max_concurrency": concurrency},
+                ),
+                ids_to_summarize,
+                [plan.token_estimates_by_id[id] for id in ids_to_summarize],
+                instrumentation.record_retries if instrumentation else None,
+            )
+        )
+    elif scheduler:
+        completed = (
+            [id_summary]
+            for _, id_summary in scheduler.run_as_completed(
+                lambda batch, concurrency: _summarize(
+                    batch, {**config, "max_concurrency": concurrency}
+                ),
+                ids_to_summarize,
+                [plan.token_estimates_by_id[id] for id in ids_to_summarize],
+                instrumentation.record_retries if instrumentation else None,
+            )
+        )
+    elif stream:
+        completed = unordered_map(
+            lambda id: _summarize([id], config),
+            ids_to_summarize,
+            max_concurrency,
+        )
+    else:
+        completed = (
+            _summarize(ids_to_summarize[start : start + batch_size], config)
+            for start in range(0, len(ids_to_summarize), batch_size)
+        )
+
+    num_completed = 0
+    try:
+        for summaries in completed:
+            num_completed += len(summaries)
+            yield from plan.completed(
+                summaries, docs_by_id, summary_cache, instrumentation, failure_report
+            )
+    except Exception:
+        if instrumentation:
+            instrumentation.failed(len(ids_to_summarize) - num_completed)
+        raise
+
+    if instrumentation:
+        instrumentation.finished()
+
+
+async def _aiter_summary_texts(
+    docs_by_id: Mapping[str, Document],
+    chain: _SummarizeChain,
+    format: str,
+    summary_cache: Optional[SummaryCache] = None,
+    instrumentation: Optional[SummaryInstrumentation] = None,
+    failure_report: Optional[SummaryFailureReport] = None,
+    max_concurrency: int = DEFAULT_SUMMARY_MAX_CONCURRENCY,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> AsyncIterator[tuple[str, str]]:
+    """
+    Async version of _iter_summary_texts, yielding summaries as they complete. At
+    most max_concurrency LLM calls are in flight, or as many as the given semaphore
+    allows (share one semaphore to bound concurrency across several builds).
+    """
+    plan = await run_in_executor(
+        None, _plan_summaries, docs_by_id, chain, format, summary_cache
+    )
+    plan.report_planned(len(docs_by_id), instrumentation)
+    for precomputed in plan.precomputed:
+        yield precomputed
+
+    limit = semaphore or asyncio.Semaphore(max_concurrency)
+    config = _batch_config(instrumentation)
+
+    async def _summarize(id: str) -> tuple[str, Optional[str]]:
+        attempt = 0
+        while True:
+            try:
+                async with limit:
+                    # Only load contents once there is capacity to send them
+                    input = await run_in_executor(
+                        None, _summary_input, id, docs_by_id, chain, format
+                    )
+                    summaries = await chain.arun_batch([input], config)
+                return id, summaries[0]
+            except Exception as exc:
+                if not failure_report:
+                    raise
+                if attempt >= failure_report.max_retries:
+                    failure_report.failed(id, exc, attempt + 1)
+                    return id, None
+                attempt += 1
+                await asyncio.sleep(failure_report.backoff_seconds(attempt))
+                if instrumentation:
+                    instrumentation.record_retries(1)
+
+    tasks = [asyncio.ensure_future(_summarize(id)) for id in plan.ids_to_summarize]
+    num_completed = 0
+    try:
+        for next_completed in asyncio.as_completed(tasks):
+            summary = await next_completed
+            num_completed += 1
+            completed = await run_in_executor(
+                None,
+                lambda: list(
+                    plan.completed(
+                        [summary],
+                        docs_by_id,
+                        summary_cache,
+                        instrumentation,
+                        failure_report,
+                    )
+                ),
+            )
+            for id_summary in completed:
+                yield id_summary
+    except Exception:
+        if instrumentation:
+            instrumentation.failed(len(plan.ids_to_summarize) - num_completed)
+        raise
+    finally:
+        # Don't leave LLM calls running if the caller stopped early or one failed
+        for task in tasks:
+            task.cancel()
+
+    if instrumentation:
+        instrumentation.finished()
 
 
 def _build_summary_mappings(
-    docs_by_id: dict[str, Document],
-    chain: Union[SummarizeChunkChain, SummarizeDocumentChain],
+    docs_by_id: Mapping[str, Document],
+    chain: _SummarizeChain,
     include_xml_tags: bool,
+    summary_cache: Optional[SummaryCache] = None,
+    instrumentation: Optional[SummaryInstrumentation] = None,
+    failure_report: Optional[SummaryFailureReport] = None,
+    scheduler: Optional[BatchScheduler] = None,
 ) -> dict[str, Document]:
     """
-    Build summaries for all the given documents.
+    Build summaries for all the given documents (see _iter_summary_texts).
     """
-    summaries: dict[str, Document] = {}
-    format: str = (
-        "text"
-        if not include_xml_tags
-        else "semantic XML without any namespaces or attributes"
+    summary_texts_by_id = dict(
+        _iter_summary_texts(
+            docs_by_id,
+            chain,
+            _summary_format(include_xml_tags),
+            summary_cache=summary_cache,
+            instrumentation=instrumentation,
+            failure_report=failure_report,
+            scheduler=scheduler,
+        )
     )
 
-    batch_input = [(doc.page_content, format) for _, doc in docs_by_id.items()]
-    batch_summaries = chain.run_batch(batch_input)  # type: ignore
+    # Assigning summaries to the respective document IDs, in the original order
+    return dict(
+        owner_summary
+        for id in docs_by_id
+        for owner_summary in _owner_summary_documents(
+            id, docs_by_id, summary_texts_by_id[id]
+        )
+    )
 
-    # Assigning summaries to the respective document IDs
-    for (id, doc), summary in zip(docs_by_id.items(), batch_summaries):
-        summary_id = hashlib.md5(summary.encode()).hexdigest()
-        meta = doc.metadata
-        meta["id"] = summary_id
-        meta[PARENT_DOC_ID_KEY] = id
 
-        summaries[id] = Document(
-            page_content=summary,
-            metadata=meta,
+def _iter_summary_mappings(
+    docs_by_id: Mapping[str, Document],
+    chain: _SummarizeChain,
+    include_xml_tags: bool,
+    summary_cache: Optional[SummaryCache] = None,
+    instrumentation: Optional[SummaryInstrumentation] = None,
+    failure_report: Optional[SummaryFailureReport] = None,
+    scheduler: Optional[BatchScheduler] = None,
+    max_concurrency: int = DEFAULT_SUMMARY_MAX_CONCURRENCY,
+) -> Iterator[tuple[str, Document]]:
+    """
+    Yields (id, summary) for all the given documents as each summary completes (see
+    _iter_summary_texts).
+    """
+    for id, summary in _iter_summary_texts(
+        docs_by_id,
+        chain,
+        _summary_format(include_xml_tags),
+        summary_cache=summary_cache,
+        instrumentation=instrumentation,
+        failure_report=failure_report,
+        scheduler=scheduler,
+        stream=True,
+        max_concurrency=max_concurrency,
+    ):
+        yield from _owner_summary_documents(id, docs_by_id, summary)
+
+
+async def _abuild_summary_mappings(
+    docs_by_id: Mapping[str, Document],
+    chain: _SummarizeChain,
+    include_xml_tags: bool,
+    summary_cache: Optional[SummaryCache] = None,
+    instrumentation: Optional[SummaryInstrumentation] = None,
+    failure_report: Optional[SummaryFailureReport] = None,
+    max_concurrency: int = DEFAULT_SUMMARY_MAX_CONCURRENCY,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> dict[str, Document]:
+    """
+    Async build summaries for all the given documents (see _aiter_summary_texts).
+    """
+    summary_texts_by_id = {
+        id: summary
+        async for id, summary in _aiter_summary_texts(
+            docs_by_id,
+            chain,
+            _summary_format(include_xml_tags),
+            summary_cache=summary_cache,
+            instrumentation=instrumentation,
+            failure_report=failure_report,
+            max_concurrency=max_concurrency,
+            semaphore=semaphore,
         )
+    }
 
-    return summaries
+    return dict(
+        owner_summary
+        for id in docs_by_id
+        for owner_summary in _owner_summary_documents(
+            id, docs_by_id, summary_texts_by_id[id]
+        )
+    )
+
+
+def _summarize_document_chain(
+    llm: BaseLanguageModel,
+    embeddings: Embeddings,
+    min_length_to_summarize: int,
+    max_length_cutoff: int,
+    summarize_document_examples_file: Optional[Path],
+) -> SummarizeDocumentChain:
+    chain = SummarizeDocumentChain(llm=llm, embeddings=embeddings)
+    chain.min_length_to_summarize = min_length_to_summarize
+    chain.input_params_max_length_cutoff = max_length_cutoff
+    if summarize_document_examples_file:
+        chain.load_examples(summarize_document_examples_file)
+    return chain
+
+
+def _summarize_chunk_chain(
+    llm: BaseLanguageModel,
+    embeddings: Embeddings,
+    min_length_to_summarize: int,
+    max_length_cutoff: int,
+    summarize_chunk_examples_file: Optional[Path],
+) -> SummarizeChunkChain:
+    chain = SummarizeChunkChain(llm=llm, embeddings=embeddings)
+    chain.min_length_to_summarize = min_length_to_summarize
+    chain.input_params_max_length_cutoff = max_length_cutoff
+    if summarize_chunk_examples_file:
+        chain.load_examples(summarize_chunk_examples_file)
+    return chain
 
 
 def build_full_doc_summary_mappings(
-    docs_by_id: dict[str, Document],
+    docs_by_id: Mapping[str, Document],
     llm: BaseLanguageModel,
     embeddings: Embeddings,
     include_xml_tags: bool = INCLUDE_XML_TAGS,
     min_length_to_summarize: int = MIN_LENGTH_TO_SUMMARIZE,
     max_length_cutoff: int = MAX_FULL_DOCUMENT_TEXT_LENGTH,
     summarize_document_examples_file: Optional[Path] = None,
+    summary_cache: Optional[SummaryCache] = None,
+    instrumentation: Optional[SummaryInstrumentation] = None,
+    failure_report: Optional[SummaryFailureReport] = None,
+    scheduler: Optional[BatchScheduler] = None,
 ) -> dict[str, Document]:
     """
-    Build summary mappings for all the given full documents.
+    Build summary mappings for all the given full documents. Pass a summary cache
+    to skip re-summarizing documents that have not changed since an earlier run, and
+    a scheduler to keep LLM calls within provider rate limits.
     """
 
-    chain = SummarizeDocumentChain(llm=llm, embeddings=embeddings)
-    chain.min_length_to_summarize = min_length_to_summarize
-    chain.input_params_max_length_cutoff = max_length_cutoff
-    if summarize_document_examples_file:
-        chain.load_examples(summarize_document_examples_file)
+    chain = _summarize_document_chain(
+        llm,
+        embeddings,
+        min_length_to_summarize,
+        max_length_cutoff,
+        summarize_document_examples_file,
+    )
 
     return _build_summary_mappings(
         docs_by_id=docs_by_id,
         chain=chain,
         include_xml_tags=include_xml_tags,
+        summary_cache=summary_cache,
+        instrumentation=instrumentation,
+        failure_report=failure_report,
+        scheduler=scheduler,
     )
 
 
+def iter_full_doc_summary_mappings(
+    docs_by_id: Mapping[str, Document],
+    llm: BaseLanguageModel,
+    embeddings: Embeddings,
+    include_xml_tags: bool = INCLUDE_XML_TAGS,
+    min_length_to_summarize: int = MIN_LENGTH_TO_SUMMARIZE,
+    max_length_cutoff: int = MAX_FULL_DOCUMENT_TEXT_LENGTH,
+    summarize_document_examples_file: Optional[Path] = None,
+    summary_cache: Optional[SummaryCache] = None,
+    instrumentation: Optional[SummaryInstrumentation] = None,
+    failure_report: Optional[SummaryFailureReport] = None,
+    scheduler: Optional[BatchScheduler] = None,
+    max_concurrency: int = DEFAULT_SUMMARY_MAX_CONCURRENCY,
+) -> Iterator[tuple[str, Document]]:
+    """
+    Like build_full_doc_summary_mappings, but yields (id, summary) pairs in
+    completion order, so callers can index summaries incrementally instead of
+    waiting for the slowest one.
+    """
+
+    chain = _summarize_document_chain(
+        llm,
+        embeddings,
+        min_length_to_summarize,
+        max_length_cutoff,
+        summarize_document_examples_file,
+    )
+
+    yield from _iter_summary_mappings(
+        docs_by_id=docs_by_id,
+        chain=chain,
+        include_xml_tags=include_xml_tags,
+        summary_cache=summary_cache,
+        instrumentation=instrumentation,
+        failure_report=failure_report,
+        scheduler=scheduler,
+        max_concurrency=max_concurrency,
+    )
+
+
+async def abuild_full_doc_summary_mappings(
+    docs_by_id: Mapping[str, Document],
+    llm: BaseLanguageModel,
+    embeddings: Embeddings,
+    include_xml_tags: bool = INCLUDE_XML_TAGS,
+    min_length_to_summarize: int = MIN_LENGTH_TO_SUMMARIZE,
+    max_length_cutoff: int = MAX_FULL_DOCUMENT_TEXT_LENGTH,
+    summarize_document_examples_file: Optional[Path] = None,
+    summary_cache: Optional[SummaryCache] = None,
+    instrumentation: Optional[SummaryInstrumentation] = None,
+    failure_report: Optional[SummaryFailureReport] = None,
+    max_concurrency: int = DEFAULT_SUMMARY_MAX_CONCURRENCY,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> dict[str, Document]:
+    """
+    Async version of build_full_doc_summary_mappings. At most max_concurrency LLM
+    calls are in flight, or as many as the given semaphore allows (share one
+    semaphore to bound concurrency across builds for several docsets).
+    """
+
+    chain = await run_in_executor(
+        None,
+        _summarize_document_chain,
+        llm,
+        embeddings,
+        min_length_to_summarize,
+        max_length_cutoff,
+        summarize_document_examples_file,
+    )
+
+    return await _abuild_summary_mappings(
+        docs_by_id=docs_by_id,
+        chain=chain,
+        include_xml_tags=include_xml_tags,
+        summary_cache=summary_cache,
+        instrumentation=instrumentation,
+        failure_report=failure_report,
+        max_concurrency=max_concurrency,
+        semaphore=semaphore,
+    )
+
+
+def _split_text(text: str, max_length: int) -> Iterator[str]:
+    """
+    Yields consecutive pieces of text of at most max_length, on line boundaries
+    where possible.
+
+    >>> list(_split_text("aa\\nbb\\ncc", 5))
+    ['aa\\nbb', 'cc']
+    """
+    current = ""
+    start = 0
+    while start <= len(text):
+        end = text.find("\n", start)
+        if end < 0:
+            end = len(text)
+        line = text[start:end]
+        start = end + 1
+
+        while len(line) > max_length:
+            if current:
+                yield current
+                current = ""
+            yield line[:max_length]
+            line = line[max_length:]
+
+        if current and len(current) + 1 + len(line) > max_length:
+            yield current
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+
+    if current:
+        yield current
+
+
+def _group_texts(texts: list[str], max_length: int) -> list[str]:
+    """
+    Joins consecutive texts into groups of at most max_length where possible. Each
+    group has at least two texts (if there is more than one), so each round of
+    grouping at least halves the number of texts.
+
+    >>> _group_texts(["a" * 3, "b" * 3, "c" * 3, "d" * 8], 8)
+    ['aaa\\n\\nbbb', 'ccc\\n\\ndddddddd']
+    """
+    groups: list[list[str]] = []
+    group_length = 0
+    for text in texts:
+        if groups and (
+            len(groups[-1]) < 2 or group_length + 2 + len(text) <= max_length
+        ):
+            groups[-1].append(text)
+            group_length += 2 + len(text)
+        else:
+            groups.append([text])
+            group_length = len(text)
+
+    if len(groups) > 1 and len(groups[-1]) < 2:
+        groups[-2].extend(groups.pop())
+
+    return ["\n\n".join(group) for group in groups]
+
+
+def build_map_reduce_full_doc_summary_mappings(
+    docs_by_id: Mapping[str, Document],
+    llm: BaseLanguageModel,
+    embeddings: Embeddings,
+    chunk_summaries_by_id: Optional[dict[str, Document]] = None,
+    include_xml_tags: bool = INCLUDE_XML_TAGS,
+    min_length_to_summarize: int = MIN_LENGTH_TO_SUMMARIZE,
+    max_length_cutoff: int = MAX_FULL_DOCUMENT_TEXT_LENGTH,
+    max_chunk_length_cutoff: int = MAX_CHUNK_TEXT_LENGTH,
+    summarize_document_examples_file: Optional[Path] = None,
+    summarize_chunk_examples_file: Optional[Path] = None,
+    summary_cache: Optional[SummaryCache] = None,
+    instrumentation: Optional[SummaryInstrumentation] = None,
+    failure_report: Optional[SummaryFailureReport] = None,
+    scheduler: Optional[BatchScheduler] = None,
+    full_doc_summary_id_key: str = FULL_DOC_SUMMARY_ID_KEY,
+) -> dict[str, Document]:
+    """
+    Build summary mappings for all the given full documents, summarizing documents
+    longer than max_length_cutoff with map-reduce instead of truncating them.
+
+    The map step uses the given chunk summaries (e.g. from
+    build_chunk_summary_mappings, linked to full docs by full_doc_summary_id_key),
+    or else summarizes each piece of the document with the chunk summary chain, a
+    batch of pieces at a time. The reduce step summarizes groups of consecutive
+    summaries with the document summary chain, level by level, until one summary
+    per document remains. Each level is run as one batch across all documents, so
+    every call has bounded context.
+    """
+    format = _summary_format(include_xml_tags)
+    document_chain = _summarize_document_chain(
+        llm,
+        embeddings,
+        min_length_to_summarize,
+        max_length_cutoff,
+        summarize_document_examples_file,
+    )
+
+    oversized_ids = {
+        id
+        for id, doc in docs_by_id.items()
+        if len(doc.page_content) > max_length_cutoff
+    }
+    summary_texts_by_id = dict(
+        _iter_summary_texts(
+            {id: doc for id, doc in docs_by_id.items() if id not in oversized_ids},
+            document_chain,
+            format,
+            summary_cache=summary_cache,
+            instrumentation=instrumentation,
+            failure_report=failure_report,
+            scheduler=scheduler,
+        )
+    )
+
+    # Map: summaries of consecutive pieces of each oversized document
+    parts_by_id: dict[str, list[str]] = {id: [] for id in oversized_ids}
+    for chunk_summary in (chunk_summaries_by_id or {}).values():
+        full_doc_id = chunk_summary.metadata.get(full_doc_summary_id_key)
+        if full_doc_id in parts_by_id:
+            parts_by_id[full_doc_id].append(chunk_summary.page_content)
+
+    # Pieces are split off as they are summarized, a batch at a time, so only one
+    # batch of them is held in memory at once
+    unsplit_pieces = (
+        (f"{id}/map/{index}", id, piece)
+        for id, parts in parts_by_id.items()
+        if not parts
+        for index, piece in enumerate(
+            _split_text(docs_by_id[id].page_content, max_chunk_length_cutoff)
+        )
+    )
+    chunk_chain: Optional[SummarizeChunkChain] = None
+    while batch := list(itertools.islice(unsplit_pieces, DEFAULT_SUMMARY_BATCH_SIZE)):
+        if not chunk_chain:
+            chunk_chain = _summarize_chunk_chain(
+                llm,
+                embeddings,
+                min_length_to_summarize,
+                max_chunk_length_cutoff,
+                summarize_chunk_examples_file,
+            )
+        piece_summaries = dict(
+            _iter_summary_texts(
+                {key: Document(page_content=piece) for key, _, piece in batch},
+                chunk_chain,
+                format,
+                summary_cache=summary_cache,
+                instrumentation=instrumentation,
+                failure_report=failure_report,
+                scheduler=scheduler,
+            )
+        )
+        for key, id, _ in batch:
+            parts_by_id[id].append(piece_summaries[key])
+
+    # Reduce: summarize groups of summaries until one per document remains
+    level = 0
+    while parts_by_id:
+        groups: dict[str, Document] = {}
+        group_owners: dict[str, str] = {}
+        for id, parts in parts_by_id.items():
+            for index, group in enumerate(_group_texts(parts, max_length_cutoff)):
+                groups[f"{id}/reduce{level}/{index}"] = Document(page_content=group)
+                group_owners[f"{id}/reduce{level}/{index}"] = id
+
+        group_summaries = dict(
+            _iter_summary_texts(
+                groups,
+                document_chain,
+                format,
+                summary_cache=summary_cache,
+                instrumentation=instrumentation,
+                failure_report=failure_report,
+                scheduler=scheduler,
+            )
+        )
+
+        parts_by_id = {id: [] for id in parts_by_id}
+        for key in groups:
+            parts_by_id[group_owners[key]].append(group_summaries[key])
+
+        for id, parts in list(parts_by_id.items()):
+            if len(parts) == 1:
+                summary_texts_by_id[id] = parts[0]
+                del parts_by_id[id]
+
+        level += 1
+
+    return {
+        id: _summary_document(id, doc, summary_texts_by_id[id])
+        for id, doc in docs_by_id.items()
+    }
+
+
 def build_chunk_summary_mappings(
-    docs_by_id: dict[str, Document],
+    docs_by_id: Mapping[str, Document],
     llm: BaseLanguageModel,
     embeddings: Embeddings,
     include_xml_tags: bool = INCLUDE_XML_TAGS,
     min_length_to_summarize: int = MIN_LENGTH_TO_SUMMARIZE,
     max_length_cutoff: int = MAX_CHUNK_TEXT_LENGTH,
     summarize_chunk_examples_file: Optional[Path] = None,
+    summary_cache: Optional[SummaryCache] = None,
+    instrumentation: Optional[SummaryInstrumentation] = None,
+    failure_report: Optional[SummaryFailureReport] = None,
+    scheduler: Optional[BatchScheduler] = None,
 ) -> dict[str, Document]:
     """
-    Build summary mappings for all the given chunks.
+    Build summary mappings for all the given chunks. Pass a summary cache to skip
+    re-summarizing chunks that have not changed since an earlier run, and a
+    scheduler to keep LLM calls within provider rate limits.
+
+    Summaries are keyed by chunk ID. If docs_by_id is a ParentChunks (e.g. from
+    build_doc_maps_from_chunks), chunks shared by several documents also get a
+    summary for each additional owner, keyed by "{chunk ID}/owner/{index}" and
+    linked to that owner's source and full doc. Look summaries up by
+    PARENT_DOC_ID_KEY in their metadata to find all of them for a chunk.
     """
 
-    chain = SummarizeChunkChain(llm=llm, embeddings=embeddings)
-    chain.min_length_to_summarize = min_length_to_summarize
-    chain.input_params_max_length_cutoff = max_length_cutoff
-    if summarize_chunk_examples_file:
-        chain.load_examples(summarize_chunk_examples_file)
+    chain = _summarize_chunk_chain(
+        llm,
+        embeddings,
+        min_length_to_summarize,
+        max_length_cutoff,
+        summarize_chunk_examples_file,
+    )
 
     return _build_summary_mappings(
         docs_by_id=docs_by_id,
         chain=chain,
         include_xml_tags=include_xml_tags,
+        summary_cache=summary_cache,
+        instrumentation=instrumentation,
+        failure_report=failure_report,
+        scheduler=scheduler,
+    )
+
+
+def iter_chunk_summary_mappings(
+    docs_by_id: Mapping[str, Document],
+    llm: BaseLanguageModel,
+    embeddings: Embeddings,
+    include_xml_tags: bool = INCLUDE_XML_TAGS,
+    min_length_to_summarize: int = MIN_LENGTH_TO_SUMMARIZE,
+    max_length_cutoff: int = MAX_CHUNK_TEXT_LENGTH,
+    summarize_chunk_examples_file: Optional[Path] = None,
+    summary_cache: Optional[SummaryCache] = None,
+    instrumentation: Optional[SummaryInstrumentation] = None,
+    failure_report: Optional[SummaryFailureReport] = None,
+    scheduler: Optional[BatchScheduler] = None,
+    max_concurrency: int = DEFAULT_SUMMARY_MAX_CONCURRENCY,
+) -> Iterator[tuple[str, Document]]:
+    """
+    Like build_chunk_summary_mappings, but yields (id, summary) pairs in completion
+    order, so callers can index summaries incrementally instead of waiting for the
+    slowest one. Shared chunks yield one pair per owner, with the same keys as
+    build_chunk_summary_mappings.
+    """
+
+    chain = _summarize_chunk_chain(
+        llm,
+        embeddings,
+        min_length_to_summarize,
+        max_length_cutoff,
+        summarize_chunk_examples_file,
+    )
+
+    yield from _iter_summary_mappings(
+        docs_by_id=docs_by_id,
+        chain=chain,
+        include_xml_tags=include_xml_tags,
+        summary_cache=summary_cache,
+        instrumentation=instrumentation,
+        failure_report=failure_report,
+        scheduler=scheduler,
+        max_concurrency=max_concurrency,
+    )
+
+
+async def abuild_chunk_summary_mappings(
+    docs_by_id: Mapping[str, Document],
+    llm: BaseLanguageModel,
+    embeddings: Embeddings,
+    include_xml_tags: bool = INCLUDE_XML_TAGS,
+    min_length_to_summarize: int = MIN_LENGTH_TO_SUMMARIZE,
+    max_length_cutoff: int = MAX_CHUNK_TEXT_LENGTH,
+    summarize_chunk_examples_file: Optional[Path] = None,
+    summary_cache: Optional[SummaryCache] = None,
+    instrumentation: Optional[SummaryInstrumentation] = None,
+    failure_report: Optional[SummaryFailureReport] = None,
+    max_concurrency: int = DEFAULT_SUMMARY_MAX_CONCURRENCY,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> dict[str, Document]:
+    """
+    Async version of build_chunk_summary_mappings (with the same keys). At most
+    max_concurrency LLM calls are in flight, or as many as the given semaphore
+    allows (share one semaphore to bound concurrency across builds for several
+    docsets).
+    """
+
+    chain = await run_in_executor(
+        None,
+        _summarize_chunk_chain,
+        llm,
+        embeddings,
+        min_length_to_summarize,
+        max_length_cutoff,
+        summarize_chunk_examples_file,
+    )
+
+    return await _abuild_summary_mappings(
+        docs_by_id=docs_by_id,
+        chain=chain,
+        include_xml_tags=include_xml_tags,
+        summary_cache=summary_cache,
+        instrumentation=instrumentation,
+        failure_report=failure_report,
+        max_concurrency=max_concurrency,
+        semaphore=semaphore,
     )
 
 
+class SpilledDocuments(Mapping[str, Document]):
+    """
+    Documents by ID, where large documents have been spilled to files on disk and
+    are read back (as new Documents) each time they are accessed.
+    """
+
+    def __init__(self, id_key: str = "id") -> None:
+        self.id_key = id_key
+        self._docs: dict[str, Document] = {}
+        self._paths: dict[str, Path] = {}
+
+    def add(self, id: str, page_content: str) -> None:
+        self._docs[id] = Document(page_content=page_content, metadata={self.id_key: id})
+
+    def add_spilled(self, id: str, path: Path) -> None:
+        self._paths[id] = path
+
+    def __getitem__(self, id: str) -> Document:
+        if id in self._docs:
+            return self._docs[id]
+        with open(self._paths[id], "r", encoding="utf-8") as in_f:
+            return Document(page_content=in_f.read(), metadata={self.id_key: id})
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._docs
+        yield from self._paths
+
+    def __len__(self) -> int:
+        return len(self._docs) + len(self._paths)
+
+
+class ParentChunks(dict[str, Document]):
+    """
+    Parent chunks by chunk ID. Loader chunk IDs are hashes of the chunk text, so
+    identical chunks in several documents (e.g. boilerplate clauses) share an ID.
+    Each ID maps to the first such chunk, and owners returns one chunk per source
+    document, each linked to its own full doc. The chunk summary builders emit a
+    summary per owner (see build_chunk_summary_mappings).
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._owners_by_id: dict[str, dict[str, Document]] = {}
+
+    def add(self, id: str, chunk: Document, source: str) -> None:
+        self.setdefault(id, chunk)
+        self._owners_by_id.setdefault(id, {}).setdefault(source, chunk)
+
+    def owners(self, id: str) -> list[Document]:
+        owners = self._owners_by_id.get(id)
+        return list(owners.values()) if owners else [self[id]]
+
+
+class _FullDocBuilder:
+    """
+    Incrementally builds (and hashes) the full text of one source document. Once
+    spilled, text is buffered and appended to the spill file in blocks, without
+    holding the file open, so any number of documents can be spilled at once.
+    """
+
+    def __init__(self) -> None:
+        self.hasher = hashlib.md5()
+        self.num_chunks = 0
+        self.length = 0
+        self.parts: list[str] = []
+        self.parts_length = 0
+        self.spill_path: Optional[Path] = None
+        self.parent_chunks: list[Document] = []
+
+    def append(self, text: str) -> None:
+        if self.num_chunks:
+            text = "\n" + text
+        self.num_chunks += 1
+        self.hasher.update(text.encode())
+        self.length += len(text)
+        self.parts.append(text)
+        self.parts_length += len(text)
+        if self.spill_path and self.parts_length >= SPILL_WRITE_BUFFER_LENGTH:
+            self.flush()
+
+    def spill(self, spill_dir: Path) -> None:
+        fd, path = tempfile.mkstemp(dir=spill_dir, suffix=".txt")
+        os.close(fd)
+        self.spill_path = Path(path)
+        self.flush()
+
+    def flush(self) -> None:
+        """Appends the buffered text to the spill file."""
+        if self.spill_path and self.parts:
+            with open(self.spill_path, "a", encoding="utf-8") as out_f:
+                out_f.writelines(self.parts)
+            self.parts = []
+            self.parts_length = 0
+
+    def discard(self) -> None:
+        """Deletes the spill file, if any (e.g. if the build failed)."""
+        if self.spill_path:
+            self.spill_path.unlink(missing_ok=True)
+            self.spill_path = None
+
+
 def build_doc_maps_from_chunks(
-    chunks: list[Document],
+    chunks: Iterable[Document],
     chunk_id_key: str = "id",
     parent_id_key: str = PARENT_DOC_ID_KEY,
     full_doc_summary_id_key: str = FULL_DOC_SUMMARY_ID_KEY,
     source_key: str = SOURCE_KEY,
-) -> tuple[dict[str, Document], dict[str, Document]]:
-    """Build separate maps of full docs and parent chunks (by individual chunk id)"""
-    # Build separate maps of chunks, and parents
-    parent_chunks_by_id: dict[str, Document] = {}
-    chunks_by_source: dict[str, list[str]] = {}
-    for chunk in chunks:
-        chunk_id = str(chunk.metadata.get(chunk_id_key))
-        chunk_source = str(chunk.metadata.get(source_key))
-        parent_chunk_id = chunk.metadata.get(parent_id_key)
-
-        if chunk_source not in chunks_by_source:
-            chunks_by_source[chunk_source] = []
-
-        chunks_by_source[chunk_source].append(chunk.page_content)
-
-        if not parent_chunk_id:
-            # parent chunk, we will use this (for expanded context) as our chunk
-            parent_chunks_by_id[chunk_id] = chunk
-
-    # Build up the full docs by concatenating all the child chunks from a source
-    full_docs_by_id: dict[str, Document] = {}
-    full_doc_ids_by_source: dict[str, str] = {}
-    for source in chunks_by_source:
-        chunks_from_source = chunks_by_source[source]
-        full_doc_text = "\n".join([c for c in chunks_from_source])
-        full_doc_id = hashlib.md5(full_doc_text.encode()).hexdigest()
-        full_doc_ids_by_source[source] = full_doc_id
-        full_docs_by_id[full_doc_id] = Document(
-            page_content=full_doc_text, metadata={chunk_id_key: full_doc_id}
-        )
+    spill_dir: Optional[Path] = None,
+    max_in_memory_doc_length: int = MAX_IN_MEMORY_FULL_DOCUMENT_LENGTH,
+) -> tuple[Mapping[str, Document], ParentChunks]:
+    """
+    Build separate maps of full docs and parent chunks (by individual chunk id), in a
+    single pass over the given chunks (which may be lazily loaded, e.g. from
+    DocugamiLoader.lazy_load). Chunks shared by several documents keep all their
+    owners (see ParentChunks), so their summaries can be indexed for each document.
+
+    Full doc text is built and hashed incrementally. If spill_dir is given, the text
+    of full docs longer than max_in_memory_doc_length is written to files there as
+    it is built instead of being held in memory.
+    """
+    parent_chunks_by_id = ParentChunks()
+    builders_by_source: dict[str, _FullDocBuilder] = {}
+    full_docs_by_id = SpilledDocuments(id_key=chunk_id_key)
+    try:
+        for chunk in chunks:
+            chunk_id = str(chunk.metadata.get(chunk_id_key))
+            chunk_source = str(chunk.metadata.get(source_key))
+            parent_chunk_id = chunk.metadata.get(parent_id_key)
+
+            builder = builders_by_source.get(chunk_source)
+            if not builder:
+                builder = builders_by_source[chunk_source] = _FullDocBuilder()
+
+            builder.append(chunk.page_content)
+            if (
+                spill_dir
+                and not builder.spill_path
+                and builder.length > max_in_memory_doc_length
+            ):
+                builder.spill(spill_dir)
+
+            if not parent_chunk_id:
+                # parent chunk, we will use this (for expanded context) as our chunk
+                parent_chunks_by_id.add(chunk_id, chunk, chunk_source)
+                if chunk.metadata.get(source_key):
+                    builder.parent_chunks.append(chunk)
+
+        # Finish the full docs (concatenations of all the chunks from a source), and
+        # associate parent chunks with them
+        for builder in builders_by_source.values():
+            full_doc_id = builder.hasher.hexdigest()
+            if builder.spill_path:
+                builder.flush()
+                full_doc_path = builder.spill_path.with_name(f"{full_doc_id}.txt")
+                os.replace(builder.spill_path, full_doc_path)
+                builder.spill_path = None
+                full_docs_by_id.add_spilled(full_doc_id, full_doc_path)
+            else:
+                full_docs_by_id.add(full_doc_id, "".join(builder.parts))
 
-    # Associate parent chunks with full docs
-    for parent_chunk_id in parent_chunks_by_id:
-        parent_chunk = parent_chunks_by_id[parent_chunk_id]
-        parent_chunk_source = parent_chunk.metadata.get(source_key)
-        if parent_chunk_source:
-            full_doc_id = full_doc_ids_by_source.get(parent_chunk_source, "")
-            if full_doc_id:
+            for parent_chunk in builder.parent_chunks:
                 parent_chunk.metadata[full_doc_summary_id_key] = full_doc_id
+    finally:
+        # Don't leave partial spill files behind if the chunks failed to load
+        for builder in builders_by_source.values():
+            builder.discard()
 
     return full_docs_by_id, parent_chunks_by_id
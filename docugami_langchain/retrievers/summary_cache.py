@@ -0,0 +1,127 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Union
+
+from langchain_core.language_models import BaseLanguageModel
+
+from docugami_langchain.base_runnable import BaseRunnable, system_prompt
+
+
+def model_name(llm: BaseLanguageModel) -> str:
+    """Best effort name of the model behind the given LLM."""
+    name = getattr(llm, "model_name", None) or getattr(llm, "model", None)
+    return str(name) if name else llm.__class__.__name__
+
+
+def prompt_version(chain: BaseRunnable) -> str:
+    """
+    Hash of everything that determines the prompt a chain sends for given inputs
+    (instructions, few shot examples and input limits), so cached outputs are not
+    reused after the prompt changes.
+    """
+    params = chain.params()
+    return hashlib.md5(
+        json.dumps(
+            [
+                system_prompt(params),
+                params.stop_sequences,
+                chain._examples,
+                chain.input_params_max_length_cutoff,
+                getattr(chain, "min_length_to_summarize", None),
+            ],
+            sort_keys=True,
+            default=str,
+        ).encode()
+    ).hexdigest()
+
+
+def summary_cache_version(format: str, chain: BaseRunnable) -> str:
+    """
+    Everything other than the contents that determines summaries by the given chain
+    (format, chain class, prompt version and model name). This is the same for all
+    documents in a build, so compute it once and pass it to summary_cache_key.
+    """
+    return json.dumps(
+        [
+            format,
+            chain.__class__.__name__,
+            prompt_version(chain),
+            model_name(chain.llm),
+        ]
+    )
+
+
+def summary_cache_key(contents: str, version: str) -> str:
+    """
+    Key for the summary of the given contents, based on the content hash and the
+    given summary_cache_version.
+    """
+    hasher = hashlib.md5(contents.encode())
+    hasher.update(version.encode())
+    return hasher.hexdigest()
+
+
+class SummaryCache(ABC):
+    """
+    Cache of generated summaries, used to skip summarizing chunks and documents that
+    have not changed when re-indexing. Implementations must be safe to call from
+    multiple threads.
+    """
+
+    @abstractmethod
+    def lookup(self, keys: list[str]) -> dict[str, str]:
+        """Look up summaries by key (see summary_cache_key), returning those found."""
+
+    @abstractmethod
+    def update(self, summaries: dict[str, str]) -> None:
+        """Update the cache with the given summaries, by key."""
+
+
+class SQLiteSummaryCache(SummaryCache):
+    """Summary cache persisted in a local SQLite database."""
+
+    def __init__(self, database_path: Union[Path, str]) -> None:
+        self.database_path = Path(database_path)
+        self.database_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.database_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, summary TEXT)"
+            )
+
+    def lookup(self, keys: list[str]) -> dict[str, str]:
+        found: dict[str, str] = {}
+        batch_size = 500  # stay under the SQLite bound parameter limit
+        with self._lock:
+            for i in range(0, len(keys), batch_size):
+                batch = keys[i : i + batch_size]
+                rows = self._conn.execute(
+                    "SELECT key, summary FROM summaries WHERE key IN "
+                    f"({', '.join('?' * len(batch))})",
+                    batch,
+                )
+                found.update(rows.fetchall())
+        return found
+
+    def update(self, summaries: dict[str, str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO summaries (key, summary) VALUES (?, ?)",
+                summaries.items(),
+            )
+
+    def clear(self) -> None:
+        """Deletes all cached summaries."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM summaries")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
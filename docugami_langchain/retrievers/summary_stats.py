@@ -0,0 +1,216 @@
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of the given values (0 if none).
+
+    >>> _percentile([0.1, 0.2, 0.3, 0.4], 50)
+    0.2
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(len(ordered) * percent / 100 + 0.5), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+@dataclass
+class SummaryStats:
+    """Counts, token usage and timings for summary mapping builds."""
+
+    total: int = 0
+    """Documents to summarize."""
+
+    skipped_short: int = 0
+    """Documents passed through as-is, since they are too short to summarize."""
+
+    cached: int = 0
+    """Documents with a cached summary."""
+
+    deduplicated: int = 0
+    """Documents sharing the summary of another document with identical contents."""
+
+    summarized: int = 0
+    """Documents summarized by the LLM."""
+
+    failed: int = 0
+    """Documents the LLM failed to summarize."""
+
+    llm_calls: int = 0
+    retries: int = 0
+    """LLM calls retried after failing (e.g. when rate limited)."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    elapsed_seconds: float = 0.0
+    latencies_seconds: list[float] = field(default_factory=list)
+
+    @property
+    def completed(self) -> int:
+        return (
+            self.skipped_short
+            + self.cached
+            + self.deduplicated
+            + self.summarized
+            + self.failed
+        )
+
+    @property
+    def items_per_second(self) -> float:
+        return self.completed / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        tokens = self.prompt_tokens + self.completion_tokens
+        return tokens / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def latency_p50_seconds(self) -> float:
+        return _percentile(self.latencies_seconds, 50)
+
+    @property
+    def latency_p95_seconds(self) -> float:
+        return _percentile(self.latencies_seconds, 95)
+
+    def estimated_cost(
+        self, cost_per_1k_prompt_tokens: float, cost_per_1k_completion_tokens: float
+    ) -> float:
+        """Estimated LLM cost, given the provider's price per 1k tokens."""
+        return (
+            self.prompt_tokens * cost_per_1k_prompt_tokens
+            + self.completion_tokens * cost_per_1k_completion_tokens
+        ) / 1000
+
+
+@dataclass
+class SummaryProgressEvent:
+    stage: str
+    """One of "planned", "progress" or "finished"."""
+
+    stats: SummaryStats
+    """Snapshot of the stats so far."""
+
+
+class SummaryInstrumentation(BaseCallbackHandler):
+    """
+    Collects SummaryStats for summary mapping builds (pass as the instrumentation
+    argument), reporting structured progress events to an optional callback. Token
+    counts are taken from the usage reported in LLM responses, if any.
+
+    Stats accumulate across builds that share an instance, e.g. the map and reduce
+    steps of build_map_reduce_full_doc_summary_mappings.
+    """
+
+    def __init__(
+        self,
+        progress_callback: Optional[Callable[[SummaryProgressEvent], None]] = None,
+    ) -> None:
+        self.progress_callback = progress_callback
+        self.stats = SummaryStats()
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+        self._llm_starts: dict[UUID, float] = {}
+
+    def _emit(self, stage: str) -> None:
+        with self._lock:
+            if self._started is not None:
+                self.stats.elapsed_seconds = time.monotonic() - self._started
+            snapshot = replace(
+                self.stats, latencies_seconds=list(self.stats.latencies_seconds)
+            )
+
+        if self.progress_callback:
+            self.progress_callback(SummaryProgressEvent(stage=stage, stats=snapshot))
+
+    def planned(
+        self, total: int, skipped_short: int, cached: int, deduplicated: int
+    ) -> None:
+        with self._lock:
+            if self._started is None:
+                self._started = time.monotonic()
+            self.stats.total += total
+            self.stats.skipped_short += skipped_short
+            self.stats.cached += cached
+            self.stats.deduplicated += deduplicated
+        self._emit("planned")
+
+    def summarized(self, count: int) -> None:
+        with self._lock:
+            self.stats.summarized += count
+        self._emit("progress")
+
+    def failed(self, count: int) -> None:
+        with self._lock:
+            self.stats.failed += count
+        self._emit("progress")
+
+    def record_retries(self, count: int) -> None:
+        """Records retried LLM calls (see SummaryFailureReport and BatchScheduler)."""
+        with self._lock:
+            self.stats.retries += count
+
+    def finished(self) -> None:
+        self._emit("finished")
+
+    def on_llm_start(
+        self,
+        serialized: dict[str, Any],
+        prompts: list[str],
+        *,
+        run_id: UUID,
+        **kwargs: Any,
+    ) -> None:
+        with self._lock:
+            self._llm_starts[run_id] = time.monotonic()
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        *,
+        run_id: UUID,
+        **kwargs: Any,
+    ) -> None:
+        with self._lock:
+            self._llm_starts[run_id] = time.monotonic()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        prompt_tokens = completion_tokens = 0
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        if token_usage:
+            prompt_tokens = token_usage.get("prompt_tokens", 0) or 0
+            completion_tokens = token_usage.get("completion_tokens", 0) or 0
+        else:
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    usage = getattr(message, "usage_metadata", None) or {}
+                    prompt_tokens += usage.get("input_tokens", 0)
+                    completion_tokens += usage.get("output_tokens", 0)
+
+        with self._lock:
+            started = self._llm_starts.pop(run_id, None)
+            if started is not None:
+                self.stats.latencies_seconds.append(time.monotonic() - started)
+            self.stats.llm_calls += 1
+            self.stats.prompt_tokens += prompt_tokens
+            self.stats.completion_tokens += completion_tokens
+
+    def on_llm_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        with self._lock:
+            self._llm_starts.pop(run_id, None)
+
+    def on_retry(self, retry_state: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self.stats.retries += 1
@@ -19,6 +19,7 @@ from docugami_langchain.config import DEFAULT_RETRIEVER_K, MAX_FULL_DOCUMENT_TEX
 from docugami_langchain.retrievers.fused_summary import (
     FULL_DOC_SUMMARY_ID_KEY,
     FusedRetrieverKeyValueFetchCallback,
+    FusedRetrieverKeyValueMultiFetchCallback,
     FusedSummaryRetriever,
     SearchType,
 )
@@ -138,6 +139,12 @@ def get_retrieval_tool_for_docset(
         FusedRetrieverKeyValueFetchCallback
     ] = None,
     fetch_parent_doc_callback: Optional[FusedRetrieverKeyValueFetchCallback] = None,
+    fetch_full_doc_summaries_callback: Optional[
+        FusedRetrieverKeyValueMultiFetchCallback
+    ] = None,
+    fetch_parent_docs_callback: Optional[
+        FusedRetrieverKeyValueMultiFetchCallback
+    ] = None,
     retrieval_k: int = DEFAULT_RETRIEVER_K,
     full_doc_summary_id_key: str = FULL_DOC_SUMMARY_ID_KEY,
 ) -> Optional[BaseDocugamiTool]:
@@ -150,8 +157,10 @@ def get_retrieval_tool_for_docset(
         vectorstore=chunk_vectorstore,
         re_ranker=re_ranker,
         fetch_parent_doc_callback=fetch_parent_doc_callback,
+        fetch_parent_docs_callback=fetch_parent_docs_callback,
         full_doc_summary_id_key=full_doc_summary_id_key,
         fetch_full_doc_summary_callback=fetch_full_doc_summary_callback,
+        fetch_full_doc_summaries_callback=fetch_full_doc_summaries_callback,
         retriever_k=retrieval_k,
         search_type=SearchType.mmr,
     )
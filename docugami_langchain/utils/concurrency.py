@@ -0,0 +1,149 @@
+import asyncio
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    Set,
+    TypeVar,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def completed_future(result: R) -> Future[R]:
+    """A future that already has the given result."""
+    future: Future[R] = Future()
+    future.set_result(result)
+    return future
+
+
+def ordered_results(futures: Iterable[Future[R]], max_in_flight: int) -> Iterator[R]:
+    """
+    Yields the results of the given futures in order.
+
+    Futures are pulled from the (possibly lazy) input iterable only as capacity frees
+    up, so at most max_in_flight futures are created but not yet yielded at any time.
+    """
+    in_flight: Deque[Future[R]] = deque()
+    try:
+        for future in futures:
+            in_flight.append(future)
+            if len(in_flight) >= max(max_in_flight, 1):
+                yield in_flight.popleft().result()
+
+        while in_flight:
+            yield in_flight.popleft().result()
+    finally:
+        # Don't start any queued work if the caller stopped early or a task failed
+        for future in in_flight:
+            future.cancel()
+
+
+def ordered_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int,
+) -> Iterator[R]:
+    """
+    Applies fn to each item on a bounded thread pool, yielding results in input order.
+
+    At most 2 * max_workers items are in flight at any time, so results are not all
+    held in memory at once. With max_workers <= 1 items are processed serially on the
+    calling thread.
+
+    >>> list(ordered_map(lambda x: x * 2, range(5), max_workers=3))
+    [0, 2, 4, 6, 8]
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        yield from ordered_results(
+            (executor.submit(fn, item) for item in items), 2 * max_workers
+        )
+
+
+def unordered_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int,
+) -> Iterator[R]:
+    """
+    Applies fn to each item on a bounded thread pool, yielding results as soon as
+    they complete (so one slow item doesn't hold up the rest).
+
+    At most 2 * max_workers items are in flight at any time. With max_workers <= 1
+    items are processed serially on the calling thread.
+
+    >>> sorted(unordered_map(lambda x: x * 2, range(5), max_workers=3))
+    [0, 2, 4, 6, 8]
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight: Set[Future[R]] = set()
+        try:
+            for item in items:
+                if len(in_flight) >= 2 * max_workers:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                in_flight.add(executor.submit(fn, item))
+
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            # Don't start any queued work if the caller stopped early or a task failed
+            for future in in_flight:
+                future.cancel()
+
+
+async def aordered_map(
+    fn: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    max_concurrency: int,
+) -> AsyncIterator[R]:
+    """
+    Async version of ordered_map: awaits fn for at most max_concurrency items at a
+    time, yielding results in input order.
+
+    >>> async def double(x: int) -> int:
+    ...     return x * 2
+    >>> async def collect() -> list[int]:
+    ...     return [r async for r in aordered_map(double, range(5), max_concurrency=3)]
+    >>> asyncio.run(collect())
+    [0, 2, 4, 6, 8]
+    """
+    max_concurrency = max(max_concurrency, 1)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _run(item: T) -> R:
+        async with semaphore:
+            return await fn(item)
+
+    in_flight: Deque[asyncio.Future[R]] = deque()
+    try:
+        for item in items:
+            in_flight.append(asyncio.ensure_future(_run(item)))
+            if len(in_flight) >= 2 * max_concurrency:
+                yield await in_flight.popleft()
+
+        while in_flight:
+            yield await in_flight.popleft()
+    finally:
+        # Don't leave work running if the caller stopped early or a task failed
+        for future in in_flight:
+            future.cancel()
@@ -0,0 +1,47 @@
+from typing import Any
+
+from langchain_core.embeddings import Embeddings
+
+
+class DeduplicatedEmbeddings(Embeddings):
+    """
+    Wraps embeddings so identical texts in a batch (e.g. summaries of boilerplate
+    chunks repeated across documents) are only embedded once, with the embedding
+    shared by every copy. Use in place of the wrapped embeddings when building a
+    vector store, e.g. FAISS.from_documents(docs, DeduplicatedEmbeddings(embeddings)).
+    """
+
+    def __init__(self, embeddings: Embeddings) -> None:
+        self.embeddings = embeddings
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose attributes of the wrapped embeddings, e.g. model_name
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        unique_texts = list(dict.fromkeys(texts))
+        if len(unique_texts) == len(texts):
+            return self.embeddings.embed_documents(texts)
+
+        embeddings_by_text = dict(
+            zip(unique_texts, self.embeddings.embed_documents(unique_texts))
+        )
+        return [embeddings_by_text[text] for text in texts]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        unique_texts = list(dict.fromkeys(texts))
+        if len(unique_texts) == len(texts):
+            return await self.embeddings.aembed_documents(texts)
+
+        embeddings_by_text = dict(
+            zip(unique_texts, await self.embeddings.aembed_documents(unique_texts))
+        )
+        return [embeddings_by_text[text] for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await self.embeddings.aembed_query(text)
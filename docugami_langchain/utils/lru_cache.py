@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Generic, Hashable, Optional, TypeVar, Union, overload
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+D = TypeVar("D")
+
+
+class Missing(Enum):
+    """Type of MISSING (an enum, so type checkers can narrow it away)."""
+
+    MISSING = "MISSING"
+
+
+MISSING = Missing.MISSING
+"""Pass as the default to LRUCache.get to tell misses from cached None values."""
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    """Entries dropped to stay within max_size."""
+
+    expirations: int = 0
+    """Entries dropped for being older than the TTL."""
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Thread-safe in-memory cache holding at most max_size entries, evicting the least
+    recently used entry when full. If ttl_seconds is set, entries expire that long
+    after they were put.
+
+    >>> cache: LRUCache[str, int] = LRUCache(max_size=2)
+    >>> cache.put("a", 1)
+    >>> cache.put("b", 2)
+    >>> cache.get("a")
+    1
+    >>> cache.put("c", 3)  # evicts "b", the least recently used
+    >>> cache.get("b") is None
+    True
+    >>> cache.stats.hit_rate
+    0.5
+    >>> cache.put("d", None)
+    >>> cache.get("d", MISSING) is None
+    True
+    >>> cache.get("e", MISSING)
+    <Missing.MISSING: 'MISSING'>
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = None):
+        self.max_size = max(max_size, 1)
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @overload
+    def get(self, key: K) -> Optional[V]: ...
+
+    @overload
+    def get(self, key: K, default: D) -> Union[V, D]: ...
+
+    def get(self, key: K, default: Optional[D] = None) -> Union[V, D, None]:
+        """
+        The cached value for the given key, or default if not cached (or expired).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None:
+                if time.monotonic() - entry[0] >= self.ttl_seconds:
+                    del self._entries[key]
+                    self.stats.expirations += 1
+                    entry = None
+
+            if entry is None:
+                self.stats.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[1]
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """Drops all entries, e.g. when the underlying data changes."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,258 @@
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Iterator, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_WINDOW_SECONDS = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for the given text (1 token ~= 4 chars in English).
+
+    >>> estimate_tokens("Hello world!")
+    3
+    """
+    return max(len(text) // 4, 1)
+
+
+@dataclass
+class BatchProgress:
+    """Progress of a scheduled batch, as reported after each sub-batch completes."""
+
+    total: int
+    completed: int = 0
+    tokens: int = 0
+    elapsed_seconds: float = 0.0
+    concurrency: int = 1
+
+    @property
+    def items_per_second(self) -> float:
+        return self.completed / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.tokens / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+class BatchScheduler:
+    """
+    Runs a large batch of LLM calls as a series of smaller sub-batches, within
+    requests-per-minute and tokens-per-minute budgets.
+
+    Inputs are grouped by estimated token length, so each sub-batch holds inputs of
+    similar length and no call waits on a much longer neighbour. The number of
+    concurrent calls per sub-batch adapts to what the provider can take: it is
+    raised by one after each sub-batch with steady latency, lowered by one when
+    latency spikes, and halved when a sub-batch fails (e.g. with 429 errors) before
+    the sub-batch is retried.
+
+    A sub-batch fails when fn raises, or when some of its results are exceptions
+    (e.g. from Runnable.batch with return_exceptions set). In the latter case only
+    the items with exception results are retried, and those still failing after
+    max_retries are returned as exceptions rather than raised.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_concurrency: int = 8,
+        initial_concurrency: int = 2,
+        max_retries: int = 3,
+        retry_backoff_seconds: float = 1.0,
+        progress_callback: Optional[Callable[[BatchProgress], None]] = None,
+    ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.progress_callback = progress_callback
+
+        self.concurrency = min(max(initial_concurrency, 1), self.max_concurrency)
+        """Current number of concurrent calls per sub-batch (adapted as it runs)."""
+
+        # Requests and tokens sent in the current rate limit window
+        self._window: Deque[tuple[float, int, int]] = deque()
+
+        # Moving average of sub-batch latency per token of its longest input
+        self._seconds_per_token: Optional[float] = None
+
+    def _wait_for_budget(self, requests: int, tokens: int) -> None:
+        """Blocks until the given requests and tokens fit the per minute budgets."""
+        while True:
+            now = time.monotonic()
+            while (
+                self._window
+                and now - self._window[0][0] >= RATE_LIMIT_WINDOW_SECONDS
+            ):
+                self._window.popleft()
+
+            if not self._window:
+                break  # always allow a sub-batch on its own, even if over budget
+
+            window_requests = sum(w[1] for w in self._window)
+            window_tokens = sum(w[2] for w in self._window)
+            if (
+                not self.requests_per_minute
+                or window_requests + requests <= self.requests_per_minute
+            ) and (
+                not self.tokens_per_minute
+                or window_tokens + tokens <= self.tokens_per_minute
+            ):
+                break
+
+            time.sleep(RATE_LIMIT_WINDOW_SECONDS - (now - self._window[0][0]))
+
+        self._window.append((time.monotonic(), requests, tokens))
+
+    def _next_batch(
+        self, order: list[int], start: int, token_counts: Sequence[int]
+    ) -> list[int]:
+        """Next sub-batch of (length sorted) input indices, within the budgets."""
+        max_size = self.concurrency
+        if self.requests_per_minute:
+            max_size = min(max_size, self.requests_per_minute)
+
+        batch: list[int] = []
+        batch_tokens = 0
+        for index in order[start : start + max_size]:
+            if (
+                batch
+                and self.tokens_per_minute
+                and batch_tokens + token_counts[index] > self.tokens_per_minute
+            ):
+                break
+            batch.append(index)
+            batch_tokens += token_counts[index]
+
+        return batch
+
+    def _adapt_concurrency(self, elapsed: float, max_tokens: int) -> None:
+        seconds_per_token = elapsed / max(max_tokens, 1)
+        if self._seconds_per_token and seconds_per_token > 2 * self._seconds_per_token:
+            # Latency spike, the provider is likely saturated
+            self.concurrency = max(self.concurrency - 1, 1)
+        else:
+            self.concurrency = min(self.concurrency + 1, self.max_concurrency)
+
+        if self._seconds_per_token is None:
+            self._seconds_per_token = seconds_per_token
+        else:
+            self._seconds_per_token = (
+                0.8 * self._seconds_per_token + 0.2 * seconds_per_token
+            )
+
+    def run(
+        self,
+        fn: Callable[[list[T], int], list[R]],
+        items: Sequence[T],
+        token_counts: Sequence[int],
+        retry_callback: Optional[Callable[[int], None]] = None,
+    ) -> list[R]:
+        """
+        Runs fn over all the given items, returning results in input order. fn is
+        called with each sub-batch of items and the number of calls to run
+        concurrently for it, and must return results in the same order. If given,
+        retry_callback is called with the number of items in each retried sub-batch.
+        """
+        results = dict(
+            self.run_as_completed(fn, items, token_counts, retry_callback)
+        )
+        return [results[i] for i in range(len(items))]
+
+    def run_as_completed(
+        self,
+        fn: Callable[[list[T], int], list[R]],
+        items: Sequence[T],
+        token_counts: Sequence[int],
+        retry_callback: Optional[Callable[[int], None]] = None,
+    ) -> Iterator[tuple[int, R]]:
+        """
+        Like run, but yields (input index, result) pairs as each sub-batch completes,
+        so callers can process results incrementally.
+        """
+        order = sorted(range(len(items)), key=lambda i: token_counts[i])
+        progress = BatchProgress(total=len(items), concurrency=self.concurrency)
+        started = time.monotonic()
+
+        position = 0
+        attempt = 0
+        attempts_by_index: dict[int, int] = {}
+        while position < len(order):
+            batch = self._next_batch(order, position, token_counts)
+            batch_tokens = sum(token_counts[i] for i in batch)
+            self._wait_for_budget(len(batch), batch_tokens)
+
+            batch_started = time.monotonic()
+            try:
+                batch_results = fn([items[i] for i in batch], self.concurrency)
+            except Exception as exc:
+                if attempt >= self.max_retries:
+                    raise
+                self.concurrency = max(self.concurrency // 2, 1)
+                logger.warning(
+                    f"Retrying batch of {len(batch)} with concurrency "
+                    f"{self.concurrency} after error: {exc}"
+                )
+                time.sleep(self.retry_backoff_seconds * (2**attempt))
+                attempt += 1
+                if retry_callback:
+                    retry_callback(len(batch))
+                continue
+
+            attempt = 0
+            position += len(batch)
+
+            retry = [
+                index
+                for index, result in zip(batch, batch_results)
+                if isinstance(result, BaseException)
+                and attempts_by_index.get(index, 0) < self.max_retries
+            ]
+            retrying = set(retry)
+            if retry:
+                # Some calls failed (e.g. rate limited), retry them with backoff
+                item_attempt = max(attempts_by_index.get(i, 0) for i in retry)
+                self.concurrency = max(self.concurrency // 2, 1)
+                logger.warning(
+                    f"Retrying {len(retry)} failed items of batch of {len(batch)} "
+                    f"with concurrency {self.concurrency}"
+                )
+                time.sleep(self.retry_backoff_seconds * (2**item_attempt))
+                for index in retry:
+                    attempts_by_index[index] = attempts_by_index.get(index, 0) + 1
+                if retry_callback:
+                    retry_callback(len(retry))
+                order[position:position] = retry
+            else:
+                self._adapt_concurrency(
+                    time.monotonic() - batch_started,
+                    max(token_counts[i] for i in batch),
+                )
+
+            progress.completed += len(batch) - len(retry)
+            progress.tokens += batch_tokens
+            progress.elapsed_seconds = time.monotonic() - started
+            progress.concurrency = self.concurrency
+            logger.info(
+                f"Completed {progress.completed}/{progress.total} "
+                f"({progress.items_per_second:.1f} items/s, "
+                f"{progress.tokens_per_second:.0f} tokens/s, "
+                f"concurrency {progress.concurrency})"
+            )
+            if self.progress_callback:
+                self.progress_callback(progress)
+
+            yield from (
+                (index, result)
+                for index, result in zip(batch, batch_results)
+                if index not in retrying
+            )
@@ -0,0 +1,62 @@
+"""
+Benchmarks memory used by DocugamiLoader chunks as LangChain Documents vs compact
+chunks, loading local test DGML files repeatedly until the target chunk count.
+
+Run from the repo root, e.g.:
+
+    poetry run python -m scripts.benchmark_compact_chunks --chunks 100000
+"""
+
+import argparse
+import gc
+import itertools
+import shutil
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from docugami_langchain.document_loaders.docugami import DocugamiLoader
+from tests.common import TEST_DATA_DIR
+
+
+def _measure(load: Callable[[], list[Any]]) -> tuple[int, int]:
+    gc.collect()
+    tracemalloc.start()
+    chunks = load()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(chunks), current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=100_000)
+    args = parser.parse_args()
+
+    source_files = sorted((TEST_DATA_DIR / "docsets").rglob("*.xml"))
+    chunks_per_pass = len(DocugamiLoader(file_paths=source_files).load())
+    passes = max(1, args.chunks // chunks_per_pass)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Copy files under distinct names, so each copy is a distinct document
+        file_paths = []
+        for i, source_file in itertools.product(range(passes), source_files):
+            file_path = Path(tmp_dir) / f"{i}-{source_file.name}"
+            shutil.copyfile(source_file, file_path)
+            file_paths.append(file_path)
+
+        loader = DocugamiLoader(file_paths=file_paths, parse_in_processes=True)
+        num_chunks, document_bytes = _measure(loader.load)
+        _, compact_bytes = _measure(loader.load_compact)
+
+    per_100k = 100_000 / num_chunks
+    print(f"chunks={num_chunks} documents={len(file_paths)}")
+    print(f"Document:     {document_bytes * per_100k / 1024 / 1024:.1f} MB per 100k chunks")
+    print(f"CompactChunk: {compact_bytes * per_100k / 1024 / 1024:.1f} MB per 100k chunks")
+    print(f"Saved:        {(document_bytes - compact_bytes) * per_100k / 1024 / 1024:.1f} MB per 100k chunks")
+
+
+if __name__ == "__main__":
+    main()
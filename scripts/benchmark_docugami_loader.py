@@ -0,0 +1,53 @@
+"""
+Benchmarks remote DocugamiLoader.load against a local stub of the Docugami API.
+
+Run from the repo root, e.g.:
+
+    poetry run python -m scripts.benchmark_docugami_loader --documents 200 --latency 0.05
+"""
+
+import argparse
+import time
+
+from docugami_langchain.document_loaders.docugami import DocugamiLoader
+from tests.chains.document_loaders.stub_api import STUB_DOCSET_ID, StubDocugamiAPI
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Per-request latency (seconds)"
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument(
+        "--parse-in-processes",
+        action="store_true",
+        help="Parse DGML in worker processes, overlapped with downloads",
+    )
+    args = parser.parse_args()
+
+    for max_concurrency in args.concurrency:
+        with StubDocugamiAPI(
+            num_documents=args.documents, latency_seconds=args.latency
+        ) as api:
+            loader = DocugamiLoader(
+                api=api.url,
+                access_token="benchmark",
+                docset_id=STUB_DOCSET_ID,
+                max_concurrency=max_concurrency,
+                parse_in_processes=args.parse_in_processes,
+            )
+            start = time.perf_counter()
+            chunks = loader.load()
+            elapsed = time.perf_counter() - start
+
+        print(
+            f"max_concurrency={max_concurrency:<3} documents={args.documents} "
+            f"chunks={len(chunks)} elapsed={elapsed:.2f}s "
+            f"({args.documents / elapsed:.1f} docs/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
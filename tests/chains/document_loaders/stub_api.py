@@ -0,0 +1,177 @@
+"""Local stub of the Docugami API, for testing and benchmarking DocugamiLoader."""
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from tests.common import TEST_DATA_DIR
+
+STUB_DOCSET_ID = "stub-docset"
+DEFAULT_STUB_DGML = (TEST_DATA_DIR / "simple-dgml.xml").read_bytes()
+STUB_REPORT_NAMESPACE = "http://www.docugami.com/2021/dgml/publish/report"
+
+
+def stub_report_values_xml(values: dict[str, str]) -> bytes:
+    entries = "".join(
+        f"<pr:Entry><pr:Heading>{heading}</pr:Heading>"
+        f"<pr:Value><pr:Text>{value}</pr:Text></pr:Value></pr:Entry>"
+        for heading, value in values.items()
+    )
+    return (
+        f'<?xml version="1.0" encoding="utf-8"?>'
+        f'<pr:Report xmlns:pr="{STUB_REPORT_NAMESPACE}">{entries}</pr:Report>'
+    ).encode()
+
+
+class StubDocugamiAPI:
+    """
+    Serves a docset of num_documents documents (all with the same DGML) over HTTP
+    on localhost, with optional per-request latency and transient failures. Tests
+    may modify the served document details via the documents list, and add project
+    metadata via project_values (project ID -> document ID -> heading -> value), and
+    make DGML downloads fail via failing_document_ids.
+    """
+
+    def __init__(
+        self,
+        num_documents: int,
+        dgml: bytes = DEFAULT_STUB_DGML,
+        latency_seconds: float = 0.0,
+        transient_failures_per_document: int = 0,
+        page_size: int = 50,
+    ) -> None:
+        self.documents: list[dict] = [
+            {"id": f"doc{i}", "name": self.document_name(i), "version": 1}
+            for i in range(num_documents)
+        ]
+        self.project_values: dict[str, dict[str, dict[str, str]]] = {}
+        self.failing_document_ids: set[str] = set()
+        self.dgml = dgml
+        self.latency_seconds = latency_seconds
+        self.transient_failures_per_document = transient_failures_per_document
+        self.page_size = page_size
+        self.request_counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        assert self._server, "Stub API is not running"
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def document_name(self, index: int) -> str:
+        return f"Document {index:05d}.xml"
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        parsed = urlparse(handler.path)
+        parts = [p for p in parsed.path.split("/") if p]
+        query = parse_qs(parsed.query)
+
+        with self._lock:
+            self.request_counts[parsed.path] += 1
+            request_count = self.request_counts[parsed.path]
+
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+        if parts == ["docsets", STUB_DOCSET_ID, "documents"]:
+            page = int(query.get("page", ["0"])[0])
+            start = page * self.page_size
+            end = min(start + self.page_size, len(self.documents))
+            body: dict = {"documents": self.documents[start:end]}
+            if end < len(self.documents):
+                body["next"] = f"{self.url}{parsed.path}?page={page + 1}"
+            self._send_json(handler, body)
+        elif parts == ["projects"]:
+            projects = [{"id": project_id} for project_id in self.project_values]
+            self._send_json(handler, {"projects": projects})
+        elif (
+            len(parts) == 4
+            and parts[0] == "projects"
+            and parts[2:] == ["artifacts", "latest"]
+            and parts[1] in self.project_values
+        ):
+            artifacts = [
+                {
+                    "name": "report-values.xml",
+                    "url": f"{self.url}/projects/{parts[1]}/artifacts/{doc_id}",
+                    "document": {"id": doc_id},
+                }
+                for doc_id in self.project_values[parts[1]]
+            ]
+            self._send_json(handler, {"artifacts": artifacts})
+        elif (
+            len(parts) == 5
+            and parts[0] == "projects"
+            and parts[2] == "artifacts"
+            and parts[4] == "content"
+        ):
+            values = self.project_values[parts[1]][parts[3]]
+            self._send(handler, 200, stub_report_values_xml(values), "application/xml")
+        elif (
+            len(parts) == 5
+            and parts[:3] == ["docsets", STUB_DOCSET_ID, "documents"]
+            and parts[4] == "dgml"
+        ):
+            if parts[3] in self.failing_document_ids:
+                self._send(handler, 500, b"", "text/plain")
+                return
+            if request_count <= self.transient_failures_per_document:
+                handler.send_response(429)
+                handler.send_header("Retry-After", "0")
+                handler.send_header("Content-Length", "0")
+                handler.end_headers()
+                return
+            self._send(handler, 200, self.dgml, "application/xml")
+        else:
+            self._send(handler, 404, b"", "text/plain")
+
+    def _send_json(self, handler: BaseHTTPRequestHandler, body: dict) -> None:
+        self._send(handler, 200, json.dumps(body).encode(), "application/json")
+
+    def _send(
+        self,
+        handler: BaseHTTPRequestHandler,
+        status: int,
+        content: bytes,
+        content_type: str,
+    ) -> None:
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(content)))
+        handler.end_headers()
+        handler.wfile.write(content)
+
+    def __enter__(self) -> "StubDocugamiAPI":
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so connection pooling matters
+
+            def do_GET(self) -> None:
+                stub._handle(self)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
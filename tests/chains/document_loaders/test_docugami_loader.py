@@ -1,8 +1,16 @@
 """Test DocugamiLoader."""
 
+import time
+from pathlib import Path
+
 import pytest
+import requests
+from langchain_core.documents import Document
 
+from docugami_langchain.document_loaders.cache import FileSystemDocugamiCache
+from docugami_langchain.document_loaders.compact import to_documents
 from docugami_langchain.document_loaders.docugami import DocugamiLoader
+from tests.chains.document_loaders.stub_api import STUB_DOCSET_ID, StubDocugamiAPI
 from tests.common import TEST_DATA_DIR
 
 
@@ -23,3 +31,333 @@ def test_docugami_loader_local() -> None:
 def test_docugami_initialization() -> None:
     """Test correct initialization in remote mode."""
     DocugamiLoader(access_token="test", docset_id="123")
+
+
+@pytest.mark.requires("dgml_utils")
+def test_docugami_loader_remote_concurrent() -> None:
+    """Test concurrent remote loading is ordered like serial loading, with retries."""
+    with StubDocugamiAPI(
+        num_documents=12, page_size=5, transient_failures_per_document=1
+    ) as api:
+        serial_docs = DocugamiLoader(
+            api=api.url,
+            access_token="test",
+            docset_id=STUB_DOCSET_ID,
+            retry_backoff_seconds=0,
+        ).load()
+
+    with StubDocugamiAPI(
+        num_documents=12, page_size=5, transient_failures_per_document=1
+    ) as api:
+        concurrent_docs = DocugamiLoader(
+            api=api.url,
+            access_token="test",
+            docset_id=STUB_DOCSET_ID,
+            max_concurrency=4,
+            retry_backoff_seconds=0,
+        ).load()
+
+        # Each DGML download was retried once after a 429
+        assert api.request_counts[f"/docsets/{STUB_DOCSET_ID}/documents/doc0/dgml"] == 2
+
+    assert len(concurrent_docs) == 12 * 25
+    assert [d.metadata for d in concurrent_docs] == [d.metadata for d in serial_docs]
+    assert concurrent_docs[0].metadata["name"] == api.document_name(0)
+    assert concurrent_docs[-1].metadata["name"] == api.document_name(11)
+
+
+@pytest.mark.requires("dgml_utils")
+def test_docugami_loader_remote_parse_in_processes() -> None:
+    """Test parsing in worker processes gives the same chunks (and parent links)."""
+    with StubDocugamiAPI(num_documents=6) as api:
+        serial_docs = DocugamiLoader(
+            api=api.url,
+            access_token="test",
+            docset_id=STUB_DOCSET_ID,
+            parent_hierarchy_levels=2,
+        ).load()
+        pipelined_docs = DocugamiLoader(
+            api=api.url,
+            access_token="test",
+            docset_id=STUB_DOCSET_ID,
+            parent_hierarchy_levels=2,
+            max_concurrency=3,
+            parse_in_processes=True,
+            max_parse_workers=2,
+        ).load()
+
+    assert any("doc_id" in d.metadata for d in serial_docs)
+    assert [(d.page_content, d.metadata) for d in pipelined_docs] == [
+        (d.page_content, d.metadata) for d in serial_docs
+    ]
+
+
+@pytest.mark.requires("dgml_utils")
+@pytest.mark.asyncio
+async def test_docugami_loader_remote_lazy_load() -> None:
+    """Test lazy (sync and async) loading streams the same chunks as load."""
+    with StubDocugamiAPI(num_documents=5) as api:
+        loader = DocugamiLoader(
+            api=api.url,
+            access_token="test",
+            docset_id=STUB_DOCSET_ID,
+            max_concurrency=2,
+        )
+        docs = loader.load()
+
+        lazy_docs = loader.lazy_load()
+        first_doc = next(lazy_docs)
+        assert first_doc.metadata == docs[0].metadata
+        assert [first_doc] + list(lazy_docs) == docs
+
+        async_docs = [doc async for doc in loader.alazy_load()]
+        assert async_docs == docs
+
+
+@pytest.mark.requires("dgml_utils")
+def test_docugami_loader_remote_incremental_sync(tmp_path: Path) -> None:
+    """Test incremental sync only loads new or changed documents."""
+    with StubDocugamiAPI(num_documents=4) as api:
+        loader = DocugamiLoader(
+            api=api.url,
+            access_token="test",
+            docset_id=STUB_DOCSET_ID,
+            manifest_path=tmp_path / "manifest.json",
+        )
+        assert len(loader.load()) == 4 * 25
+        assert loader.last_sync
+        assert len(loader.last_sync.new_document_ids) == 4
+
+        # Nothing changed, nothing to load
+        assert loader.load() == []
+
+        # One changed, one deleted, one added
+        api.documents[0]["version"] = 2
+        deleted = api.documents.pop(1)
+        api.documents.append({"id": "doc-new", "name": "New.xml", "version": 1})
+        docs = loader.load()
+
+        assert {d.metadata["name"] for d in docs} == {api.document_name(0), "New.xml"}
+        assert loader.last_sync.new_document_ids == ["doc-new"]
+        assert loader.last_sync.changed_document_ids == ["doc0"]
+        assert loader.last_sync.deleted_document_ids == [deleted["id"]]
+        assert api.request_counts[f"/docsets/{STUB_DOCSET_ID}/documents/doc2/dgml"] == 1
+
+        # Different chunking settings re-load everything
+        loader.max_text_length = 1024
+        assert len(loader.load()) > 0
+        assert len(loader.last_sync.changed_document_ids) == 4
+
+
+def test_docugami_loader_remote_timeout() -> None:
+    """Test requests that hang time out, and are retried before giving up."""
+    with StubDocugamiAPI(num_documents=1, latency_seconds=0.5) as api:
+        loader = DocugamiLoader(
+            api=api.url,
+            access_token="test",
+            docset_id=STUB_DOCSET_ID,
+            max_retries=1,
+            retry_backoff_seconds=0,
+            request_timeout_seconds=(1.0, 0.1),
+        )
+        with pytest.raises(requests.Timeout):
+            loader.load()
+
+        assert api.request_counts[f"/docsets/{STUB_DOCSET_ID}/documents"] == 2
+
+
+@pytest.mark.requires("dgml_utils")
+def test_docugami_loader_remote_cache(tmp_path: Path) -> None:
+    """Test cached DGML and chunks are re-used across loads."""
+    cache = FileSystemDocugamiCache(tmp_path / "cache")
+    dgml_path = f"/docsets/{STUB_DOCSET_ID}/documents/doc0/dgml"
+    with StubDocugamiAPI(num_documents=3) as api:
+        loader = DocugamiLoader(
+            api=api.url,
+            access_token="test",
+            docset_id=STUB_DOCSET_ID,
+            cache=cache,
+        )
+        docs = loader.load()
+        assert loader.load() == docs
+        assert api.request_counts[dgml_path] == 1
+
+        # New chunking settings re-parse the cached DGML
+        loader.max_text_length = 64
+        assert loader.load() != docs
+        assert api.request_counts[dgml_path] == 1
+
+        # New document versions are downloaded again
+        api.documents[0]["version"] = 2
+        loader.load()
+        assert api.request_counts[dgml_path] == 2
+
+
+def test_docugami_cache_eviction(tmp_path: Path) -> None:
+    """Test least recently used cache entries are evicted when over the max size."""
+    cache = FileSystemDocugamiCache(tmp_path / "cache", max_size_bytes=2500)
+    for i in range(3):
+        cache.update_dgml(f"doc{i}", "v1", b"x" * 1000)
+        time.sleep(0.01)  # distinct mtimes
+
+    assert cache.size_bytes <= 2500
+    assert cache.lookup_dgml("doc0", "v1") is None
+    assert cache.lookup_dgml("doc2", "v1") == b"x" * 1000
+
+    chunks = [Document(page_content="chunk", metadata={"id": "1"})]
+    cache.update_chunks("key", chunks)
+    assert cache.lookup_chunks("key") == chunks
+
+
+@pytest.mark.requires("dgml_utils")
+def test_docugami_loader_remote_project_metadata() -> None:
+    """Test project metadata from all projects is fetched and merged into chunks."""
+    with StubDocugamiAPI(num_documents=3) as api:
+        api.project_values = {
+            "project0": {
+                "doc0": {"Party": "Acme Corp", "Term": "x" * 1000},
+                "doc1": {"Party": "Globex"},
+            },
+            "project1": {"doc0": {"Effective Date": "2024-01-01"}},
+        }
+        serial_docs = DocugamiLoader(
+            api=api.url, access_token="test", docset_id=STUB_DOCSET_ID
+        ).load()
+        concurrent_docs = DocugamiLoader(
+            api=api.url, access_token="test", docset_id=STUB_DOCSET_ID, max_concurrency=4
+        ).load()
+
+    assert [d.metadata for d in concurrent_docs] == [d.metadata for d in serial_docs]
+
+    doc0_metadata = concurrent_docs[0].metadata
+    assert doc0_metadata["Party"] == "Acme Corp"
+    assert doc0_metadata["Effective Date"] == "2024-01-01"
+    assert len(doc0_metadata["Term"]) == 512
+
+    doc2_metadata = concurrent_docs[-1].metadata
+    assert doc2_metadata["name"] == api.document_name(2)
+    assert "Party" not in doc2_metadata
+
+
+@pytest.mark.requires("dgml_utils")
+@pytest.mark.asyncio
+async def test_docugami_loader_remote_aload() -> None:
+    """Test async load matches load, including retries and project metadata."""
+    with StubDocugamiAPI(num_documents=6, transient_failures_per_document=1) as api:
+        api.project_values = {
+            "project0": {"doc0": {"Party": "Acme Corp"}, "doc3": {"Party": "Globex"}},
+        }
+        docs = DocugamiLoader(
+            api=api.url, access_token="test", docset_id=STUB_DOCSET_ID
+        ).load()
+
+        for parse_in_processes in (False, True):
+            loader = DocugamiLoader(
+                api=api.url,
+                access_token="test",
+                docset_id=STUB_DOCSET_ID,
+                max_concurrency=3,
+                retry_backoff_seconds=0,
+                parse_in_processes=parse_in_processes,
+            )
+            async_docs = await loader.aload()
+            assert [(d.page_content, d.metadata) for d in async_docs] == [
+                (d.page_content, d.metadata) for d in docs
+            ]
+
+    assert docs[0].metadata["Party"] == "Acme Corp"
+
+
+@pytest.mark.requires("dgml_utils")
+def test_docugami_loader_local_parse_in_processes(tmp_path: Path) -> None:
+    """Test local files parsed in worker processes (and cached) match serial parsing."""
+    file_paths = list((TEST_DATA_DIR / "docsets").rglob("*.xml"))[:6]
+    serial_docs = DocugamiLoader(file_paths=file_paths).load()
+
+    cache = FileSystemDocugamiCache(tmp_path / "cache")
+    loader = DocugamiLoader(
+        file_paths=file_paths,
+        parse_in_processes=True,
+        max_parse_workers=2,
+        cache=cache,
+    )
+    assert loader.load() == serial_docs
+    assert cache.size_bytes > 0
+    assert loader.load() == serial_docs
+
+
+@pytest.mark.requires("dgml_utils")
+def test_docugami_loader_remote_parse_in_processes_cache(tmp_path: Path) -> None:
+    """Test chunks parsed in worker processes are cached without project metadata."""
+    cache = FileSystemDocugamiCache(tmp_path / "cache")
+    with StubDocugamiAPI(num_documents=4) as api:
+        api.project_values = {"project0": {"doc0": {"Party": "Acme Corp"}}}
+        loader = DocugamiLoader(
+            api=api.url,
+            access_token="test",
+            docset_id=STUB_DOCSET_ID,
+            parse_in_processes=True,
+            max_parse_workers=2,
+            cache=cache,
+        )
+        docs = loader.load()
+        assert docs[0].metadata["Party"] == "Acme Corp"
+
+        loader.include_project_metadata_in_doc_metadata = False
+        cached_docs = loader.load()
+
+    assert len(cached_docs) == len(docs)
+    assert not any("Party" in doc.metadata for doc in cached_docs)
+
+
+@pytest.mark.requires("dgml_utils")
+def test_docugami_loader_remote_resume_from_checkpoint(tmp_path: Path) -> None:
+    """Test a failed load resumes from its checkpoint when re-run."""
+    checkpoint_dir = tmp_path / "checkpoint"
+    checkpoint_dir.mkdir()
+    (checkpoint_dir / "notes.txt").write_text("Unrelated file")
+    with StubDocugamiAPI(num_documents=5) as api:
+        loader = DocugamiLoader(
+            api=api.url,
+            access_token="test",
+            docset_id=STUB_DOCSET_ID,
+            checkpoint_dir=checkpoint_dir,
+            max_retries=0,
+        )
+        api.failing_document_ids = {"doc3"}
+        with pytest.raises(Exception, match="status: 500"):
+            loader.load()
+
+        api.failing_document_ids = set()
+        api.documents[1]["version"] = 2  # changed since its chunks were checkpointed
+        docs = loader.load()
+
+        assert len(docs) == 5 * 25
+        assert docs[0].metadata["name"] == api.document_name(0)
+        # Only the failed and changed documents are downloaded twice
+        for i in range(5):
+            dgml_path = f"/docsets/{STUB_DOCSET_ID}/documents/doc{i}/dgml"
+            assert api.request_counts[dgml_path] == (2 if i in (1, 3) else 1)
+
+    # The checkpoint is deleted, leaving other files in the directory alone
+    assert [p.name for p in checkpoint_dir.iterdir()] == ["notes.txt"]
+
+
+@pytest.mark.requires("dgml_utils")
+def test_docugami_loader_compact() -> None:
+    """Test compact chunks share per-document metadata and convert back to Documents."""
+    with StubDocugamiAPI(num_documents=2) as api:
+        api.project_values = {"project0": {"doc0": {"Party": "Acme Corp"}}}
+        loader = DocugamiLoader(
+            api=api.url,
+            access_token="test",
+            docset_id=STUB_DOCSET_ID,
+            parent_hierarchy_levels=2,
+        )
+        docs = loader.load()
+        compact = loader.load_compact()
+
+    assert to_documents(compact) == docs
+    assert compact[0].document is compact[1].document
+    assert compact[0].document.shared["Party"] == "Acme Corp"
+    assert compact[0].document is not compact[-1].document
@@ -22,6 +22,7 @@ from docugami_langchain.retrievers.mappings import (
     build_doc_maps_from_chunks,
     build_full_doc_summary_mappings,
 )
+from docugami_langchain.utils.embeddings import DeduplicatedEmbeddings
 
 TEST_DATA_DIR = Path(__file__).parent / "testdata"
 EXAMPLES_PATH = TEST_DATA_DIR / "examples"
@@ -123,7 +124,7 @@ def build_test_retrieval_artifacts(
         documents=list(
             chunk_summaries_by_id.values()
         ),  # embed chunk summaries for small to big retrieval
-        embedding=embeddings,
+        embedding=DeduplicatedEmbeddings(embeddings),
     )
 
     def _fetch_parent_doc_callback(key: str) -> Optional[str]:
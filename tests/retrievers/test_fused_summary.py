@@ -0,0 +1,305 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Union
+
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores.faiss import FAISS
+from langchain_core.documents import Document
+from rerankers.documents import Document as RerankerDocument
+from rerankers.models.ranker import BaseRanker
+from rerankers.results import RankedResults, Result
+
+from docugami_langchain.retrievers.fused_summary import (
+    FULL_DOC_SUMMARY_ID_KEY,
+    PARENT_DOC_ID_KEY,
+    SOURCE_KEY,
+    FusedSummaryRetriever,
+    SearchType,
+)
+from docugami_langchain.utils.lru_cache import LRUCache
+
+PARENTS_BY_ID = {
+    f"chunk-{d}-{c}": f"Parent chunk {c} of doc {d}" for d in range(3) for c in range(4)
+}
+SUMMARIES_BY_ID = {f"doc-{d}": f"Summary of doc {d}" for d in range(3)}
+
+
+def _vectorstore() -> FAISS:
+    return FAISS.from_documents(
+        [
+            Document(
+                page_content=f"Summary of chunk {c} of doc {d}",
+                metadata={
+                    PARENT_DOC_ID_KEY: f"chunk-{d}-{c}",
+                    FULL_DOC_SUMMARY_ID_KEY: f"doc-{d}",
+                    SOURCE_KEY: f"doc-{d}.xml",
+                },
+            )
+            for d in range(3)
+            for c in range(4)
+        ],
+        DeterministicFakeEmbedding(size=8),
+    )
+
+
+def test_fused_summary_retriever_batched_fetch() -> None:
+    """Test parents and full doc summaries are fetched in one bulk call each."""
+    vectorstore = _vectorstore()
+    fetched: list[list[str]] = []
+
+    def _fetch_parents(keys: list[str]) -> list[Optional[str]]:
+        fetched.append(keys)
+        return [PARENTS_BY_ID.get(key) for key in keys]
+
+    def _fetch_summaries(keys: list[str]) -> list[Optional[str]]:
+        fetched.append(keys)
+        return [SUMMARIES_BY_ID.get(key) for key in keys]
+
+    single_fetched: list[str] = []
+
+    def _fetch_one(key: str) -> Optional[str]:
+        single_fetched.append(key)
+        return PARENTS_BY_ID.get(key) or SUMMARIES_BY_ID.get(key)
+
+    batched = FusedSummaryRetriever(
+        vectorstore=vectorstore,
+        fetch_parent_docs_callback=_fetch_parents,
+        fetch_full_doc_summaries_callback=_fetch_summaries,
+        fetch_parent_doc_callback=_fetch_one,
+        retriever_k=12,
+        search_type=SearchType.similarity,
+    )
+    docs = batched.invoke("chunk")
+
+    assert not single_fetched
+    assert len(fetched) == 2
+    assert sorted(fetched[0]) == sorted(PARENTS_BY_ID)
+    assert sorted(fetched[1]) == sorted(SUMMARIES_BY_ID)  # each doc fetched once
+
+    # Per-ID callbacks still work as a fallback, with the same results
+    per_id = FusedSummaryRetriever(
+        vectorstore=vectorstore,
+        fetch_parent_doc_callback=_fetch_one,
+        fetch_full_doc_summary_callback=_fetch_one,
+        retriever_k=12,
+        search_type=SearchType.similarity,
+    )
+    assert per_id.invoke("chunk") == docs
+    assert len(single_fetched) == len(PARENTS_BY_ID) + len(SUMMARIES_BY_ID)
+
+    assert len(docs) == 3
+    for d in range(3):
+        assert any(
+            f"Summary of doc {d}" in doc.page_content
+            and f"Parent chunk 3 of doc {d}" in doc.page_content
+            for doc in docs
+        )
+
+
+@pytest.mark.asyncio
+async def test_fused_summary_retriever_async() -> None:
+    """Test async retrieval matches sync, using async fetch callbacks if given."""
+    vectorstore = _vectorstore()
+
+    def _fetch_parent(key: str) -> Optional[str]:
+        return PARENTS_BY_ID.get(key)
+
+    def _fetch_summary(key: str) -> Optional[str]:
+        return SUMMARIES_BY_ID.get(key)
+
+    async_fetched: list[str] = []
+
+    async def _afetch_parent(key: str) -> Optional[str]:
+        async_fetched.append(key)
+        return PARENTS_BY_ID.get(key)
+
+    async def _afetch_summaries(keys: list[str]) -> list[Optional[str]]:
+        async_fetched.extend(keys)
+        return [SUMMARIES_BY_ID.get(key) for key in keys]
+
+    retriever = FusedSummaryRetriever(
+        vectorstore=vectorstore,
+        fetch_parent_doc_callback=_fetch_parent,
+        fetch_full_doc_summary_callback=_fetch_summary,
+        retriever_k=8,
+    )
+    expected = retriever.invoke("chunk")
+
+    # Sync callbacks only: these are run in an executor
+    assert await retriever.ainvoke("chunk") == expected
+
+    retriever.afetch_parent_doc_callback = _afetch_parent
+    retriever.afetch_full_doc_summaries_callback = _afetch_summaries
+    assert await retriever.ainvoke("chunk") == expected
+    assert len([key for key in async_fetched if key.startswith("chunk-")]) == 8
+    summary_keys = [key for key in async_fetched if key.startswith("doc-")]
+    assert len(summary_keys) == len(set(summary_keys))
+
+
+def test_fused_summary_retriever_caches() -> None:
+    """Test query results and fetched values are cached until invalidated."""
+    fetched: list[str] = []
+
+    def _fetch(key: str) -> Optional[str]:
+        fetched.append(key)
+        return PARENTS_BY_ID.get(key) or SUMMARIES_BY_ID.get(key)
+
+    retriever = FusedSummaryRetriever(
+        vectorstore=_vectorstore(),
+        fetch_parent_doc_callback=_fetch,
+        fetch_full_doc_summary_callback=_fetch,
+        retriever_k=4,
+        search_type=SearchType.similarity,
+        query_cache=LRUCache(max_size=8),
+        fetch_cache=LRUCache(max_size=64),
+    )
+
+    docs = retriever.invoke("Chunk 1")
+    num_fetched = len(fetched)
+    assert retriever.invoke("  chunk   1 ") == docs  # normalized query hits the cache
+    assert len(fetched) == num_fetched
+    assert retriever.query_cache is not None
+    assert retriever.query_cache.stats.hits == 1
+
+    # Different search settings miss the query cache, but reuse fetched values
+    retriever.search_kwargs = {"k": 12}
+    retriever.invoke("Chunk 1")
+    assert len(fetched) == len(PARENTS_BY_ID) + len(SUMMARIES_BY_ID)
+    assert retriever.fetch_cache is not None
+    assert retriever.fetch_cache.stats.hits == num_fetched
+
+    retriever.invalidate_caches()
+    retriever.invoke("Chunk 1")
+    assert len(fetched) == 2 * (len(PARENTS_BY_ID) + len(SUMMARIES_BY_ID))
+
+
+def test_fused_summary_retriever_caches_misses() -> None:
+    """Test empty query results and values not found are cached too."""
+    fetched: list[str] = []
+
+    def _fetch_parent(key: str) -> Optional[str]:
+        fetched.append(key)
+        return PARENTS_BY_ID.get(key)
+
+    def _fetch_missing_summary(key: str) -> Optional[str]:
+        fetched.append(key)
+        return None
+
+    vectorstore = _vectorstore()
+    searches: list[str] = []
+    similarity_search = vectorstore.similarity_search
+
+    def _similarity_search(query: str, **kwargs: Any) -> list[Document]:
+        searches.append(query)
+        return similarity_search(query, **kwargs)
+
+    vectorstore.similarity_search = _similarity_search  # type: ignore
+    retriever = FusedSummaryRetriever(
+        vectorstore=vectorstore,
+        fetch_parent_doc_callback=_fetch_parent,
+        fetch_full_doc_summary_callback=_fetch_missing_summary,
+        retriever_k=4,
+        search_type=SearchType.similarity,
+        query_cache=LRUCache(max_size=8),
+        fetch_cache=LRUCache(max_size=64),
+    )
+
+    assert retriever.invoke("Chunk 1", filter={SOURCE_KEY: "missing.xml"}) == []
+    assert retriever.invoke("Chunk 1", filter={SOURCE_KEY: "missing.xml"}) == []
+    assert len(searches) == 1
+
+    retriever.invoke("Chunk 1")
+    num_fetched = len(fetched)
+    assert any(key.startswith("doc-") for key in fetched)
+    retriever.invoke("Chunk 1", k=3)  # misses the query cache, not the fetch cache
+    assert len(fetched) == num_fetched
+
+
+@pytest.mark.asyncio
+async def test_fused_summary_retriever_per_call_options() -> None:
+    """Test per-call options don't change the retriever, even when concurrent."""
+    retriever = FusedSummaryRetriever(
+        vectorstore=_vectorstore(),
+        retriever_k=12,
+        search_type=SearchType.similarity,
+    )
+
+    def _num_fragments(docs: list[Document]) -> int:
+        return sum(doc.page_content.count("Summary of chunk") for doc in docs)
+
+    assert _num_fragments(retriever.invoke("chunk")) == 12
+    assert _num_fragments(retriever.invoke("chunk", k=2)) == 2
+    assert _num_fragments(await retriever.ainvoke("chunk", k=3)) == 3
+    filtered = retriever.invoke("chunk", filter={SOURCE_KEY: "doc-1.xml"})
+    assert [doc.page_content.count("doc-1.xml") for doc in filtered] == [1]
+    assert retriever.search_kwargs == {}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        counts = list(
+            executor.map(
+                lambda k: _num_fragments(retriever.invoke("chunk", k=k)),
+                [1, 5, 2, 8, 3, 12] * 4,
+            )
+        )
+    assert counts == [1, 5, 2, 8, 3, 12] * 4
+
+
+class FakeRanker(BaseRanker):
+    """Fake re-ranker scoring docs by the query words they contain."""
+
+    def __init__(self) -> None:
+        self.ranked: list[str] = []
+
+    def score(self, query: str, doc: str) -> float:
+        return float(sum(word in doc.split() for word in query.split()))
+
+    def rank(
+        self,
+        query: str,
+        docs: Union[str, list[str], RerankerDocument, list[RerankerDocument]],
+        doc_ids: Optional[Union[list[str], list[int]]] = None,
+    ) -> RankedResults:
+        assert isinstance(docs, list) and doc_ids is not None
+        self.ranked.extend(str(doc) for doc in docs)
+        return RankedResults(
+            results=[
+                Result(
+                    RerankerDocument(text=str(doc), doc_id=doc_id),
+                    score=self.score(query, str(doc)),
+                )
+                for doc, doc_id in zip(docs, doc_ids)
+            ],
+            query=query,
+            has_scores=True,
+        )
+
+
+@pytest.mark.filterwarnings("ignore:Relevance scores must be between 0 and 1")
+def test_fused_summary_retriever_two_stage_re_rank() -> None:
+    """Test candidates to re-rank are bounded, and re-rank scores are cached."""
+    re_ranker = FakeRanker()
+    retriever = FusedSummaryRetriever(
+        vectorstore=_vectorstore(),
+        re_ranker=re_ranker,
+        re_rank_max_candidates=6,
+        re_rank_score_cache=LRUCache(max_size=64),
+        retriever_k=12,
+        search_type=SearchType.similarity,
+    )
+
+    docs = retriever.invoke("chunk 1 of doc 2")
+    assert len(re_ranker.ranked) == 6
+    assert docs
+
+    # Repeated queries are filtered the same way, without re-ranking again
+    assert retriever.invoke("chunk 1 of doc 2") == docs
+    assert len(re_ranker.ranked) == 6
+
+    # Only candidates without cached scores are re-ranked
+    retriever.invoke("chunk 1 of doc 2", re_rank_max_candidates=12)
+    assert len(re_ranker.ranked) == 12
+    assert len(set(re_ranker.ranked)) == 12
+
+    # Low relevance results are dropped before reaching the re-ranker
+    assert retriever.invoke("chunk 3", re_rank_min_relevance_score=1.1) == []
+    assert len(re_ranker.ranked) == 12
@@ -0,0 +1,679 @@
+import asyncio
+import hashlib
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+import pytest
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.documents import Document
+from langchain_core.language_models.llms import LLM
+from pytest_mock import MockerFixture
+
+from docugami_langchain.document_loaders.docugami import DocugamiLoader
+from docugami_langchain.retrievers import mappings, summary_cache
+from docugami_langchain.retrievers.fused_summary import (
+    FULL_DOC_SUMMARY_ID_KEY,
+    PARENT_DOC_ID_KEY,
+)
+from docugami_langchain.retrievers.mappings import (
+    SummaryFailureReport,
+    abuild_chunk_summary_mappings,
+    build_chunk_summary_mappings,
+    build_doc_maps_from_chunks,
+    build_map_reduce_full_doc_summary_mappings,
+    iter_chunk_summary_mappings,
+)
+from docugami_langchain.retrievers.summary_cache import SQLiteSummaryCache
+from docugami_langchain.retrievers.summary_stats import (
+    SummaryInstrumentation,
+    SummaryProgressEvent,
+)
+from docugami_langchain.utils.scheduler import BatchScheduler
+from tests.common import TEST_DATA_DIR
+
+
+class FakeSummaryLLM(LLM):
+    """Fake LLM that "summarizes" each prompt to its hash, recording each call."""
+
+    prompts: list[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-summary"
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        self.prompts.append(prompt)
+        if "FAIL" in prompt or ("FLAKY" in prompt and self.prompts.count(prompt) == 1):
+            raise ValueError("LLM call failed")
+        if "SLOW" in prompt:
+            time.sleep(0.5)
+        return f"Summary {hashlib.md5(prompt.encode()).hexdigest()}"
+
+
+class AsyncFakeSummaryLLM(FakeSummaryLLM):
+    """Fake summary LLM that records the most async calls in flight at once."""
+
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    async def _acall(
+        self,
+        prompt: str,
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self._call(prompt, stop)
+
+
+def _chunks(texts: list[str]) -> dict[str, Document]:
+    return {
+        hashlib.md5(text.encode()).hexdigest(): Document(page_content=text, metadata={})
+        for text in texts
+    }
+
+
+def test_chunk_summary_mappings_cache(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test unchanged chunks are not re-summarized when a summary cache is given."""
+    texts = [f"Chunk {i} text about clause {i}." for i in range(5)]
+    llm = FakeSummaryLLM(prompts=[], cache=False)
+    embeddings = FakeEmbeddings(size=8)
+    cache = SQLiteSummaryCache(tmp_path / "summaries.db")
+    prompt_version = mocker.spy(summary_cache, "prompt_version")
+
+    summaries = build_chunk_summary_mappings(
+        _chunks(texts), llm, embeddings, min_length_to_summarize=0, summary_cache=cache
+    )
+    assert len(llm.prompts) == 5
+    assert prompt_version.call_count == 1  # once per build, not per chunk
+
+    # Re-index with one chunk changed: only that chunk is summarized again
+    texts[2] = "Chunk 2 text, as amended."
+    resummarized = build_chunk_summary_mappings(
+        _chunks(texts), llm, embeddings, min_length_to_summarize=0, summary_cache=cache
+    )
+    assert len(llm.prompts) == 6
+    assert "Chunk 2 text, as amended." in llm.prompts[-1]
+
+    unchanged_ids = [id for id in summaries if id in resummarized]
+    assert len(unchanged_ids) == 4
+    for id in unchanged_ids:
+        assert resummarized[id].page_content == summaries[id].page_content
+
+    # Different chain settings (and hence prompts) don't reuse cached summaries
+    build_chunk_summary_mappings(
+        _chunks(texts),
+        llm,
+        embeddings,
+        min_length_to_summarize=0,
+        max_length_cutoff=16,
+        summary_cache=cache,
+    )
+    assert len(llm.prompts) == 11
+
+
+def test_chunk_summary_mappings_skip_short_chunks() -> None:
+    """Test short chunks are passed through without calling the LLM."""
+    texts = ["Short chunk.", "A" * 100, "Another short chunk.", "B" * 5000]
+    llm = FakeSummaryLLM(prompts=[], cache=False)
+    embeddings = FakeEmbeddings(size=8)
+
+    summaries = build_chunk_summary_mappings(
+        _chunks(texts),
+        llm,
+        embeddings,
+        min_length_to_summarize=50,
+        max_length_cutoff=1000,
+    )
+
+    assert len(llm.prompts) == 2
+    assert [s.page_content for s in summaries.values()][0::2] == [
+        "Short chunk.",
+        "Another short chunk.",
+    ]
+    assert list(summaries) == list(_chunks(texts))
+
+    # Nothing long enough to summarize: the LLM is not called at all
+    build_chunk_summary_mappings(
+        _chunks(texts[0::2]), llm, embeddings, min_length_to_summarize=50
+    )
+    assert len(llm.prompts) == 2
+
+
+def test_chunk_summary_mappings_scheduler() -> None:
+    """Test scheduled summarization matches a single batch."""
+    texts = [f"Chunk {i} " + "text " * i * 20 for i in range(10)]
+    embeddings = FakeEmbeddings(size=8)
+
+    batch_summaries = build_chunk_summary_mappings(
+        _chunks(texts),
+        FakeSummaryLLM(prompts=[], cache=False),
+        embeddings,
+        min_length_to_summarize=0,
+    )
+
+    llm = FakeSummaryLLM(prompts=[], cache=False)
+    scheduled_summaries = build_chunk_summary_mappings(
+        _chunks(texts),
+        llm,
+        embeddings,
+        min_length_to_summarize=0,
+        scheduler=BatchScheduler(requests_per_minute=1000, max_concurrency=3),
+    )
+
+    assert len(llm.prompts) == 10
+    assert [d.page_content for d in scheduled_summaries.values()] == [
+        d.page_content for d in batch_summaries.values()
+    ]
+
+
+def test_chunk_summary_mappings_scheduler_retries_failures() -> None:
+    """Test the scheduler retries failed summaries itself, with a failure report."""
+    texts = ["FLAKY chunk text. " * 10, "FAIL chunk text. " * 10]
+    texts += [f"Chunk {i} text. " * 10 for i in range(4)]
+    llm = FakeSummaryLLM(prompts=[], cache=False)
+    report = SummaryFailureReport(max_retries=0, fallback_length=20)
+    scheduler = BatchScheduler(
+        max_concurrency=4,
+        initial_concurrency=4,
+        max_retries=2,
+        retry_backoff_seconds=0,
+    )
+
+    summaries = build_chunk_summary_mappings(
+        _chunks(texts),
+        llm,
+        FakeEmbeddings(size=8),
+        min_length_to_summarize=10,
+        failure_report=report,
+        scheduler=scheduler,
+    )
+
+    assert list(summaries) == list(_chunks(texts))
+    assert [d.page_content for d in summaries.values()][1] == texts[1][:20]
+    assert len(llm.prompts) == 6 + 1 + 2
+    assert [f.attempts for f in report.failures] == [3]
+
+
+def test_iter_chunk_summary_mappings() -> None:
+    """Test streamed summaries are yielded as they complete, not in input order."""
+    texts = ["SLOW chunk text."] + [f"Chunk {i} text." for i in range(5)]
+    texts.append("Short")
+    embeddings = FakeEmbeddings(size=8)
+
+    summaries = build_chunk_summary_mappings(
+        _chunks(texts),
+        FakeSummaryLLM(prompts=[], cache=False),
+        embeddings,
+        min_length_to_summarize=10,
+    )
+
+    streamed = list(
+        iter_chunk_summary_mappings(
+            _chunks(texts),
+            FakeSummaryLLM(prompts=[], cache=False),
+            embeddings,
+            min_length_to_summarize=10,
+            max_concurrency=3,
+        )
+    )
+
+    slow_id, short_id = list(summaries)[0], list(summaries)[-1]
+    assert streamed[0][0] == short_id
+    assert streamed[-1][0] == slow_id
+    assert {id: doc.page_content for id, doc in streamed} == {
+        id: doc.page_content for id, doc in summaries.items()
+    }
+
+
+class _ReadRecordingDocs(dict[str, Document]):
+    """Documents by ID, recording how many LLM calls were made before each read."""
+
+    def __init__(self, docs: dict[str, Document], llm: FakeSummaryLLM) -> None:
+        super().__init__(docs)
+        self.llm = llm
+        self.prompts_before_reads: list[int] = []
+
+    def __getitem__(self, id: str) -> Document:
+        self.prompts_before_reads.append(len(self.llm.prompts))
+        return super().__getitem__(id)
+
+    def items(self) -> Iterator[tuple[str, Document]]:  # type: ignore[override]
+        for id in self:
+            yield id, self[id]
+
+
+def test_iter_chunk_summary_mappings_loads_contents_lazily() -> None:
+    """Test contents are read once to plan, then again only as they are sent."""
+    texts = [f"Chunk {i} text about clause {i}." for i in range(20)]
+    llm = FakeSummaryLLM(prompts=[], cache=False)
+    docs_by_id = _ReadRecordingDocs(_chunks(texts), llm)
+
+    summaries = list(
+        iter_chunk_summary_mappings(
+            docs_by_id,
+            llm,
+            FakeEmbeddings(size=8),
+            min_length_to_summarize=10,
+            max_concurrency=1,
+        )
+    )
+
+    assert len(summaries) == len(llm.prompts) == 20
+    reads = docs_by_id.prompts_before_reads
+    assert len(reads) == 2 * 20 + 20  # plan, input, and summary metadata
+    assert reads.count(0) <= 20 + 2  # not all inputs loaded before the first call
+
+
+def test_map_reduce_full_doc_summary_mappings() -> None:
+    """Test oversized documents are summarized with map-reduce, not truncated."""
+    long_text = "\n".join(f"Section {i}: " + "terms " * 40 for i in range(20))
+    docs_by_id = _chunks(["A short document.", long_text])
+    long_id = list(docs_by_id)[1]
+    embeddings = FakeEmbeddings(size=8)
+
+    llm = FakeSummaryLLM(prompts=[], cache=False)
+    summaries = build_map_reduce_full_doc_summary_mappings(
+        docs_by_id,
+        llm,
+        embeddings,
+        min_length_to_summarize=100,
+        max_length_cutoff=1000,
+        max_chunk_length_cutoff=500,
+    )
+
+    assert summaries[list(docs_by_id)[0]].page_content == "A short document."
+    assert summaries[long_id].page_content.startswith("Summary ")
+
+    # Every section made it into some map step prompt
+    for i in range(20):
+        assert any(f"Section {i}:" in prompt for prompt in llm.prompts)
+    assert all(len(prompt) < 4000 for prompt in llm.prompts)
+
+    # Existing chunk summaries are reused as the map step
+    chunk_summaries = {
+        f"chunk{i}": Document(
+            page_content=f"Chunk summary {i} " + "x" * 200,
+            metadata={FULL_DOC_SUMMARY_ID_KEY: long_id},
+        )
+        for i in range(12)
+    }
+    llm = FakeSummaryLLM(prompts=[], cache=False)
+    build_map_reduce_full_doc_summary_mappings(
+        docs_by_id,
+        llm,
+        embeddings,
+        chunk_summaries_by_id=chunk_summaries,
+        min_length_to_summarize=100,
+        max_length_cutoff=1000,
+    )
+    assert not any("Section" in prompt for prompt in llm.prompts)
+    assert any("Chunk summary 11" in prompt for prompt in llm.prompts)
+
+
+def test_map_reduce_full_doc_summary_mappings_batches_pieces(
+    mocker: MockerFixture,
+) -> None:
+    """Test map step pieces are split off and summarized a batch at a time."""
+    mocker.patch.object(mappings, "DEFAULT_SUMMARY_BATCH_SIZE", 4)
+    iter_summary_texts = mocker.spy(mappings, "_iter_summary_texts")
+    long_texts = [
+        "\n".join(f"Doc {d} section {i}: " + "terms " * 40 for i in range(5))
+        for d in range(2)
+    ]
+    docs_by_id = _chunks(long_texts)
+
+    summaries = build_map_reduce_full_doc_summary_mappings(
+        docs_by_id,
+        FakeSummaryLLM(prompts=[], cache=False),
+        FakeEmbeddings(size=8),
+        min_length_to_summarize=100,
+        max_length_cutoff=1000,
+        max_chunk_length_cutoff=500,
+    )
+
+    assert all(s.page_content.startswith("Summary ") for s in summaries.values())
+    map_batches = [
+        list(call.args[0])
+        for call in iter_summary_texts.call_args_list
+        if any("/map/" in key for key in call.args[0])
+    ]
+    assert [len(batch) for batch in map_batches] == [4, 4, 2]
+
+
+def test_build_doc_maps_from_chunks_streaming(tmp_path: Path) -> None:
+    """Test full docs built in one pass from lazy chunks, spilling large ones."""
+    loader = DocugamiLoader(
+        file_paths=[
+            TEST_DATA_DIR / "simple-dgml.xml",
+            TEST_DATA_DIR / "docsets/Non-Disclosure Agreements/Mandi Scutt.xml",
+            TEST_DATA_DIR / "docsets/Non-Disclosure Agreements/Tran Tharrington.xml",
+        ],
+        parent_hierarchy_levels=2,
+    )
+    chunks = loader.load()
+
+    texts_by_source: dict[str, list[str]] = {}
+    for chunk in chunks:
+        texts_by_source.setdefault(chunk.metadata["source"], []).append(
+            chunk.page_content
+        )
+    expected_texts = ["\n".join(texts) for texts in texts_by_source.values()]
+
+    full_docs_by_id, parent_chunks_by_id = build_doc_maps_from_chunks(
+        loader.lazy_load(), spill_dir=tmp_path, max_in_memory_doc_length=40000
+    )
+
+    assert [d.page_content for d in full_docs_by_id.values()] == expected_texts
+    for id, doc in full_docs_by_id.items():
+        assert id == hashlib.md5(doc.page_content.encode()).hexdigest()
+        assert doc.metadata == {"id": id}
+    num_large_docs = len([t for t in expected_texts if len(t) > 40000])
+    assert 0 < num_large_docs < len(expected_texts)
+    assert len(list(tmp_path.iterdir())) == num_large_docs
+
+    assert parent_chunks_by_id
+    for parent_chunk in parent_chunks_by_id.values():
+        assert parent_chunk.metadata[FULL_DOC_SUMMARY_ID_KEY] in full_docs_by_id
+
+
+def _interleaved_chunks(
+    num_sources: int, num_rounds: int, fail: bool = False
+) -> Iterator[Document]:
+    for index in range(num_rounds):
+        for source in range(num_sources):
+            text = f"Chunk {index} of doc {source}. " * 10
+            yield Document(
+                page_content=text,
+                metadata={"id": f"{source}-{index}", "source": f"doc{source}.xml"},
+            )
+        if fail:
+            raise ValueError("Chunk stream failed")
+
+
+def test_build_doc_maps_from_chunks_spills_many_docs(tmp_path: Path) -> None:
+    """Test many docs spilled at once don't hold open files, or leak on failure."""
+    fd_dir = Path("/proc/self/fd")
+    num_fds = len(list(fd_dir.iterdir())) if fd_dir.exists() else 0
+    max_fds = num_fds
+
+    def _chunks() -> Iterator[Document]:
+        nonlocal max_fds
+        for chunk in _interleaved_chunks(num_sources=50, num_rounds=4):
+            if num_fds:
+                max_fds = max(max_fds, len(list(fd_dir.iterdir())))
+            yield chunk
+
+    full_docs_by_id, _ = build_doc_maps_from_chunks(
+        _chunks(), spill_dir=tmp_path, max_in_memory_doc_length=100
+    )
+
+    assert max_fds <= num_fds + 1
+    assert len(list(tmp_path.iterdir())) == len(full_docs_by_id) == 50
+    expected_text = "\n".join(f"Chunk {i} of doc 0. " * 10 for i in range(4))
+    assert expected_text in [d.page_content for d in full_docs_by_id.values()]
+
+    failed_dir = tmp_path / "failed"
+    failed_dir.mkdir()
+    with pytest.raises(ValueError):
+        build_doc_maps_from_chunks(
+            _interleaved_chunks(num_sources=50, num_rounds=2, fail=True),
+            spill_dir=failed_dir,
+            max_in_memory_doc_length=100,
+        )
+    assert not list(failed_dir.iterdir())
+
+
+def test_chunk_summary_mappings_shared_chunks() -> None:
+    """Test chunks shared by several documents are summarized once per chunk ID."""
+    loader = DocugamiLoader(
+        file_paths=sorted(
+            (TEST_DATA_DIR / "docsets/Non-Disclosure Agreements").glob("*.xml")
+        ),
+        parent_hierarchy_levels=2,
+    )
+    full_docs_by_id, parent_chunks_by_id = build_doc_maps_from_chunks(
+        loader.lazy_load()
+    )
+    owners_by_id = {
+        id: [
+            (owner.metadata["source"], owner.metadata[FULL_DOC_SUMMARY_ID_KEY])
+            for owner in parent_chunks_by_id.owners(id)
+        ]
+        for id in parent_chunks_by_id
+    }
+    shared_ids = [id for id, owners in owners_by_id.items() if len(owners) > 1]
+    assert shared_ids
+    for id in shared_ids:
+        assert len({full_doc_id for _, full_doc_id in owners_by_id[id]}) > 1
+    llm = FakeSummaryLLM(prompts=[], cache=False)
+
+    summaries = build_chunk_summary_mappings(
+        parent_chunks_by_id, llm, FakeEmbeddings(size=8), min_length_to_summarize=0
+    )
+
+    assert len(llm.prompts) == len(parent_chunks_by_id)
+    assert len(summaries) == sum(len(owners) for owners in owners_by_id.values())
+    for id in shared_ids:
+        shared_summaries = [
+            s for s in summaries.values() if s.metadata[PARENT_DOC_ID_KEY] == id
+        ]
+        assert len({s.page_content for s in shared_summaries}) == 1
+        assert [
+            (s.metadata["source"], s.metadata[FULL_DOC_SUMMARY_ID_KEY])
+            for s in shared_summaries
+        ] == owners_by_id[id]
+
+
+def test_chunk_summary_mappings_instrumentation(tmp_path: Path) -> None:
+    """Test progress events and stats are reported for summary builds."""
+    boilerplate = "Boilerplate governing law clause. " * 5
+    texts = ["Short.", boilerplate, boilerplate + " ", "Unique clause text. " * 5]
+    docs_by_id = {
+        f"chunk-{i}": Document(page_content=text.strip(), metadata={})
+        for i, text in enumerate(texts)
+    }
+    cache = SQLiteSummaryCache(tmp_path / "summaries.db")
+    events: list[SummaryProgressEvent] = []
+    instrumentation = SummaryInstrumentation(progress_callback=events.append)
+
+    build_chunk_summary_mappings(
+        docs_by_id,
+        FakeSummaryLLM(prompts=[], cache=False),
+        FakeEmbeddings(size=8),
+        min_length_to_summarize=10,
+        summary_cache=cache,
+        instrumentation=instrumentation,
+    )
+
+    assert [e.stage for e in events] == ["planned", "progress", "finished"]
+    stats = instrumentation.stats
+    assert (stats.total, stats.skipped_short, stats.deduplicated) == (4, 1, 1)
+    assert (stats.summarized, stats.cached, stats.failed) == (2, 0, 0)
+    assert stats.completed == 4
+    assert stats.llm_calls == 2
+    assert len(stats.latencies_seconds) == 2
+    assert stats.latency_p95_seconds >= stats.latency_p50_seconds > 0
+
+    # Stats accumulate across builds, e.g. re-indexing from the cache
+    build_chunk_summary_mappings(
+        docs_by_id,
+        FakeSummaryLLM(prompts=[], cache=False),
+        FakeEmbeddings(size=8),
+        min_length_to_summarize=10,
+        summary_cache=cache,
+        instrumentation=instrumentation,
+    )
+    assert events[-1].stage == "finished"
+    assert events[-1].stats.cached == 3
+    assert events[-1].stats.llm_calls == 2
+
+
+def test_chunk_summary_mappings_partial_failure(tmp_path: Path) -> None:
+    """Test failed summaries are retried, or fall back to raw text if they persist."""
+    texts = ["Chunk text. " * 10, "FLAKY chunk text. " * 10, "FAIL chunk text. " * 10]
+    llm = FakeSummaryLLM(prompts=[], cache=False)
+    cache = SQLiteSummaryCache(tmp_path / "summaries.db")
+
+    # Without a failure report, one failed call fails the whole build
+    with pytest.raises(ValueError):
+        build_chunk_summary_mappings(
+            _chunks(texts), llm, FakeEmbeddings(size=8), min_length_to_summarize=10
+        )
+
+    llm.prompts = []
+    report = SummaryFailureReport(
+        max_retries=2, retry_backoff_seconds=0, fallback_length=20
+    )
+    summaries = build_chunk_summary_mappings(
+        _chunks(texts),
+        llm,
+        FakeEmbeddings(size=8),
+        min_length_to_summarize=10,
+        summary_cache=cache,
+        failure_report=report,
+    )
+
+    assert len(llm.prompts) == 6  # 3 in the batch, 1 retry for FLAKY, 2 for FAIL
+    contents = [d.page_content for d in summaries.values()]
+    assert contents[0].startswith("Summary ")
+    assert contents[1].startswith("Summary ")
+    assert contents[2] == texts[2][:20]
+    assert [(f.id, f.attempts) for f in report.failures] == [
+        (list(_chunks(texts))[2], 3)
+    ]
+    assert "LLM call failed" in report.failures[0].error
+
+    # Fallbacks are not cached, so are retried on the next run
+    llm.prompts = []
+    build_chunk_summary_mappings(
+        _chunks(texts),
+        llm,
+        FakeEmbeddings(size=8),
+        min_length_to_summarize=10,
+        summary_cache=cache,
+        failure_report=SummaryFailureReport(max_retries=0),
+    )
+    assert len(llm.prompts) == 1
+
+
+def test_chunk_summary_mappings_retries_failures_together(
+    mocker: MockerFixture,
+) -> None:
+    """Test failed summaries are retried in one batch per attempt, not one by one."""
+    sleep = mocker.patch("docugami_langchain.retrievers.mappings.time.sleep")
+    texts = [f"FAIL chunk {i} text. " * 10 for i in range(5)] + ["Chunk text. " * 10]
+    llm = FakeSummaryLLM(prompts=[], cache=False)
+    report = SummaryFailureReport(max_retries=2, retry_backoff_seconds=0.2)
+    instrumentation = SummaryInstrumentation()
+
+    summaries = build_chunk_summary_mappings(
+        _chunks(texts),
+        llm,
+        FakeEmbeddings(size=8),
+        min_length_to_summarize=10,
+        failure_report=report,
+        instrumentation=instrumentation,
+    )
+
+    assert len(summaries) == 6
+    assert len(llm.prompts) == 6 + 2 * 5
+    assert [call.args for call in sleep.call_args_list] == [(0.2,), (0.4,)]
+    assert [f.attempts for f in report.failures] == [3] * 5
+    assert instrumentation.stats.retries == 2 * 5
+
+
+@pytest.mark.asyncio
+async def test_abuild_chunk_summary_mappings_partial_failure() -> None:
+    """Test async builds tolerate failed summaries, with a failure report."""
+    texts = ["Chunk text. " * 10, "FLAKY chunk text. " * 10, "FAIL chunk text. " * 10]
+    llm = AsyncFakeSummaryLLM(prompts=[], cache=False)
+    report = SummaryFailureReport(retry_backoff_seconds=0, fallback_length=20)
+
+    summaries = await abuild_chunk_summary_mappings(
+        _chunks(texts),
+        llm,
+        FakeEmbeddings(size=8),
+        min_length_to_summarize=10,
+        failure_report=report,
+    )
+
+    assert list(summaries) == list(_chunks(texts))
+    assert [d.page_content for d in summaries.values()][2] == texts[2][:20]
+    assert [f.attempts for f in report.failures] == [3]
+
+
+@pytest.mark.asyncio
+async def test_abuild_chunk_summary_mappings_cancels_on_failure() -> None:
+    """Test async builds don't leave summaries running after one fails."""
+    texts = ["FAIL chunk text. " * 10] + [f"Chunk {i} text. " * 10 for i in range(10)]
+    llm = AsyncFakeSummaryLLM(prompts=[], cache=False)
+
+    with pytest.raises(ValueError):
+        await abuild_chunk_summary_mappings(
+            _chunks(texts),
+            llm,
+            FakeEmbeddings(size=8),
+            min_length_to_summarize=10,
+            max_concurrency=1,
+        )
+    await asyncio.sleep(0.2)
+
+    assert len(llm.prompts) == 1
+
+
+@pytest.mark.asyncio
+async def test_abuild_chunk_summary_mappings() -> None:
+    """Test async builds for several docsets share one concurrency limit."""
+    docsets = [
+        [f"Docset {d} chunk {i} text." for i in range(10)] + ["Short"]
+        for d in range(3)
+    ]
+    embeddings = FakeEmbeddings(size=8)
+    expected = [
+        build_chunk_summary_mappings(
+            _chunks(texts),
+            FakeSummaryLLM(prompts=[], cache=False),
+            embeddings,
+            min_length_to_summarize=10,
+        )
+        for texts in docsets
+    ]
+
+    llm = AsyncFakeSummaryLLM(prompts=[], cache=False)
+    semaphore = asyncio.Semaphore(4)
+    results = await asyncio.gather(
+        *[
+            abuild_chunk_summary_mappings(
+                _chunks(texts),
+                llm,
+                embeddings,
+                min_length_to_summarize=10,
+                semaphore=semaphore,
+            )
+            for texts in docsets
+        ]
+    )
+
+    assert len(llm.prompts) == 30
+    assert llm.max_in_flight == 4
+    for summaries, expected_summaries in zip(results, expected):
+        assert list(summaries) == list(expected_summaries)
+        assert [d.page_content for d in summaries.values()] == [
+            d.page_content for d in expected_summaries.values()
+        ]
@@ -0,0 +1,23 @@
+from langchain_community.embeddings import FakeEmbeddings
+
+from docugami_langchain.utils.embeddings import DeduplicatedEmbeddings
+
+
+class CountingEmbeddings(FakeEmbeddings):
+    embedded_texts: list[str] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.embedded_texts.extend(texts)
+        return [[float(len(text))] * self.size for text in texts]
+
+
+def test_deduplicated_embeddings() -> None:
+    """Test identical texts are embedded once, with the embedding fanned out."""
+    embeddings = CountingEmbeddings(size=2, embedded_texts=[])
+    texts = ["boilerplate", "unique", "boilerplate", "other", "boilerplate"]
+
+    vectors = DeduplicatedEmbeddings(embeddings).embed_documents(texts)
+
+    assert embeddings.embedded_texts == ["boilerplate", "unique", "other"]
+    assert vectors == [[float(len(text))] * 2 for text in texts]
+    assert DeduplicatedEmbeddings(embeddings).size == 2
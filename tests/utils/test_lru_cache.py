@@ -0,0 +1,40 @@
+import pytest
+
+from docugami_langchain.utils import lru_cache as lru_cache_module
+from docugami_langchain.utils.lru_cache import LRUCache
+
+
+def test_lru_cache_eviction() -> None:
+    """Test the least recently used entries are evicted when full."""
+    cache: LRUCache[str, int] = LRUCache(max_size=3)
+    for i, key in enumerate("abcd"):
+        cache.put(key, i)
+        cache.get("a")  # keep "a" recently used
+
+    assert len(cache) == 3
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == [0, 2, 3]
+    assert cache.stats.evictions == 1
+
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def test_lru_cache_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test entries expire after the TTL, and hit rate is tracked."""
+    now = [0.0]
+    monkeypatch.setattr(lru_cache_module.time, "monotonic", lambda: now[0])
+    cache: LRUCache[str, str] = LRUCache(ttl_seconds=60)
+
+    cache.put("query", "result")
+    now[0] = 30
+    assert cache.get("query") == "result"
+    now[0] = 61
+    cache.put("other", "result")
+    now[0] = 90
+    assert cache.get("query") is None
+    assert cache.get("other") == "result"
+
+    assert cache.stats.expirations == 1
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+    assert cache.stats.hit_rate == pytest.approx(2 / 3)
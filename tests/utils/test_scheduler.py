@@ -0,0 +1,126 @@
+import pytest
+
+from docugami_langchain.utils import scheduler as scheduler_module
+from docugami_langchain.utils.scheduler import BatchProgress, BatchScheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture()
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake_clock = FakeClock()
+    monkeypatch.setattr(scheduler_module.time, "monotonic", fake_clock.monotonic)
+    monkeypatch.setattr(scheduler_module.time, "sleep", fake_clock.sleep)
+    return fake_clock
+
+
+def test_scheduler_groups_by_length(clock: FakeClock) -> None:
+    """Test sub-batches group similar lengths, and results keep input order."""
+    items = ["x" * n for n in (50, 1, 40, 2, 30, 3)]
+    batches: list[list[str]] = []
+    progress: list[BatchProgress] = []
+
+    def _fn(batch: list[str], max_concurrency: int) -> list[int]:
+        batches.append(batch)
+        return [len(i) for i in batch]
+
+    scheduler = BatchScheduler(
+        max_concurrency=3, initial_concurrency=3, progress_callback=progress.append
+    )
+    results = scheduler.run(_fn, items, [len(i) for i in items])
+
+    assert results == [50, 1, 40, 2, 30, 3]
+    assert [[len(i) for i in b] for b in batches] == [[1, 2, 3], [30, 40, 50]]
+    assert progress[-1].completed == 6
+    assert progress[-1].tokens == 126
+
+
+def test_scheduler_rate_limits(clock: FakeClock) -> None:
+    """Test sub-batches wait for requests and tokens per minute budgets."""
+    items = list(range(6))
+
+    def _fn(batch: list[int], max_concurrency: int) -> list[int]:
+        clock.now += 1
+        return batch
+
+    scheduler = BatchScheduler(
+        requests_per_minute=4, max_concurrency=4, initial_concurrency=4
+    )
+    assert scheduler.run(_fn, items, [10] * 6) == items
+    assert len(clock.sleeps) == 1
+    assert clock.now >= 60
+
+    clock.sleeps.clear()
+    scheduler = BatchScheduler(tokens_per_minute=25, max_concurrency=4)
+    assert scheduler.run(_fn, items, [10] * 6) == items
+    assert len(clock.sleeps) == 2
+
+
+def test_scheduler_backs_off_on_errors(clock: FakeClock) -> None:
+    """Test failed sub-batches are retried with reduced concurrency."""
+    concurrencies: list[int] = []
+
+    def _fn(batch: list[int], max_concurrency: int) -> list[int]:
+        concurrencies.append(max_concurrency)
+        if len(concurrencies) == 2:
+            raise Exception("429 Too Many Requests")
+        return batch
+
+    retried: list[int] = []
+    scheduler = BatchScheduler(max_concurrency=8, initial_concurrency=4)
+    assert scheduler.run(
+        _fn, list(range(20)), [10] * 20, retry_callback=retried.append
+    ) == list(range(20))
+    assert concurrencies[:3] == [4, 5, 2]
+    assert len(retried) == 1 and retried[0] > 0
+
+    def _always_fail(batch: list[int], max_concurrency: int) -> list[int]:
+        raise Exception("429 Too Many Requests")
+
+    with pytest.raises(Exception, match="429"):
+        BatchScheduler(max_retries=2).run(_always_fail, [1], [10])
+
+
+def test_scheduler_backs_off_on_exception_results(clock: FakeClock) -> None:
+    """Test exception results count as failures, and only those items are retried."""
+    concurrencies: list[int] = []
+    calls: dict[int, int] = {}
+
+    def _fn(batch: list[int], max_concurrency: int) -> list[object]:
+        concurrencies.append(max_concurrency)
+        results: list[object] = []
+        for item in batch:
+            calls[item] = calls.get(item, 0) + 1
+            if item == 0 or (item == 1 and calls[item] == 1):
+                results.append(Exception("429 Too Many Requests"))
+            else:
+                results.append(item)
+        return results
+
+    retried: list[int] = []
+    progress: list[BatchProgress] = []
+    scheduler = BatchScheduler(
+        max_concurrency=8,
+        initial_concurrency=4,
+        max_retries=2,
+        progress_callback=progress.append,
+    )
+    results = scheduler.run(_fn, list(range(8)), [10] * 8, retried.append)
+
+    assert isinstance(results[0], Exception)
+    assert results[1:] == list(range(1, 8))
+    assert concurrencies[:2] == [4, 2]
+    assert calls == {0: 3, 1: 2, **{i: 1 for i in range(2, 8)}}
+    assert retried == [2, 1]
+    assert [p.completed for p in progress][-1] == 8